@@ -5,11 +5,10 @@ Web application for generating mathematical textures using reaction-diffusion
 algorithms. Creates natural-looking patterns for shell surface visualization.
 """
 import os
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend for serverless deployment
+import click
 
 from flask import Flask
-from config import config
+from config import config, STARTUP_SETTINGS
 from routes.pages import pages
 from routes.api import api
 
@@ -39,6 +38,14 @@ def create_app(config_name=None):
     # Register custom error handlers
     register_error_handlers(app)
     
+    # Register maintenance commands (flask <command>)
+    register_commands(app)
+    
+    # Pay the first-request costs now instead of in a user's request
+    if STARTUP_SETTINGS['prewarm']:
+        from routes.api import prewarm
+        prewarm()
+    
     return app
 
 def register_error_handlers(app):
@@ -56,6 +63,59 @@ def register_error_handlers(app):
     def bad_request_error(error):
         return {'error': 'Bad request'}, 400
 
+def register_commands(app):
+    """Register command line tasks run with the flask CLI."""
+    
+    @app.cli.command('build-meshes')
+    @click.option('--force', is_flag=True, help='Rebuild meshes that are already current.')
+    def build_meshes(force):
+        """Convert the shell OBJ models to precompressed binary meshes."""
+        from services.mesh_assets import build_all
+        for model, levels in build_all(force=force).items():
+            for lod, paths in levels.items():
+                sizes = ', '.join(f"{encoding} {path.stat().st_size / 1024:.0f} KB" for encoding, path in paths.items())
+                click.echo(f"{model} lod {lod}: {sizes}")
+    
+    @app.cli.command('prewarm')
+    def prewarm_command():
+        """Load the simulation stack and run a tiny simulation, reporting the time taken."""
+        from routes.api import prewarm
+        click.echo(f"prewarmed in {prewarm() * 1000:.0f} ms")
+    
+    @app.cli.command('calibrate-cost')
+    @click.option('--seconds', default=0.5, show_default=True, help='Timed duration per solver kind and size.')
+    def calibrate_cost(seconds):
+        """Time every solver kind on this machine and save the cost model's rates."""
+        from routes.api import get_texture_service
+        service = get_texture_service()
+        calibration = service.calibrate_cost(seconds=seconds)
+        service.cost_model.save()
+        for kind, rate in sorted(calibration['rates'].items()):
+            click.echo(f"{kind}: {rate:.3e} s per work unit")
+        click.echo(f"encoding: {calibration['encode_rate']:.3e} s per pixel")
+        click.echo(f"saved to {service.cost_model.calibration_file}")
+    
+    @app.cli.command('build-previews')
+    def build_previews():
+        """Simulate the preview atlas served by GET /preview."""
+        import time
+        from config import CHECKPOINT_SETTINGS
+        from services.checkpoint_store import CheckpointStore
+        from services.preview_atlas import atlas_paths, build_atlas
+        from services.texture_generator import TextureGeneratorService
+        # Preview runs are never resumed, so keep them out of the checkpoint store
+        service = TextureGeneratorService(checkpoints=CheckpointStore(CHECKPOINT_SETTINGS['directory'], disk_budget=0))
+        start = time.perf_counter()
+        with click.progressbar(length=1, label='Simulating previews') as bar:
+            def progress(done, total):
+                bar.length = total
+                bar.update(done - bar.pos)
+            index = build_atlas(service, progress=progress)
+        atlas_path, _ = atlas_paths()
+        click.echo(f"{len(index['t_max']) * len(index['feed_rate']) * len(index['kill_rate'])} previews, "
+                   f"{atlas_path.stat().st_size / 2**20:.1f} MB, built in {time.perf_counter() - start:.0f} s "
+                   f"({atlas_path})")
+
 # Create application instance
 app = create_app()
 
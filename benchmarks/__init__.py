@@ -0,0 +1,2 @@
+# This file makes Python treat the 'benchmarks' directory as a package
+# Run individual benchmarks with: python -m benchmarks.<module>
@@ -0,0 +1,92 @@
+"""
+Animation Benchmark - one time-lapse run vs one run per frame
+
+A time-lapse of N frames can be made by requesting N textures with growing
+t_max (the pre-animation workflow, here with the checkpoint store disabled
+so every request simulates from the start), or by a single
+/calculate/animation run that captures the frames on the way. For each
+container the benchmark reports wall time, output size and peak Python
+memory of the single run (tracemalloc), next to the time of the
+per-frame requests.
+
+Usage:
+    python -m benchmarks.bench_animation [--size 256] [--t-max 2000] [--frames 20]
+"""
+import argparse
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import ANIMATION_FORMATS, PATTERN_PARAMS
+from services.animation import AnimationStream
+from services.checkpoint_store import CheckpointStore
+from services.texture_cache import TextureCache
+from services.texture_generator import TextureGeneratorService
+from utils.helpers import validate_texture_params
+
+
+def make_service(directory):
+    """Service with a private cache and without checkpoints."""
+    return TextureGeneratorService(
+        cache=TextureCache(Path(directory), disk_budget=1 << 30, memory_budget=0),
+        checkpoints=CheckpointStore(Path(directory) / 'checkpoints', disk_budget=0)
+    )
+
+
+def per_frame_requests(params, frame_interval, steps):
+    """Wall time of one uncached request per frame step."""
+    with tempfile.TemporaryDirectory() as directory:
+        service = make_service(directory)
+        start = time.perf_counter()
+        for step in range(frame_interval, steps + 1, frame_interval):
+            service.generate_texture({**params, 't_max': step * params['delta_t']})
+        return time.perf_counter() - start
+
+
+def animation_run(params, animation_format, frame_interval, frame_size):
+    """Wall time, output bytes and peak traced memory of one animation."""
+    with tempfile.TemporaryDirectory() as directory:
+        stream = AnimationStream(make_service(directory), params, animation_format,
+                                 frame_interval=frame_interval, frame_size=frame_size, frame_duration=80)
+        tracemalloc.start()
+        start = time.perf_counter()
+        output = io.BytesIO()
+        for chunk in stream.chunks():
+            output.write(chunk)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return seconds, len(output.getvalue()), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--t-max', type=float, default=2000.0)
+    parser.add_argument('--frames', type=int, default=20)
+    args = parser.parse_args()
+
+    request = {'t_max': args.t_max, 'delta_t': 1.0, 'size': args.size, 'tolerance': 0}
+    params = {**validate_texture_params(request)['params'], **PATTERN_PARAMS}
+    steps = int(args.t_max)
+    frame_interval = max(1, steps // args.frames)
+    frame_size = min(args.size, 256)
+    print(f"{args.size}x{args.size}, {steps} steps, a frame every {frame_interval} steps"
+          f" ({frame_size}px frames)")
+
+    baseline = per_frame_requests(params, frame_interval, steps)
+    print(f"{'method':<18} {'time s':>8} {'speedup':>8} {'size KB':>9} {'peak MB':>8}")
+    print(f"{'one run per frame':<18} {baseline:8.2f} {1:8.1f}x {'-':>9} {'-':>8}")
+    for animation_format in ANIMATION_FORMATS:
+        seconds, size, peak = animation_run(params, animation_format, frame_interval, frame_size)
+        print(f"{animation_format + ' time-lapse':<18} {seconds:8.2f} {baseline / seconds:8.1f}x"
+              f" {size / 1024:9.1f} {peak / 2 ** 20:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Backend Benchmark - correctness and speed of every compute backend
+
+Runs the explicit solver on each installed backend (see
+services/backends.py) from the same seeded fields and compares the result
+with the numpy backend, for a single grid and for a batched stack with
+per-member parameters. A backend passes when its fields agree with numpy
+within --tolerance after --steps steps; the script exits with status 1 if
+any installed backend fails, so it doubles as the shared correctness
+check when adding a backend.
+
+Reported per backend: steps per second on a single grid, first-call
+overhead (numba compiles its kernel, or loads it from its on-disk cache),
+and the largest field difference from numpy.
+
+Usage:
+    python -m benchmarks.bench_backends [--size 512] [--steps 500] [--tolerance 1e-9]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from benchmarks.bench_stepper import initial_fields
+from config import PATTERN_PARAMS, SIMULATION_PARAMS
+from services.backends import BACKEND_REQUIREMENTS, STEPPER_CLASSES, backend_available, resolve_backend
+
+
+def batched_case(size: int):
+    """Three seeded members with different physics, as a batch request builds them."""
+    A, B = initial_fields(size)
+    members = [SIMULATION_PARAMS, PATTERN_PARAMS, {**PATTERN_PARAMS, 'feed_rate': 0.055}]
+    physics = {
+        name: np.array([member[name] for member in members]).reshape(-1, 1, 1)
+        for name in ('D_a', 'D_b', 'feed_rate', 'kill_rate')
+    }
+    delta_t = np.array([1.0, 0.5, 1.0]).reshape(-1, 1, 1)
+    return np.stack([A] * 3), np.stack([B] * 3), delta_t, physics
+
+
+def run(backend: str, A, B, delta_t, physics, steps: int):
+    """Fields after steps on a backend, with first-call and stepping times."""
+    start = time.perf_counter()
+    stepper = STEPPER_CLASSES[backend](A, B, delta_t, physics)
+    stepper.step(1)
+    first_call = time.perf_counter() - start
+    start = time.perf_counter()
+    stepper.step(steps - 1)
+    elapsed = time.perf_counter() - start
+    return np.array(stepper.A), np.array(stepper.B), first_call, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    single = (*initial_fields(args.size), 1.0, SIMULATION_PARAMS)
+    batched = batched_case(args.size // 2)
+    reference = {name: run('numpy', *case, args.steps) for name, case in
+                 (('single', single), ('batched', batched))}
+
+    print(f"Grid {args.size}x{args.size} ({args.size // 2} for the batch of 3), {args.steps} steps")
+    print(f"{'backend':<8} {'steps/s':>9} {'speedup':>8} {'first call ms':>14} "
+          f"{'max diff':>10} {'batch diff':>11}  result")
+    failed = False
+    for backend in BACKEND_REQUIREMENTS:
+        if not backend_available(backend):
+            print(f"{backend:<8} not installed, requests fall back to {resolve_backend(backend)}")
+            continue
+        differences = []
+        for name, case in (('single', single), ('batched', batched)):
+            A, B, first_call, elapsed = run(backend, *case, args.steps)
+            expected_A, expected_B = reference[name][:2]
+            differences.append(max(np.abs(A - expected_A).max(), np.abs(B - expected_B).max()))
+            if name == 'single':
+                rate, overhead = (args.steps - 1) / elapsed, first_call
+        numpy_rate = (args.steps - 1) / reference['single'][3]
+        passed = max(differences) <= args.tolerance
+        failed |= not passed
+        print(f"{backend:<8} {rate:9.1f} {rate / numpy_rate:7.2f}x {overhead * 1000:14.1f} "
+              f"{differences[0]:10.2e} {differences[1]:11.2e}  {'ok' if passed else 'MISMATCH'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Coalescing Benchmark - a burst of identical requests, with and without single flight
+
+Simulates a shared preset: --clients identical generations start at once,
+as threads of one process and as separate processes on the host. Each
+burst runs against an empty texture cache with checkpoints disabled, once
+with request coalescing and once without, and reports wall time until
+the last client has its texture and the number of simulations executed.
+
+Usage:
+    python -m benchmarks.bench_coalescing [--size 256] [--t-max 1000] [--clients 8]
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.checkpoint_store import CheckpointStore
+from services.single_flight import SingleFlight
+from services.texture_cache import TextureCache
+from services.texture_generator import TextureGeneratorService
+from utils.helpers import validate_texture_params
+
+
+def make_service(directory, coalesce):
+    """Service on a shared cache directory, with or without coalescing."""
+    return TextureGeneratorService(
+        cache=TextureCache(Path(directory) / 'cache', disk_budget=1 << 30, memory_budget=0),
+        checkpoints=CheckpointStore(Path(directory) / 'checkpoints', disk_budget=0),
+        flights=SingleFlight(Path(directory) / 'inflight') if coalesce else SingleFlight(None)
+    )
+
+
+def burst_threads(directory, params, clients, coalesce):
+    """Identical generations from threads of one service; returns simulations run."""
+    service = make_service(directory, coalesce)
+    results = []
+    if coalesce:
+        generate = service.generate_texture
+    else:
+        generate = lambda p: service._generate(p, service.describe(p), False)
+    threads = [threading.Thread(target=lambda: results.append(generate(params))) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len({id(result) for result in results if result['steps']})
+
+
+def _process_client(directory, params, coalesce, barrier, simulated):
+    """One process of a burst: wait for the others, then generate."""
+    service = make_service(directory, coalesce)
+    barrier.wait()
+    if coalesce:
+        result = service.generate_texture(params)
+    else:
+        result = service._generate(params, service.describe(params), False)
+    if result['steps']:
+        with simulated.get_lock():
+            simulated.value += 1
+
+
+def burst_processes(directory, params, clients, coalesce):
+    """Identical generations from separate processes; returns simulations run."""
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(clients)
+    simulated = context.Value('i', 0)
+    processes = [context.Process(target=_process_client, args=(directory, params, coalesce, barrier, simulated))
+                 for _ in range(clients)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return simulated.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--t-max', type=float, default=1000.0)
+    parser.add_argument('--clients', type=int, default=8)
+    args = parser.parse_args()
+
+    request = {'t_max': args.t_max, 'delta_t': 1.0, 'size': args.size, 'tolerance': 0}
+    params = validate_texture_params(request)['params']
+    print(f"{args.clients} identical requests, {args.size}x{args.size}, {int(args.t_max)} steps")
+    print(f"{'clients':<10} {'coalescing':<11} {'time s':>8} {'simulations':>12}")
+    for scope, burst in (('threads', burst_threads), ('processes', burst_processes)):
+        for coalesce in (False, True):
+            with tempfile.TemporaryDirectory() as directory:
+                start = time.perf_counter()
+                simulations = burst(directory, params, args.clients, coalesce)
+                seconds = time.perf_counter() - start
+            print(f"{scope:<10} {'on' if coalesce else 'off':<11} {seconds:8.2f} {simulations:12d}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Cost Model Benchmark - predicted against measured cost, and job ordering
+
+The first part submits a burst of jobs, --cheap small ones behind
+--expensive large ones, to a one-worker job queue twice: without
+estimates, which leaves the queue in FIFO order, and with them, which
+orders it by response ratio. It reports the mean and worst completion
+time of the cheap and the expensive jobs. The workers are forked with
+the texture cache in a temporary directory and checkpoints disabled,
+before anything in this process starts numba's thread pool.
+
+The second part generates a mix of requests (sizes, solvers, backends,
+mipmaps) against an empty cache with checkpoints disabled. For each
+request it prints the cost model's prediction (services/cost_model.py)
+next to the measured wall time and tracemalloc peak, and the ratio
+between them. The
+service is calibrated first (see `flask calibrate-cost`) unless
+--no-calibrate is given, so the rates are this machine's (and numba's
+kernel is compiled before it is timed).
+
+Usage:
+    python -m benchmarks.bench_cost_model [--cheap 6] [--expensive 2] [--no-calibrate]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import CACHE_SETTINGS, CHECKPOINT_SETTINGS
+from services.checkpoint_store import CheckpointStore
+from services.cost_model import CostModel
+from services.texture_cache import TextureCache
+from services.texture_generator import TextureGeneratorService
+from utils.helpers import validate_texture_params
+
+# Requests of part one: a spread of sizes, lengths and solver kinds
+REQUESTS = [
+    {'size': 128, 't_max': 200},
+    {'size': 256, 't_max': 500},
+    {'size': 512, 't_max': 300},
+    {'size': 512, 't_max': 300, 'backend': 'numba'},
+    {'size': 512, 't_max': 300, 'backend': 'scipy'},
+    {'size': 512, 't_max': 300, 'solver': 'spectral'},
+    {'size': 1024, 't_max': 100, 'mipmaps': True},
+    {'size': 1024, 't_max': 200, 'multigrid': True},
+]
+
+
+def make_service(directory):
+    """Service on an empty cache, without checkpoints or a calibration file."""
+    return TextureGeneratorService(
+        cache=TextureCache(Path(directory) / 'cache', disk_budget=1 << 30, memory_budget=0),
+        checkpoints=CheckpointStore(Path(directory) / 'checkpoints', disk_budget=0),
+        cost_model=CostModel(None)
+    )
+
+
+def params_of(request):
+    """Normalized parameters of a request, with early termination off."""
+    return validate_texture_params({'K': 1.0, 'delta_t': 1.0, 'tolerance': 0, **request})['params']
+
+
+def label(request):
+    """Short description of a request for the table."""
+    extras = [f"{key}={value}" for key, value in request.items() if key not in ('size', 't_max')]
+    return f"{request['size']}px {request['t_max']} steps {' '.join(extras)}".strip()
+
+
+def accuracy(calibrate):
+    """Print prediction against measurement for every request of REQUESTS."""
+    print()
+    with tempfile.TemporaryDirectory() as directory:
+        service = make_service(directory)
+        if calibrate:
+            service.calibrate_cost()
+        print(f"{'request':<40} {'est s':>8} {'real s':>8} {'ratio':>6} {'est MB':>8} {'peak MB':>8} {'ratio':>6}")
+        for index, request in enumerate(REQUESTS):
+            params = params_of({**request, 'K': 1.0 + index * 0.01})  # Distinct textures
+            estimate = service.estimate_cost(params)
+            tracemalloc.start()
+            start = time.perf_counter()
+            service.generate_texture(params)
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+            print(f"{label(request):<40} {estimate['cpu_seconds']:8.3f} {seconds:8.3f} "
+                  f"{seconds / estimate['cpu_seconds']:6.2f} {estimate['memory_mb']:8.1f} "
+                  f"{peak:8.1f} {peak / estimate['memory_mb']:6.2f}")
+
+
+def scheduling(cheap, expensive):
+    """Run a mixed burst through a one-worker queue, FIFO and by response ratio."""
+    from services.job_queue import FAILED, FINISHED, JobQueue
+
+    burst = ([('expensive', {'size': 1024, 't_max': 300})] * expensive
+             + [('cheap', {'size': 128, 't_max': 100})] * cheap)
+    print(f"{expensive} expensive then {cheap} cheap jobs, one worker")
+    print(f"{'order':<8} {'kind':<10} {'mean s':>8} {'worst s':>8}")
+    for order in ('fifo', 'hrrn'):
+        with tempfile.TemporaryDirectory() as directory:
+            CACHE_SETTINGS['directory'] = Path(directory) / 'cache'
+            CHECKPOINT_SETTINGS['disk_budget_mb'] = 0
+            service = make_service(directory)
+            queue = JobQueue(max_workers=1, max_pending=len(burst), result_ttl=3600)
+            # Start the worker first, so its startup is not charged to the first job
+            warmup = queue.submit(params_of({'size': 64, 't_max': 1}))
+            while queue.status(warmup)['status'] != FINISHED:
+                time.sleep(0.01)
+
+            submitted = time.perf_counter()
+            jobs = []
+            for index, (kind, request) in enumerate(burst):
+                params = params_of({**request, 'K': 1.0 + index * 0.01})  # Distinct textures
+                estimate = service.estimate_cost(params) if order == 'hrrn' else None
+                jobs.append((kind, queue.submit(params, estimate=estimate)))
+            finished = {}
+            while len(finished) < len(jobs):
+                for kind, job_id in jobs:
+                    if job_id not in finished and queue.status(job_id)['status'] in (FINISHED, FAILED):
+                        finished[job_id] = time.perf_counter() - submitted
+                time.sleep(0.01)
+            queue.shutdown()
+
+            for kind in ('cheap', 'expensive'):
+                times = [finished[job_id] for job_kind, job_id in jobs if job_kind == kind]
+                print(f"{order:<8} {kind:<10} {statistics.mean(times):8.2f} {max(times):8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--cheap', type=int, default=6)
+    parser.add_argument('--expensive', type=int, default=2)
+    parser.add_argument('--no-calibrate', action='store_true')
+    args = parser.parse_args()
+
+    scheduling(args.cheap, args.expensive)
+    accuracy(not args.no_calibrate)
+
+
+if __name__ == '__main__':
+    main()
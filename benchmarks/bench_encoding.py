@@ -0,0 +1,99 @@
+"""
+Encoding Benchmark - colorization and per-format encode time and size
+
+Simulates one labyrinth pattern, then times the original float64 per-channel
+colorize against the vectorized float32 version (reporting the largest
+pixel difference), and encodes the image with every PNG compression level
+and a range of WebP and JPEG qualities, reporting encode time and size.
+
+Usage:
+    python -m benchmarks.bench_encoding [--size 512] [--t-max 2000] [--repeat 5]
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from PIL import Image
+from config import IMAGE_FORMATS, PATTERN_PARAMS
+from services.checkpoint_store import CheckpointStore
+from services.texture_generator import TextureGeneratorService
+from utils.helpers import hex_to_rgb, image_format_available, validate_texture_params
+
+COLORS = ('#0000ff', '#ff0000')
+
+# (format, PIL save options) per encoding case
+ENCODINGS = (
+    [('png', {'compress_level': level}) for level in (0, 1, 3, 6, 9)] +
+    [('webp', {'quality': quality}) for quality in (50, 75, 90, 100)] +
+    [('jpeg', {'quality': quality}) for quality in (50, 75, 90, 95)]
+)
+
+
+def colorize_reference(A, B, color1, color2):
+    """Colorization as originally implemented (float64, one pass per channel)."""
+    A_norm = np.clip((A - np.min(A)) / (np.max(A) - np.min(A)), 0, 1)
+    B_norm = np.clip((B - np.min(B)) / (np.max(B) - np.min(B)), 0, 1)
+    color1_rgb = np.array(hex_to_rgb(color1))
+    color2_rgb = np.array(hex_to_rgb(color2))
+    img_data = np.zeros(A.shape + (3,))
+    for i in range(3):
+        img_data[:, :, i] = np.clip(color1_rgb[i] * A_norm + color2_rgb[i] * B_norm, 0, 1)
+    return (img_data * 255).astype('uint8')
+
+
+def median_time(function, repeat):
+    """Median wall time of a call in seconds, and its last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--t-max', type=float, default=2000.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    service = TextureGeneratorService(checkpoints=CheckpointStore(Path('unused'), disk_budget=0))
+    request = {'t_max': args.t_max, 'delta_t': 1.0, 'size': args.size, 'tolerance': 0}
+    params = {**validate_texture_params(request)['params'], **PATTERN_PARAMS}
+    A, B, _ = service._simulate([params])
+    A, B = A[0], B[0]
+    print(f"Labyrinth pattern {args.size}x{args.size} at t={args.t_max}")
+
+    old_time, old_rgb = median_time(lambda: colorize_reference(A, B, *COLORS), args.repeat)
+    new_time, new_rgb = median_time(lambda: service.colorize(A, B, *COLORS), args.repeat)
+    difference = np.abs(old_rgb.astype(int) - new_rgb.astype(int)).max()
+    print(f"colorize  original {old_time * 1000:8.2f} ms   vectorized {new_time * 1000:8.2f} ms"
+          f"   ({old_time / new_time:.1f}x, max pixel difference {difference})")
+
+    print(f"{'format':<6} {'setting':<18} {'encode ms':>10} {'size KB':>10} {'bytes/px':>9}")
+    for image_format, options in ENCODINGS:
+        if not image_format_available(image_format):
+            print(f"{image_format:<6} not supported by this Pillow build")
+            continue
+        pil_format = IMAGE_FORMATS[image_format]['pil_format']
+
+        def encode():
+            buffer = io.BytesIO()
+            Image.fromarray(new_rgb).save(buffer, format=pil_format, **options)
+            return buffer.getvalue()
+
+        seconds, data = median_time(encode, args.repeat)
+        setting = ', '.join(f'{name}={value}' for name, value in options.items())
+        print(f"{image_format:<6} {setting:<18} {seconds * 1000:10.2f} {len(data) / 1024:10.1f}"
+              f" {len(data) / new_rgb[..., 0].size:9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Mesh Benchmark - download size and parse time of OBJ versus binary meshes
+
+For every model in SHELL_MODELS with an OBJ file, reports the transfer
+size of the OBJ (raw and gzipped) against the binary mesh (raw, gzip and,
+if available, brotli), the time to parse each server-side, and the largest
+quantization error relative to the model's bounding box. Then decimates
+the model to every level of detail, reporting triangles, compressed size,
+decimation time and the mean distance of the level's vertices from the
+full mesh.
+
+Usage:
+    python -m benchmarks.bench_meshes [--repeat 3]
+"""
+import argparse
+import gzip
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from config import MESH_SETTINGS, SHELL_MODELS
+from services import mesh_assets
+
+
+def median_time(function, repeat):
+    """Median wall time of a call in seconds, and its last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def nearest_distance(points, reference, chunk=1024):
+    """Distance from every point to the nearest reference point (brute force)."""
+    distances = []
+    for start in range(0, len(points), chunk):
+        block = points[start:start + chunk, np.newaxis, :] - reference[np.newaxis, :, :]
+        distances.append(np.sqrt(np.einsum('ijk,ijk->ij', block, block).min(axis=1)))
+    return np.concatenate(distances)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for model in SHELL_MODELS:
+        source = mesh_assets.source_path(model)
+        if not source.exists():
+            print(f"{model}: no OBJ file, skipped")
+            continue
+        levels = mesh_assets.build_mesh(model, force=True)
+        paths = levels[0]
+        obj = source.read_bytes()
+        data = paths['identity'].read_bytes()
+
+        sizes = {'obj': len(obj), 'obj.gz': len(gzip.compress(obj, 6))}
+        sizes.update({f"mesh{mesh_assets.ENCODINGS[encoding]}": path.stat().st_size
+                      for encoding, path in paths.items()})
+        print(f"{model}: " + ', '.join(f"{name} {size / 1024:.0f} KB" for name, size in sizes.items()))
+        smallest = min(size for name, size in sizes.items() if name.startswith('mesh'))
+        print(f"  transfer: {len(obj) / smallest:.1f}x smaller than the OBJ as served,"
+              f" {sizes['obj.gz'] / smallest:.1f}x smaller than a gzipped OBJ")
+
+        obj_time, original = median_time(lambda: mesh_assets.load_obj(source), args.repeat)
+        mesh_time, decoded = median_time(lambda: mesh_assets.decode_mesh(data), args.repeat)
+        print(f"  parse: OBJ {obj_time * 1000:.0f} ms, binary {mesh_time * 1000:.1f} ms"
+              f" ({obj_time / mesh_time:.0f}x)")
+
+        extent = np.ptp(original['positions'], axis=0).max()
+        error = np.abs(original['positions'] - decoded['positions']).max()
+        print(f"  {len(original['positions'])} vertices, {len(original['indices']) // 3} triangles,"
+              f" max position error {error:.2e} ({error / extent:.1e} of the model size),"
+              f" indices identical: {np.array_equal(original['indices'], decoded['indices'])}")
+
+        for lod, budget in enumerate(MESH_SETTINGS['lod_triangles'], start=1):
+            seconds, coarse = median_time(lambda: mesh_assets.decimate(original, budget), args.repeat)
+            distance = nearest_distance(coarse['positions'], original['positions']).mean()
+            size = min(path.stat().st_size for path in levels[lod].values())
+            print(f"  lod {lod}: {len(coarse['indices']) // 3:6d} triangles (budget {budget}),"
+                  f" {size / 1024:5.0f} KB, decimated in {seconds * 1000:.0f} ms,"
+                  f" mean vertex offset {distance / extent:.1e} of the model size")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Mipmap Benchmark - pyramid build time, atlas size and seams at the wrap edge
+
+Simulates one labyrinth pattern, then builds its mip pyramid with the box
+and Lanczos filters and with Pillow's (edge-clamping) resize for
+comparison, reporting build time and the encoded size of the atlas against
+the base image. The seam check builds the pyramid of the pattern tiled
+2x2 and compares it with the tiled levels of the single pattern: the
+largest pixel difference is 0 when every level tiles exactly as the
+renderer's repeat wrapping shows it, and grows with the seam otherwise.
+
+Usage:
+    python -m benchmarks.bench_mipmaps [--size 512] [--t-max 2000] [--repeat 5]
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from PIL import Image
+from config import PATTERN_PARAMS
+from services import mipmaps
+from services.checkpoint_store import CheckpointStore
+from services.texture_generator import TextureGeneratorService
+from utils.helpers import validate_texture_params
+
+COLORS = ('#0000ff', '#ff0000')
+
+
+def median_time(function, repeat):
+    """Median wall time of a call in seconds, and its last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def pillow_pyramid(rgb, resample):
+    """Mip levels from Pillow's resize (edges clamped, sRGB averaging)."""
+    image = Image.fromarray(rgb)
+    levels = []
+    for w, h in mipmaps.level_sizes(*image.size)[1:]:
+        image = image.resize((w, h), resample)
+        levels.append(np.asarray(image))
+    return levels
+
+
+def seam_error(build, rgb):
+    """Largest pixel difference between the pyramid of a 2x2 tiling and the tiled pyramid."""
+    tiled = build(np.tile(rgb, (2, 2, 1)))
+    errors = []
+    for level, tiled_level in zip(build(rgb), tiled):
+        expected = np.tile(level, (2, 2, 1))
+        if expected.shape != tiled_level.shape:
+            break  # Odd sizes round differently from here on
+        errors.append(np.abs(expected.astype(int) - tiled_level.astype(int)).max())
+    return max(errors)
+
+
+def encoded_size(rgb):
+    """PNG size of an image in bytes."""
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, format='PNG')
+    return len(buffer.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--t-max', type=float, default=2000.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    service = TextureGeneratorService(checkpoints=CheckpointStore(Path('unused'), disk_budget=0))
+    request = {'t_max': args.t_max, 'delta_t': 1.0, 'size': args.size, 'tolerance': 0}
+    params = {**validate_texture_params(request)['params'], **PATTERN_PARAMS}
+    A, B, _ = service._simulate([params])
+    rgb = service.colorize(A[0], B[0], *COLORS)
+    base_size = encoded_size(rgb)
+    print(f"Labyrinth pattern {args.size}x{args.size} at t={args.t_max}, base PNG {base_size / 1024:.1f} KB")
+
+    builders = (
+        ('box', lambda image: mipmaps.build_pyramid(image, 'box')),
+        ('lanczos', lambda image: mipmaps.build_pyramid(image, 'lanczos')),
+        ('pillow box', lambda image: pillow_pyramid(image, Image.Resampling.BOX)),
+        ('pillow lanczos', lambda image: pillow_pyramid(image, Image.Resampling.LANCZOS)),
+    )
+    print(f"{'filter':<15} {'build ms':>9} {'atlas':>9} {'vs base':>8} {'seam error':>11}")
+    for name, build in builders:
+        seconds, levels = median_time(lambda: build(rgb), args.repeat)
+        atlas = mipmaps.pack_atlas(rgb, levels)
+        print(f"{name:<15} {seconds * 1000:9.1f} {atlas.shape[1]:>4}x{atlas.shape[0]:<4}"
+              f" {encoded_size(atlas) / base_size:7.2f}x {seam_error(build, rgb):11d}")
+
+
+if __name__ == '__main__':
+    main()
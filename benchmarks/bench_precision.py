@@ -0,0 +1,140 @@
+"""
+Precision Benchmark - float32 against float64 simulation
+
+Speed: over the grid sizes of the benchmark suite (benchmarks/suite.py),
+every solver kind (explicit on each installed backend, explicit numpy in
+blocks of rows, spectral) is stepped from the same seeded fields in
+float64 and in float32, pausing every PROGRESS_INTERVAL steps to flush
+float32 underflow as the service does. Reported: steps per second of
+both, the float32 speedup and the working memory of the stepper's arrays.
+
+Accuracy: for the default parameters and a pattern-forming set, both
+solvers are run to each --t-max in both precisions, and the float32 result
+is compared with the float64 one:
+
+- max |dA|, max |dB|: largest field difference
+- similarity: correlation of the radially averaged power spectra of A
+  (1.0 = same feature sizes; nan where a field is uniform)
+- pixels: share of pixels of the rendered texture that differ, and the
+  largest difference in 8-bit levels
+
+Gray-Scott patterns amplify small differences while they form, so long
+runs may place features differently (pixels differ) while the pattern
+itself is the same (similarity stays near 1). The default parameters
+decay towards a uniform state, which colorize() stretches to full
+contrast: those textures show rounding noise in either precision, so
+their pixels differ wholesale.
+
+Usage:
+    python -m benchmarks.bench_precision [--quick] [--steps 200] [--accuracy-size 256] [--t-max 1000 5000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from benchmarks.bench_multigrid import spectral_similarity
+from benchmarks.suite import QUICK_SIZES, SIZES
+from config import COST_SETTINGS, PATTERN_PARAMS, SIMULATION_PARAMS, TEXTURE_DEFAULTS
+from services.backends import STEPPER_CLASSES, available_backends
+from services.simulation import GrayScottStepper, SpectralGrayScottStepper, flush_underflow
+from services.texture_generator import PROGRESS_INTERVAL, TextureGeneratorService
+
+PRECISIONS = (np.float64, np.float32)
+
+# Solver kind -> (stepper factory, delta_t)
+KINDS = {
+    **{f'explicit/{backend}': (STEPPER_CLASSES[backend], 1.0) for backend in available_backends()},
+    'explicit/blocked': (lambda A, B, delta_t, params: GrayScottStepper(
+        A, B, delta_t, params, block_rows=COST_SETTINGS['block_rows']), 1.0),
+    'spectral': (SpectralGrayScottStepper, 10.0),
+}
+
+
+def advance(stepper, start, stop):
+    """Step from start to stop as TextureGeneratorService._run_stepper does."""
+    while start < stop:
+        target = min((start // PROGRESS_INTERVAL + 1) * PROGRESS_INTERVAL, stop)
+        stepper.step(target - start)
+        start = target
+        if start % PROGRESS_INTERVAL == 0:
+            flush_underflow(stepper.A)
+            flush_underflow(stepper.B)
+
+
+def stepper_bytes(stepper):
+    """Bytes of the arrays a stepper holds."""
+    return sum(value.nbytes for value in vars(stepper).values()
+               if isinstance(value, np.ndarray) and value.base is None)
+
+
+def speed(service, size, steps):
+    """Print float64 and float32 stepping rates of every kind at one size."""
+    for kind, (factory, delta_t) in KINDS.items():
+        rates, memory = [], []
+        for dtype in PRECISIONS:
+            A, B = service._stack_initial_fields([SIMULATION_PARAMS['random_seed']], size, dtype)
+            stepper = factory(A, B, delta_t, SIMULATION_PARAMS)
+            del A, B
+            stepper.step(1)  # Compilation and first-touch page faults
+            start = time.perf_counter()
+            advance(stepper, 1, steps + 1)
+            rates.append(steps / (time.perf_counter() - start))
+            memory.append(stepper_bytes(stepper) / 2**20)
+        print(f"{size:>6} {kind:<17} {rates[0]:10.1f} {rates[1]:10.1f} {rates[1] / rates[0]:7.2f}x "
+              f"{memory[0]:9.1f} {memory[1]:9.1f}")
+
+
+def accuracy(service, size, t_max_values):
+    """Print float32 against float64 differences of both solvers and parameter sets."""
+    parameter_sets = (('defaults', SIMULATION_PARAMS), ('pattern', PATTERN_PARAMS))
+    for name, params in parameter_sets:
+        for kind in ('explicit/numpy', 'spectral'):
+            factory, delta_t = KINDS[kind]
+            steppers = []
+            for dtype in PRECISIONS:
+                A, B = service._stack_initial_fields([SIMULATION_PARAMS['random_seed']], size, dtype)
+                steppers.append(factory(A, B, delta_t, params))
+            done = 0
+            for t_max in t_max_values:
+                steps = int(t_max / delta_t)
+                for stepper in steppers:
+                    advance(stepper, done, steps)
+                done = steps
+                (A64, B64), (A32, B32) = ((stepper.A[0], stepper.B[0]) for stepper in steppers)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    similarity = spectral_similarity(A64, A32.astype(np.float64))
+                images = [service.colorize(A, B, TEXTURE_DEFAULTS['color1'], TEXTURE_DEFAULTS['color2'])
+                          for A, B in ((A64, B64), (A32, B32))]
+                levels = np.abs(images[0].astype(np.int16) - images[1].astype(np.int16))
+                print(f"{name:<9} {kind:<15} {t_max:7g} {np.abs(A64 - A32).max():10.2e} "
+                      f"{np.abs(B64 - B32).max():10.2e} {similarity:10.4f} "
+                      f"{np.mean(levels.max(axis=-1) > 0) * 100:8.2f}% {levels.max():5d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--quick', action='store_true', help='Time the quick sizes of the suite only')
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--accuracy-size', type=int, default=256)
+    parser.add_argument('--t-max', type=float, nargs='+', default=[1000.0, 5000.0])
+    args = parser.parse_args()
+
+    service = TextureGeneratorService.__new__(TextureGeneratorService)
+    print(f"{args.steps} steps per size")
+    print(f"{'size':>6} {'kind':<17} {'f64 st/s':>10} {'f32 st/s':>10} {'speedup':>8} "
+          f"{'f64 MB':>9} {'f32 MB':>9}")
+    for size in QUICK_SIZES if args.quick else SIZES:
+        speed(service, size, args.steps)
+
+    print(f"\nfloat32 against float64 at {args.accuracy_size}x{args.accuracy_size}")
+    print(f"{'params':<9} {'kind':<15} {'t_max':>7} {'max |dA|':>10} {'max |dB|':>10} "
+          f"{'similarity':>10} {'pixels':>9} {'max':>5}")
+    accuracy(service, args.accuracy_size, sorted(args.t_max))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Preview Atlas Benchmark - build time, lookup latency and preview fidelity
+
+Builds the preview atlas of PREVIEW_ATLAS_SETTINGS (see
+services/preview_atlas.py) into a temporary directory and reports its
+build time and size. Then it times a lookup three ways: the nearest grid
+point alone, the colored preview, and the PNG that GET /preview sends,
+against the time a full render of the same parameters takes.
+
+Fidelity: for each t_max of the atlas (at the default feed and kill
+rates), the preview is compared with the full-resolution render,
+downsampled to the preview size, by the correlation of their radially
+averaged power spectra (1.0 = same feature sizes; nan where a field is
+uniform). A preview simulated at the preview size without diffusion
+scaling is shown for contrast.
+
+Usage:
+    python -m benchmarks.bench_preview_atlas [--lookups 1000] [--quick]
+"""
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from benchmarks.bench_multigrid import spectral_similarity
+from config import PREVIEW_ATLAS_SETTINGS, SIMULATION_PARAMS
+from services.checkpoint_store import CheckpointStore
+from services.preview_atlas import PreviewAtlas, atlas_paths, build_atlas
+from services.texture_generator import TextureGeneratorService
+from utils.helpers import validate_texture_params
+
+
+def per_call(function, count):
+    """Mean seconds of count calls."""
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) / count
+
+
+def encode_png(rgb):
+    """Encode as GET /preview does."""
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--lookups', type=int, default=1000)
+    parser.add_argument('--quick', action='store_true', help='Sweep a 3 x 2 x 2 grid only')
+    args = parser.parse_args()
+
+    settings = PREVIEW_ATLAS_SETTINGS
+    if args.quick:
+        settings.update({'t_max': (50, 200, 1000), 'feed_rate': (0.025, 0.035), 'kill_rate': (0.055, 0.06)})
+    size, texture_size = settings['size'], settings['texture_size']
+
+    with tempfile.TemporaryDirectory() as directory:
+        service = TextureGeneratorService(checkpoints=CheckpointStore(Path(directory) / 'checkpoints', disk_budget=0))
+        start = time.perf_counter()
+        index = build_atlas(service, directory)
+        build_seconds = time.perf_counter() - start
+        previews = len(index['t_max']) * len(index['feed_rate']) * len(index['kill_rate'])
+        atlas_path, _ = atlas_paths(directory)
+        print(f"Built {previews} previews of {size}px in {build_seconds:.1f} s, "
+              f"{atlas_path.stat().st_size / 2**20:.1f} MB")
+
+        atlas = PreviewAtlas(directory)
+        query = (index['t_max'][len(index['t_max']) // 2] * 1.1, 0.036, 0.061)
+        nearest = per_call(lambda: atlas.nearest(*query), args.lookups)
+        render = per_call(lambda: atlas.render(*query, '#0000ff', '#ff0000'), args.lookups)
+        png = per_call(lambda: encode_png(atlas.render(*query, '#0000ff', '#ff0000')[0]), args.lookups // 10 or 1)
+        print(f"{'lookup':<28} {'us':>10}")
+        print(f"{'nearest grid point':<28} {nearest * 1e6:10.1f}")
+        print(f"{'colored preview':<28} {render * 1e6:10.1f}")
+        print(f"{'colored preview as PNG':<28} {png * 1e6:10.1f}")
+
+        # Full renders for fidelity (and the latency a preview replaces)
+        def simulate(t_max, grid):
+            params = validate_texture_params({'t_max': t_max, 'delta_t': settings['delta_t'],
+                                              'size': grid, 'tolerance': 0})['params']
+            start = time.perf_counter()
+            A, _, _ = service._simulate([params], resume=False)
+            return A[0], time.perf_counter() - start
+
+        factor = texture_size // size
+        print(f"\n{'t_max':>7} {f'{texture_size}px render s':>16} {'atlas similarity':>17} {'unscaled similarity':>20}")
+        for t_max in index['t_max']:
+            full, seconds = simulate(t_max, texture_size)
+            reference = full.reshape(size, factor, size, factor).mean(axis=(1, 3))
+            point = atlas.nearest(t_max, SIMULATION_PARAMS['feed_rate'], SIMULATION_PARAMS['kill_rate'])
+            preview = np.asarray(atlas.previews[point['index']][0], dtype=np.float64)
+            unscaled, _ = simulate(t_max, size)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                similarities = spectral_similarity(reference, preview), spectral_similarity(reference, unscaled)
+            print(f"{t_max:7g} {seconds:16.2f} {similarities[0]:17.3f} {similarities[1]:20.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Solver Benchmark - explicit finite differences vs spectral IMEX
+
+Runs both solvers to the same simulated time and compares wall time with
+pattern statistics (mean, standard deviation and characteristic
+wavelength of both fields). The default configuration decays to a uniform
+state, so the benchmark uses pattern-forming parameter overrides; pass
+--defaults to use SIMULATION_PARAMS instead.
+
+Usage:
+    python -m benchmarks.bench_solvers [--size 256] [--t-max 10000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from config import PATTERN_PARAMS, SIMULATION_PARAMS
+from services.simulation import STEPPERS
+from services.texture_generator import TextureGeneratorService
+
+RUNS = [
+    ('explicit', 0.5),
+    ('explicit', 1.0),
+    ('spectral', 5.0),
+    ('spectral', 10.0),
+    ('spectral', 20.0),
+    ('spectral', 50.0),
+]
+
+
+def pattern_stats(field: np.ndarray):
+    """Mean, standard deviation and spectral-centroid wavelength of a field."""
+    size = field.shape[0]
+    power = np.abs(np.fft.fft2(field - field.mean())) ** 2
+    freq = np.fft.fftfreq(size) * size
+    radius = np.hypot(freq[:, None], freq[None, :])
+    centroid = (radius * power).sum() / power.sum()
+    return field.mean(), field.std(), size / centroid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--t-max', type=float, default=10000.0)
+    parser.add_argument('--defaults', action='store_true',
+                        help='use SIMULATION_PARAMS instead of pattern-forming overrides')
+    args = parser.parse_args()
+
+    params = SIMULATION_PARAMS if args.defaults else PATTERN_PARAMS
+    service = TextureGeneratorService()
+    print(f"Grid {args.size}x{args.size}, t_max={args.t_max}, params={params}")
+    print(f"  {'solver':<9}{'delta_t':>8}{'steps':>8}{'seconds':>9}"
+          f"{'A mean':>8}{'A std':>8}{'A wave':>8}{'B mean':>8}{'B std':>8}{'B wave':>8}")
+
+    reference_time = None
+    for solver, delta_t in RUNS:
+        A, B = service._initial_fields(SIMULATION_PARAMS['random_seed'], args.size)
+        stepper = STEPPERS[solver](A, B, delta_t, params)
+        steps = int(args.t_max / delta_t)
+        start = time.perf_counter()
+        stepper.step(steps)
+        elapsed = time.perf_counter() - start
+        reference_time = reference_time or elapsed
+
+        stats = pattern_stats(stepper.A) + pattern_stats(stepper.B)
+        print(f"  {solver:<9}{delta_t:>8}{steps:>8}{elapsed:>9.2f}"
+              + ''.join(f"{value:>8.3f}" for value in stats)
+              + f"   {reference_time / elapsed:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
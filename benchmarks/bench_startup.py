@@ -0,0 +1,85 @@
+"""
+Startup Benchmark - import time and time to the first /calculate response
+
+Starts fresh interpreters the way a cold serverless or autoscaled instance
+does and measures, for each startup mode:
+
+- import: `import app` (module load, create_app, and the prewarm if enabled)
+- first: the first POST /calculate after import, through the test client
+- second: a second, equally uncached request, i.e. the warm latency
+- process: interpreter start to first response, measured from outside
+
+Requests are small (64x64, 100 steps) so startup costs dominate, and every
+request uses a fresh K so none is served from the texture cache. The
+texture cache and checkpoints go to a temporary directory.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Startup modes: extra environment per mode
+MODES = {
+    'lazy': {'PREWARM': '0'},
+    'prewarm': {'PREWARM': '1'},
+}
+
+PROBE = """
+import json, random, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+timings = {'import': imported - start}
+for name in ('first', 'second'):
+    began = time.perf_counter()
+    response = client.post('/calculate', json={
+        'K': random.uniform(0.5, 4.5), 't_max': 100, 'delta_t': 1.0, 'size': 64, 'tolerance': 0})
+    if response.status_code != 200 or response.get_json()['cached']:
+        raise SystemExit(f"/calculate failed: {response.get_json()}")
+    timings[name] = time.perf_counter() - began
+    if name == 'first':
+        timings['responded_at'] = time.time()
+print(json.dumps(timings))
+"""
+
+
+def probe(environment):
+    """Run one cold start; return its timings in seconds."""
+    spawned_at = time.time()
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings['process'] = timings.pop('responded_at') - spawned_at
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'import ms':>10} {'first ms':>9} {'second ms':>10} {'process ms':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for mode, extra in MODES.items():
+            environment = dict(os.environ, FLASK_CONFIG='production',
+                               TEXTURE_CACHE_DIR=str(Path(workdir) / 'cache'),
+                               CHECKPOINT_DIR=str(Path(workdir) / 'checkpoints'), **extra)
+            runs = [probe(environment) for _ in range(args.repeat)]
+            medians = {name: statistics.median(run[name] for run in runs) * 1000 for name in runs[0]}
+            print(f"{mode:<8} {medians['import']:10.1f} {medians['first']:9.1f}"
+                  f" {medians['second']:10.1f} {medians['process']:11.1f}")
+
+
+if __name__ == '__main__':
+    main()
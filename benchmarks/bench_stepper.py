@@ -0,0 +1,128 @@
+"""
+Stepper Benchmark - np.roll reference loop vs fused GrayScottStepper
+
+Measures steps per second and peak resident memory of both integration
+paths, and checks that they agree within the documented tolerance.
+Each variant runs in a fresh child process so peak RSS is not polluted
+by the other run.
+
+Usage:
+    python -m benchmarks.bench_stepper [--size 512] [--steps 500]
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from config import SIMULATION_PARAMS
+from services.simulation import GrayScottStepper
+from utils.helpers import normalize_array
+
+
+def initial_fields(size: int):
+    """Seeded starting grids, identical to TextureGeneratorService."""
+    rng = np.random.RandomState(SIMULATION_PARAMS['random_seed'])
+    noise = (rng.rand(size, size) - 0.5) * 0.1
+    return np.ones((size, size)) * 0.5 + noise, np.ones((size, size)) * 0.25 + noise
+
+
+def reference_run(A, B, steps: int, delta_t: float):
+    """The original np.roll based loop, kept verbatim for comparison."""
+    D_a = SIMULATION_PARAMS['D_a']
+    D_b = SIMULATION_PARAMS['D_b']
+    feed_rate = SIMULATION_PARAMS['feed_rate']
+    kill_rate = SIMULATION_PARAMS['kill_rate']
+
+    def laplacian(grid):
+        return (
+            np.roll(grid, 1, axis=0) + np.roll(grid, -1, axis=0) +
+            np.roll(grid, 1, axis=1) + np.roll(grid, -1, axis=1) - 4 * grid
+        )
+
+    for _ in range(steps):
+        A_laplace = laplacian(A)
+        B_laplace = laplacian(B)
+        reaction = A * B**2
+        A += delta_t * (D_a * A_laplace - reaction + feed_rate * (1 - A))
+        B += delta_t * (D_b * B_laplace + reaction - (kill_rate + feed_rate) * B)
+    return A, B
+
+
+def fused_run(A, B, steps: int, delta_t: float):
+    """Run the preallocated fused stepper."""
+    stepper = GrayScottStepper(A, B, delta_t, SIMULATION_PARAMS)
+    stepper.step(steps)
+    return stepper.A, stepper.B
+
+
+def to_pixels(A, B):
+    """Normalize and quantize both fields the way the renderer does."""
+    A_norm = normalize_array(A)
+    B_norm = normalize_array(B)
+    return (A_norm * 255).astype('uint8'), (B_norm * 255).astype('uint8')
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _measure(name: str, size: int, steps: int, delta_t: float, results):
+    """Child process body: time one variant and record its peak RSS."""
+    runner = reference_run if name == 'reference' else fused_run
+    A, B = initial_fields(size)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    runner(A, B, steps, delta_t)
+    elapsed = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+    results.put({
+        'name': name,
+        'steps_per_sec': steps / elapsed,
+        'peak_rss_mb': rss_after,
+        'rss_growth_mb': None if rss_after is None else rss_after - rss_before,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=512)
+    parser.add_argument('--steps', type=int, default=500)
+    parser.add_argument('--delta-t', type=float, default=0.1)
+    args = parser.parse_args()
+
+    print(f"Grid {args.size}x{args.size}, {args.steps} steps, delta_t={args.delta_t}")
+    results = multiprocessing.Queue()
+    for name in ('reference', 'fused'):
+        proc = multiprocessing.Process(
+            target=_measure, args=(name, args.size, args.steps, args.delta_t, results))
+        proc.start()
+        row = results.get()
+        proc.join()
+        rss = row['peak_rss_mb']
+        rss_text = 'n/a' if rss is None else f"{rss:8.1f} MB (+{row['rss_growth_mb']:.1f} MB)"
+        print(f"  {name:<10} {row['steps_per_sec']:10.1f} steps/s   peak RSS {rss_text}")
+
+    # Accuracy check against the reference path
+    ref_A, ref_B = reference_run(*initial_fields(args.size), args.steps, args.delta_t)
+    new_A, new_B = fused_run(*initial_fields(args.size), args.steps, args.delta_t)
+    field_diff = max(np.abs(ref_A - new_A).max(), np.abs(ref_B - new_B).max())
+    pixel_diff = max(
+        np.abs(p.astype(int) - q.astype(int)).max()
+        for p, q in zip(to_pixels(ref_A, ref_B), to_pixels(new_A, new_B))
+    )
+    print(f"  max |field delta| = {field_diff:.3e}, max pixel delta = {pixel_diff}")
+
+
+if __name__ == '__main__':
+    main()
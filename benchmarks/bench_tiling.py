@@ -0,0 +1,64 @@
+"""
+Tiling Benchmark - single-process stepper vs TiledGrayScottStepper
+
+Measures steps per second of the multi-core strip engine for 1..N worker
+processes and checks that every run is bitwise identical to the
+single-process GrayScottStepper.
+
+Usage:
+    python -m benchmarks.bench_tiling [--size 2048] [--steps 200] [--max-workers 8] [--halo 4]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from benchmarks.bench_stepper import initial_fields
+from config import SIMULATION_PARAMS
+from services.simulation import GrayScottStepper
+from services.tiled_simulation import TiledGrayScottStepper
+
+
+def worker_counts(maximum: int):
+    """1, 2, 4, ... up to maximum (always including maximum)."""
+    counts, count = [], 1
+    while count < maximum:
+        counts.append(count)
+        count *= 2
+    return counts + [maximum]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=2048)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--halo', type=int, default=4)
+    args = parser.parse_args()
+
+    A, B = initial_fields(args.size)
+    print(f"Grid {args.size}x{args.size}, {args.steps} steps, halo {args.halo}, "
+          f"{os.cpu_count()} CPUs available")
+
+    start = time.perf_counter()
+    reference = GrayScottStepper(A, B, 1.0, SIMULATION_PARAMS)
+    reference.step(args.steps)
+    serial_time = time.perf_counter() - start
+    print(f"  single process  {args.steps / serial_time:8.1f} steps/s")
+
+    for workers in worker_counts(args.max_workers):
+        start = time.perf_counter()
+        with TiledGrayScottStepper(A, B, 1.0, SIMULATION_PARAMS, workers=workers, halo=args.halo) as tiled:
+            tiled.step(args.steps)
+        elapsed = time.perf_counter() - start
+        identical = np.array_equal(tiled.A, reference.A) and np.array_equal(tiled.B, reference.B)
+        print(f"  {workers:3d} workers     {args.steps / elapsed:8.1f} steps/s   "
+              f"speedup {serial_time / elapsed:5.2f}x   bitwise identical: {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,281 @@
+"""
+Benchmark Suite - reproducible timings of the texture pipeline
+
+Times every stage a texture request goes through over a matrix of grid
+sizes and step counts:
+
+- step/explicit, step/spectral: the stepping loop of each solver
+- laplacian: TextureGeneratorService._calculate_laplacian
+- render: TextureGeneratorService._create_texture_image
+- http: POST /calculate end to end through the Flask test client of
+  create_app('testing'), with an isolated cache and no checkpoints so
+  every repetition simulates from scratch
+
+Each case runs in a freshly spawned process, so peak memory is not
+polluted by earlier cases. A case records the median wall time of its
+repetitions, steps (or calls) per second and the peak RSS growth during
+the first repetition. Results are written as JSON; the compare mode
+flags cases that got slower or hungrier than a stored baseline.
+
+Usage:
+    python -m benchmarks.suite run [--quick] [--output results.json] [--baseline baseline.json]
+    python -m benchmarks.suite compare baseline.json results.json [--threshold 0.15]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from benchmarks.bench_stepper import initial_fields, peak_rss_mb
+
+SIZES = [128, 256, 512, 1024, 2048]
+STEP_COUNTS = [50, 200]
+QUICK_SIZES = [128, 256]
+QUICK_STEP_COUNTS = [50]
+CASES = ['step/explicit', 'step/spectral', 'laplacian', 'render', 'http']
+
+# Calls timed per repetition of the per-call cases
+CALLS = {'laplacian': 20, 'render': 1}
+
+
+def _run_stepper(solver: str, size: int, steps: int):
+    """Return a callable that runs one fresh stepper for a number of steps."""
+    from config import SIMULATION_PARAMS
+    from services.simulation import STEPPERS
+
+    A, B = initial_fields(size)
+
+    def run(repetition):
+        stepper = STEPPERS[solver](A, B, 1.0, SIMULATION_PARAMS)
+        stepper.step(steps)
+    return run
+
+
+def _laplacian(size: int):
+    """Return a callable that evaluates the reference Laplacian."""
+    from services.texture_generator import TextureGeneratorService
+
+    service = TextureGeneratorService.__new__(TextureGeneratorService)
+    grid, _ = initial_fields(size)
+
+    def run(repetition):
+        for _ in range(CALLS['laplacian']):
+            service._calculate_laplacian(grid)
+    return run
+
+
+def _render(size: int):
+    """Return a callable that colorizes and encodes one texture."""
+    from services.texture_generator import TextureGeneratorService
+
+    service = TextureGeneratorService.__new__(TextureGeneratorService)
+    A, B = initial_fields(size)
+
+    def run(repetition):
+        service._create_texture_image(A, B, '#0000ff', '#ff0000', size)
+    return run
+
+
+def _http(size: int, steps: int, workdir: str):
+    """Return a callable that posts one uncached request to /calculate."""
+    from app import create_app
+    from config import JOB_SETTINGS
+    from routes import api as api_module
+    from services.checkpoint_store import CheckpointStore
+    from services.texture_cache import TextureCache
+    from services.texture_generator import TextureGeneratorService
+
+    # Isolated cache, no checkpoints, and no synchronous size limit
+    api_module.texture_service = TextureGeneratorService(
+        cache=TextureCache(Path(workdir) / 'cache', disk_budget=2**40, memory_budget=0),
+        checkpoints=CheckpointStore(Path(workdir) / 'checkpoints', disk_budget=0)
+    )
+    JOB_SETTINGS['sync_max_cell_steps'] = float('inf')
+    client = create_app('testing').test_client()
+
+    def run(repetition):
+        # K only enters the cache key, so every repetition is a cache miss
+        response = client.post('/calculate', json={
+            'K': 1.0 + 0.01 * repetition, 't_max': float(steps), 'delta_t': 1.0,
+            'size': size, 'tolerance': 0
+        })
+        if response.status_code != 200 or response.get_json()['cached']:
+            raise RuntimeError(f"/calculate failed: {response.get_json()}")
+    return run
+
+
+def _measure(case: str, size: int, steps: int, repeat: int, results) -> None:
+    """Child process body: time one case and record its peak RSS growth."""
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            if case.startswith('step/'):
+                run, work = _run_stepper(case.split('/', 1)[1], size, steps), steps
+            elif case == 'laplacian':
+                run, work = _laplacian(size), CALLS['laplacian']
+            elif case == 'render':
+                run, work = _render(size), CALLS['render']
+            else:
+                run, work = _http(size, steps, workdir), steps
+
+            times = []
+            rss_before = peak_rss_mb()
+            for repetition in range(repeat):
+                start = time.perf_counter()
+                run(repetition)
+                times.append(time.perf_counter() - start)
+                if repetition == 0:
+                    rss_after = peak_rss_mb()
+
+        wall = statistics.median(times)
+        results.put({
+            'case': case, 'size': size, 'steps': steps,
+            'wall_s': wall,
+            'rate_per_s': work / wall,
+            'peak_mb': None if rss_before is None else rss_after - rss_before,
+            'times_s': times,
+        })
+    except Exception as e:
+        results.put({'case': case, 'size': size, 'steps': steps, 'error': f"{type(e).__name__}: {e}"})
+
+
+def _git_revision() -> str:
+    """Current commit of the working tree, or None outside git."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=Path(__file__).resolve().parent,
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, step_counts, cases, repeat: int):
+    """Run the benchmark matrix and return the JSON-serializable report."""
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    rows = []
+    for case in cases:
+        # Per-call cases do not depend on the step count
+        counts = step_counts if case == 'http' or case.startswith('step/') else [None]
+        for size in sizes:
+            for steps in counts:
+                proc = context.Process(target=_measure, args=(case, size, steps, repeat, results))
+                proc.start()
+                row = results.get()
+                proc.join()
+                rows.append(row)
+                print(format_row(row), flush=True)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': _git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+        },
+        'results': rows,
+    }
+
+
+def format_row(row) -> str:
+    """One human-readable line per result."""
+    label = f"{row['case']:<14} {row['size']:5d}" + (f" x {row['steps']:<5d}" if row['steps'] else ' ' * 8)
+    if 'error' in row:
+        return f"  {label}  ERROR {row['error']}"
+    unit = 'steps/s' if row['steps'] else 'calls/s'
+    peak = 'n/a' if row['peak_mb'] is None else f"{row['peak_mb']:7.1f} MB"
+    return f"  {label}  {row['wall_s'] * 1000:10.1f} ms  {row['rate_per_s']:10.1f} {unit}  peak +{peak}"
+
+
+def compare(baseline, current, threshold: float):
+    """
+    Match results by (case, size, steps) and list regressions.
+
+    Args:
+        baseline: Report loaded from the baseline JSON file
+        current: Report of the run being checked
+        threshold: Relative slowdown (or memory growth) tolerated, e.g. 0.15
+
+    Returns:
+        list: Human-readable descriptions of each regression
+    """
+    def index(report):
+        return {(row['case'], row['size'], row['steps']): row for row in report['results'] if 'error' not in row}
+
+    old, new = index(baseline), index(current)
+    regressions = []
+    for key in sorted(old.keys() & new.keys(), key=str):
+        before, after = old[key], new[key]
+        ratio = after['wall_s'] / before['wall_s']
+        marker = ''
+        if ratio > 1 + threshold:
+            marker = '  REGRESSION (time)'
+            regressions.append(f"{key}: wall time {before['wall_s']:.4f} s -> {after['wall_s']:.4f} s ({ratio:.2f}x)")
+        # Peak growth below a few MB is allocator noise
+        if before['peak_mb'] is not None and after['peak_mb'] is not None and \
+                after['peak_mb'] > max(before['peak_mb'] * (1 + threshold), before['peak_mb'] + 4):
+            marker += '  REGRESSION (memory)'
+            regressions.append(f"{key}: peak memory +{before['peak_mb']:.1f} MB -> +{after['peak_mb']:.1f} MB")
+        print(f"  {key[0]:<14} {key[1]:5d} {key[2] or '':>6}  {ratio:6.2f}x time{marker}")
+
+    for key in sorted(old.keys() - new.keys(), key=str):
+        print(f"  {key}: missing from the current run")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmark matrix')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=None)
+    run_parser.add_argument('--steps', type=int, nargs='+', default=None)
+    run_parser.add_argument('--cases', nargs='+', choices=CASES, default=CASES)
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--quick', action='store_true', help='small sizes only (smoke test)')
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.add_argument('--baseline', help='compare against this report after running')
+    run_parser.add_argument('--threshold', type=float, default=0.15)
+
+    compare_parser = commands.add_parser('compare', help='compare two reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.15)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+        step_counts = args.steps or (QUICK_STEP_COUNTS if args.quick else STEP_COUNTS)
+        report = run_suite(sizes, step_counts, args.cases, args.repeat)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+        if not args.baseline:
+            return
+        baseline, current = json.loads(Path(args.baseline).read_text()), report
+    else:
+        baseline = json.loads(Path(args.baseline).read_text())
+        current = json.loads(Path(args.current).read_text())
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,8 +21,60 @@ ASSETS_DIR = BASE_DIR / "assets"          # 3D models and other resources
 # Image generation settings
 IMAGES_DIR = STATIC_DIR / "images"        # Where generated textures are saved
 DEFAULT_TEXTURE_SIZE = 512                # Default image size (512x512 pixels)
+MIN_TEXTURE_SIZE = 32                     # Smallest size a request may ask for
+MAX_TEXTURE_SIZE = 4096                   # Print resolution; needs multigrid to be interactive
 SUPPORTED_IMAGE_FORMATS = ['.png', '.jpg', '.jpeg']  # File types we can save
 
+# Encodings a request may choose ("format" in a request)
+# Every format is cached under its own extension and served with its mimetype
+IMAGE_FORMATS = {
+    'png': {'extension': '.png', 'mimetype': 'image/png', 'pil_format': 'PNG'},
+    'webp': {'extension': '.webp', 'mimetype': 'image/webp', 'pil_format': 'WEBP'},
+    'jpeg': {'extension': '.jpg', 'mimetype': 'image/jpeg', 'pil_format': 'JPEG'},
+}
+
+# Encoder defaults; "quality" applies to webp/jpeg, "compress_level" to png
+ENCODING_SETTINGS = {
+    'format': 'png',
+    'quality': 90,            # Lossy quality (1 - 100)
+    'compress_level': 6,      # zlib level (0 = fastest, 9 = smallest); PIL's default
+}
+
+# Precomputed mip pyramids ("mipmaps" in a request, see services/mipmaps.py)
+# Levels are packed into one atlas image next to the base level
+MIPMAP_SETTINGS = {
+    'enabled': False,         # Default of "mipmaps"
+    'filter': 'box',          # Default of "mip_filter"
+    'filters': ('box', 'lanczos'),
+    'linear_light': True,     # Average in linear RGB, not in sRGB values
+}
+
+# Content-addressed texture cache (see services/texture_cache.py)
+# Identical requests reuse the stored image; budgets are enforced with LRU eviction
+CACHE_SETTINGS = {
+    'directory': Path(os.environ.get('TEXTURE_CACHE_DIR', IMAGES_DIR / "cache")),
+    'disk_budget_mb': int(os.environ.get('TEXTURE_CACHE_DISK_MB', 512)),
+    'memory_budget_mb': int(os.environ.get('TEXTURE_CACHE_MEMORY_MB', 64)),
+    'max_age': 31536000,      # Cache-Control max-age for texture URLs (1 year)
+}
+
+# Coalescing of identical in-flight generations (see services/single_flight.py)
+# Concurrent requests for the same texture wait for one simulation; marker
+# files in `directory` extend this to all processes on the host
+COALESCING_SETTINGS = {
+    'enabled': True,
+    'directory': Path(os.environ.get('INFLIGHT_DIR', IMAGES_DIR / "inflight")),
+    'poll_interval': 0.05,    # Seconds between checks while waiting
+}
+
+# Saved simulation states (see services/checkpoint_store.py)
+# Runs with a longer t_max but otherwise identical physics resume from the
+# latest stored state instead of starting again from noise
+CHECKPOINT_SETTINGS = {
+    'directory': Path(os.environ.get('CHECKPOINT_DIR', BASE_DIR / "checkpoints")),
+    'disk_budget_mb': int(os.environ.get('CHECKPOINT_DISK_MB', 1024)),  # 0 disables
+}
+
 # Default values for texture generation
 # These came from experimentation in the original November prototype
 TEXTURE_DEFAULTS = {
@@ -43,6 +95,180 @@ SIMULATION_PARAMS = {
     'random_seed': 42         # For reproducible results during development
 }
 
+# Overrides of SIMULATION_PARAMS that form a stable labyrinth pattern from
+# the default noise (the defaults decay to a uniform state); benchmarks and
+# tests use them to compare solvers on a field that keeps its structure
+PATTERN_PARAMS = {'D_a': 0.16, 'D_b': 0.08, 'feed_rate': 0.075, 'kill_rate': 0.06}
+
+# Numerical solvers (see services/simulation.py)
+# 'explicit' is the reference finite-difference scheme; 'spectral' treats
+# diffusion implicitly in Fourier space and tolerates much larger time steps
+SOLVER_SETTINGS = {
+    'default': 'explicit',
+    'available': ['explicit', 'spectral'],
+    'explicit_max_delta_t': 1.0,
+    'spectral_max_delta_t': 50.0,
+}
+
+# Implementations of the explicit solver (see services/backends.py)
+# "backend" in a request overrides the default; a backend whose optional
+# package (scipy, numba) is missing falls back to the default, then numpy
+BACKEND_SETTINGS = {
+    'default': os.environ.get('SIMULATION_BACKEND', 'numpy'),
+    'available': ['numpy', 'scipy', 'numba'],
+}
+
+# Floating point type of the simulated fields ("precision" in a request)
+# float32 halves the memory of every grid, and the memory traffic of the
+# explicit solver (about 2x its speed on large grids); rendered patterns
+# match float64 closely (see benchmarks/bench_precision.py). numpy's float32
+# FFT is barely faster than its float64 one (slower at some sizes), so
+# spectral runs default to float64.
+# Queued jobs (POST /jobs), which render final textures, default to 'reference'
+PRECISION_SETTINGS = {
+    'interactive': {'explicit': 'float32', 'spectral': 'float64'},  # Default per solver
+    'reference': 'float64',
+    'available': ['float32', 'float64'],
+}
+
+# Early termination once the pattern stops changing ("tolerance" in a request)
+# The run stops when the largest change of A and B per unit of simulated time,
+# sampled every `interval` steps, falls below the tolerance; 0 disables it.
+# Off by default, so a request runs to t_max unless it opts in (e.g. 1e-6)
+CONVERGENCE_SETTINGS = {
+    'tolerance': 0.0,         # Default tolerance (max change per time unit)
+    'max_tolerance': 1e-2,    # Largest tolerance a request may ask for
+    'interval': 100,          # Steps between samples
+    'norm': 'inf',            # 'inf' (largest cell change) or 'l2' (RMS change)
+}
+
+# Coarse-to-fine warm start ("multigrid": true in a request)
+# Most steps run on a grid `factor` times coarser, then the fields are
+# upsampled and refined at full resolution for the last part of the run
+PYRAMID_SETTINGS = {
+    'factor': 4,              # Coarsening factor (halved until it divides the size)
+    'refine_fraction': 0.1,   # Share of the steps simulated at full resolution
+    'min_coarse_size': 32,    # Never coarsen below this grid size
+}
+
+# Limits for batched generation (/calculate/batch)
+# All variants of a batch share one (N, size, size) simulation array
+BATCH_SETTINGS = {
+    'max_variants': 16,       # Upper bound on textures per batch request
+    'chunk_cells': 65536,     # Grid cells stacked per pass; larger stacks fall
+                              # out of CPU cache and lose more than they save
+}
+
+# Time-lapse exports of one simulation run (/calculate/animation)
+# Frames are encoded while the simulation runs (see services/animation.py)
+ANIMATION_FORMATS = {
+    'webp': {'extension': '.webp', 'mimetype': 'image/webp'},
+    'gif': {'extension': '.gif', 'mimetype': 'image/gif'},
+    'zip': {'extension': '.zip', 'mimetype': 'application/zip'},  # Numbered PNG frames
+}
+
+ANIMATION_SETTINGS = {
+    'format': 'webp',         # Default of "animation_format"
+    'frames': 50,             # Frames captured when no frame_interval is given
+    'max_frames': 600,        # Most frames one animation may have
+    'frame_size': 256,        # Default frame edge in pixels (at most the texture size)
+    'min_frame_size': 16,
+    'frame_duration': 80,     # Milliseconds per frame (GIF rounds to 10 ms)
+    'quality': 80,            # WebP frame quality (1 - 100)
+    'queue_frames': 4,        # Frames waiting for the encoder before the simulation pauses
+    'spool_mb': 16,           # WebP frames kept in memory before spilling to a temp file
+}
+
+# Asynchronous job queue for long simulations (POST /jobs, GET /jobs/<id>)
+# Jobs run in a process pool so they bypass the GIL and the request thread
+JOB_SETTINGS = {
+    'max_workers': int(os.environ.get('JOB_WORKERS', max(1, (os.cpu_count() or 2) // 2))),
+    'max_pending': int(os.environ.get('JOB_QUEUE_DEPTH', 32)),  # Waiting jobs before 503
+    'result_ttl': 3600,       # Seconds a finished job stays queryable
+    'sync_max_cell_steps': 512 * 512 * 2000,  # Largest job /calculate runs inline
+}
+
+# Multi-core stepping of large grids (see services/tiled_simulation.py)
+# The explicit solver splits grids of at least min_cells into horizontal
+# strips, one worker process each; fields live in shared memory (/dev/shm).
+# Every job worker may tile at once, so by default they share the CPUs
+TILING_SETTINGS = {
+    'workers': int(os.environ.get('TILE_WORKERS',  # Per job; 1 disables tiling
+                                  max(1, (os.cpu_count() or 1) // JOB_SETTINGS['max_workers']))),
+    'min_cells': 1024 * 1024, # Smaller grids finish before the workers pay off
+    'halo': 4,                # Rows exchanged per strip edge = steps between exchanges
+}
+
+# Cost estimates and admission control (see services/cost_model.py)
+# Requests over a per-request limit, or arriving while the estimated work in
+# flight exceeds cpu_budget_seconds, get 429 or are downgraded to a preview
+# ("over_budget" in a request); queued jobs run shortest-first
+COST_SETTINGS = {
+    'calibration_file': Path(os.environ.get('COST_MODEL_FILE', BASE_DIR / "build" / "cost_model.json")),
+    'rates': {                # CPU-seconds per cell-step (spectral: per cell-step and log2(cells))
+        'explicit/numpy': 1.5e-8,
+        'explicit/scipy': 3.1e-8,
+        'explicit/numba': 2.5e-9,
+        'spectral': 2.5e-9,
+        'explicit/numpy/float32': 7.5e-9,
+        'explicit/scipy/float32': 2.3e-8,
+        'explicit/numba/float32': 1.4e-9,
+        'spectral/float32': 2.3e-9,
+    },
+    'encode_rate': 2e-7,      # CPU-seconds per encoded pixel
+    'overhead': 0.01,         # CPU-seconds of every generated texture
+    'bytes_per_cell': {       # Peak memory per grid cell while simulating
+        'explicit': {'float64': 48, 'float32': 24},
+        'blocked': {'float64': 32, 'float32': 16},  # Explicit numpy run in blocks of rows
+        'spectral': {'float64': 64, 'float32': 44},
+    },
+    'image_bytes_per_cell': 28,  # Colorizing, besides the final fields
+    'block_rows': 64,         # Rows per block of a 'blocked' run
+    'base_memory_mb': 8,
+    'smoothing': 0.2,         # Weight of each observed run in the calibrated rates
+    'max_cpu_seconds': float(os.environ.get('MAX_REQUEST_CPU_SECONDS', 3600)),
+    'max_memory_mb': float(os.environ.get('MAX_REQUEST_MEMORY_MB', 2048)),
+    'cpu_budget_seconds': float(os.environ.get('CPU_BUDGET_SECONDS', 1800)),  # Work in flight
+    'over_budget': 'reject',  # Default of "over_budget": 'reject' (429) or 'preview'
+    'preview_size': 128,      # Size of downgraded previews
+    'retry_after_max': 300,   # Upper bound of the Retry-After hint in seconds
+}
+
+# Precomputed previews of the parameter space (see services/preview_atlas.py)
+# Built by `flask build-previews`; GET /preview answers slider changes from it
+PREVIEW_ATLAS_SETTINGS = {
+    'directory': Path(os.environ.get('PREVIEW_ATLAS_DIR', BASE_DIR / "build" / "previews")),
+    'size': 128,              # Edge of each preview in pixels
+    'texture_size': DEFAULT_TEXTURE_SIZE,  # Texture a preview stands in for (sets diffusion scaling)
+    'delta_t': 1.0,           # Time step of the preview simulations
+    't_max': (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000),  # Snapshots of one run
+    'feed_rate': (0.015, 0.025, 0.035, 0.045, 0.055, 0.065),
+    'kill_rate': (0.045, 0.05, 0.055, 0.06, 0.065, 0.07),
+    'max_age': 3600,          # Cache-Control max-age of preview responses
+}
+
+# Progressive previews streamed over Server-Sent Events (/calculate/stream)
+STREAM_SETTINGS = {
+    'frame_interval': 200,    # Default simulation steps between preview frames
+    'preview_size': 128,      # Longest edge of preview frames in pixels
+    'jpeg_quality': 70,       # Preview JPEG quality (1 - 95)
+}
+
+# Instrumentation (see services/metrics.py), exported at GET /metrics
+METRICS_SETTINGS = {
+    'server_timing': True,    # Add a Server-Timing header to API responses
+    'phase_buckets': (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+    'request_buckets': (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+}
+
+# Ranges accepted for per-variant overrides of SIMULATION_PARAMS
+SIMULATION_PARAM_RANGES = {
+    'D_a': (0.001, 1.0),
+    'D_b': (0.001, 1.0),
+    'feed_rate': (0.0, 0.1),
+    'kill_rate': (0.0, 0.1),
+}
+
 # 3D Shell Model definitions for visualization
 # Maps shell type names to their respective OBJ file paths
 SHELL_MODELS = {
@@ -54,6 +280,26 @@ SHELL_MODELS = {
     'whelk': 'Whelk/Whelk.obj'
 }
 
+# Binary meshes built from SHELL_MODELS (see services/mesh_assets.py)
+# Built by `flask build-meshes`, or on the first request for a model
+MESH_SETTINGS = {
+    'directory': Path(os.environ.get('MESH_BUILD_DIR', BASE_DIR / "build" / "meshes")),
+    'max_age': 86400,         # Cache-Control max-age; clients revalidate by ETag after
+    'gzip_level': 9,          # Compression happens once at build time, so use the best
+    'brotli_quality': 11,     # Only used if the brotli package is installed
+    'lod_triangles': (16000, 4000, 1000),  # Budgets of ?lod=1, 2, 3 (0 = full mesh)
+}
+
+# Process startup
+# Heavy modules (NumPy, Pillow, the simulation) load on first use. With PREWARM
+# set, create_app loads them and runs a tiny simulation before serving, so cold
+# instances answer their first request at warm latency
+STARTUP_SETTINGS = {
+    'prewarm': os.environ.get('PREWARM', '').strip().lower() in ('1', 'true', 'yes', 'on'),
+    'prewarm_size': 64,       # Grid of the warm-up simulation
+    'prewarm_steps': 20,      # Steps per solver
+}
+
 # Flask application configuration classes
 # Different settings for development, testing, and production deployment
 class Config:
@@ -4,15 +4,236 @@ API Routes - JSON endpoint handlers for texture generation
 Handles all AJAX requests and returns JSON responses for the texture generator.
 Provides endpoints for mathematical pattern generation algorithms.
 """
-from flask import Blueprint, request, jsonify, url_for
-from services.texture_generator import TextureGeneratorService
-from utils.helpers import validate_texture_params
+import io
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from flask import Blueprint, Response, g, request, jsonify, url_for, abort, make_response, stream_with_context
+from config import (CACHE_SETTINGS, JOB_SETTINGS, STREAM_SETTINGS, METRICS_SETTINGS, IMAGE_FORMATS,
+                    ANIMATION_FORMATS, COST_SETTINGS, PREVIEW_ATLAS_SETTINGS, PRECISION_SETTINGS)
+from services.texture_cache import is_valid_key
+from services.job_queue import JobQueue, QueueFullError, FINISHED
+from services.metrics import (REGISTRY, REQUEST_SECONDS, Gauge, Counter, timed,
+                              collect_timings, finish_timings, server_timing_header)
+from utils.helpers import (validate_texture_params, validate_batch_params, validate_animation_params,
+                           validate_simulation_params, clamp, parse_bool)
 
 # Create Blueprint for API routes organization
 api = Blueprint('api', __name__)
 
-# Initialize texture generation service
-texture_service = TextureGeneratorService()
+# Texture generation service, created on first use (see get_texture_service)
+texture_service = None
+_service_lock = threading.Lock()
+
+# Background queue for long simulations (worker processes start lazily);
+# the run times its workers observe calibrate this process's cost model
+job_queue = JobQueue(
+    max_workers=JOB_SETTINGS['max_workers'],
+    max_pending=JOB_SETTINGS['max_pending'],
+    result_ttl=JOB_SETTINGS['result_ttl'],
+    on_observations=lambda observations: get_texture_service().cost_model.replay(observations)
+)
+
+# Estimated CPU-seconds of synchronous generations running in this process
+# (queued jobs are accounted for by the job queue)
+_sync_work = 0.0
+_sync_work_lock = threading.Lock()
+
+# Values owned by the cache, checkpoint store and queue are read at export time
+REGISTRY.register(Counter(
+    'texture_cache_lookups_total', 'Cache and checkpoint lookups by store and result.',
+    labels=('store', 'result'),
+    callback=lambda: {
+        (store, result): stats[field]
+        for store, stats in _store_stats()
+        for result, field in (('hit', 'hits'), ('miss', 'misses'))
+    }))
+REGISTRY.register(Gauge(
+    'texture_cache_hit_ratio', 'Share of lookups served from a store since startup.',
+    labels=('store',),
+    callback=lambda: {
+        (store,): stats['hits'] / max(1, stats['hits'] + stats['misses'])
+        for store, stats in _store_stats()
+    }))
+REGISTRY.register(Counter(
+    'texture_requests_coalesced_total',
+    'Generations that waited for an identical one in flight, by where it ran.',
+    labels=('scope',),
+    callback=lambda: {(scope,): stats[scope] for stats in _flight_stats() for scope in ('thread', 'process')}))
+REGISTRY.register(Gauge(
+    'texture_jobs', 'Jobs known to the queue by state (queued and running are in flight).',
+    labels=('state',),
+    callback=lambda: {(state,): count for state, count in job_queue.stats().items()}))
+
+def get_texture_service():
+    """
+    The texture generation service, created on first use.
+    
+    Importing the service loads NumPy, Pillow and the simulation modules and
+    scans the texture cache, so it is deferred until a request needs it (or
+    prewarm() runs) instead of slowing down every process start.
+    """
+    global texture_service
+    if texture_service is None:
+        with _service_lock:
+            if texture_service is None:
+                from services.texture_generator import TextureGeneratorService
+                texture_service = TextureGeneratorService()
+    return texture_service
+
+def _store_stats():
+    """(store, stats) of the cache and checkpoints; empty until the service exists."""
+    if texture_service is None:
+        return []
+    return [('textures', texture_service.cache.stats()),
+            ('checkpoints', texture_service.checkpoints.stats())]
+
+def _flight_stats():
+    """Coalescing counters of the service; empty until it exists or if disabled."""
+    if texture_service is None or texture_service.flights is None:
+        return []
+    return [texture_service.flights.stats()]
+
+def prewarm():
+    """
+    Create the service and run its warm-up (see TextureGeneratorService.prewarm).
+    
+    Returns:
+        float: Seconds taken
+    """
+    start = time.perf_counter()
+    get_texture_service().prewarm()
+    return time.perf_counter() - start
+
+@contextmanager
+def _counted_work(estimate):
+    """Count a synchronous generation's estimate as work in flight while it runs."""
+    global _sync_work
+    with _sync_work_lock:
+        _sync_work += estimate['cpu_seconds']
+    try:
+        yield
+    finally:
+        with _sync_work_lock:
+            _sync_work -= estimate['cpu_seconds']
+
+def _over_budget(estimate):
+    """
+    Check an estimate against the per-request limits and the work in flight.
+    
+    A request may exceed the shared budget on an idle server, so one large
+    job can still run; it just has to wait for a quiet moment.
+    
+    Returns:
+        tuple: (reason, retry_after seconds or None), or None if it may run
+    """
+    if estimate['cpu_seconds'] > COST_SETTINGS['max_cpu_seconds']:
+        return (f"Estimated {estimate['cpu_seconds']:.0f} CPU-seconds exceeds the limit of "
+                f"{COST_SETTINGS['max_cpu_seconds']:g}", None)
+    if estimate['memory_mb'] > COST_SETTINGS['max_memory_mb']:
+        return (f"Estimated {estimate['memory_mb']:.0f} MB of memory exceeds the limit of "
+                f"{COST_SETTINGS['max_memory_mb']:g} MB", None)
+    load = job_queue.load() + _sync_work
+    excess = load + estimate['cpu_seconds'] - COST_SETTINGS['cpu_budget_seconds']
+    if load > 0 and excess > 0:
+        # Workers drain about max_workers CPU-seconds of queued work per second
+        retry_after = clamp(math.ceil(excess / JOB_SETTINGS['max_workers']), 1, COST_SETTINGS['retry_after_max'])
+        return 'Server is at its compute budget, try again later', int(retry_after)
+    return None
+
+def _preview_params(params):
+    """
+    Downgraded parameters of the "preview" policy.
+    
+    The edge shrinks to COST_SETTINGS['preview_size'], and t_max is cut so
+    the preview stays within JOB_SETTINGS['sync_max_cell_steps']: a preview
+    is always small enough to run synchronously.
+    """
+    size = min(params['size'], COST_SETTINGS['preview_size'])
+    max_steps = max(1, JOB_SETTINGS['sync_max_cell_steps'] // (size * size))
+    t_max = min(params['t_max'], max_steps * params['delta_t'])
+    return {**params, 'size': size, 't_max': t_max}
+
+def _admit(service, params, policy='reject', from_start=False):
+    """
+    Admission control: estimate a validated request and decide whether it runs.
+    
+    Over budget, the "preview" policy retries with _preview_params before
+    giving up.
+    
+    Args:
+        service: Texture generation service
+        params: Normalized request parameters
+        policy: "reject" or "preview" (see _over_budget_policy)
+        from_start: Cost the whole run, ignoring cache and checkpoints
+        
+    Returns:
+        tuple: (params, estimate, None) to run, where params may be the
+               preview's and the estimate then has "preview": true,
+               "requested_size" and "requested_t_max"; or
+               (None, estimate, response) with the 429 response to send
+    """
+    estimate = service.estimate_cost(params, from_start=from_start)
+    verdict = _over_budget(estimate)
+    if verdict is None:
+        return params, estimate, None
+    
+    if policy == 'preview':
+        preview = _preview_params(params)
+        if preview != params:
+            preview_estimate = service.estimate_cost(preview, from_start=from_start)
+            if _over_budget(preview_estimate) is None:
+                return preview, {**preview_estimate, 'preview': True, 'requested_size': params['size'],
+                                 'requested_t_max': params['t_max']}, None
+    
+    return None, estimate, _rejection(estimate, verdict)
+
+def _rejection(estimate, verdict):
+    """429 response for an _over_budget verdict."""
+    reason, retry_after = verdict
+    response = jsonify({'error': reason, 'estimate': estimate})
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response, 429
+
+def _over_budget_policy(data):
+    """Validated "over_budget" of a request: "reject" (429) or "preview" (downgrade)."""
+    policy = str(data.get('over_budget', COST_SETTINGS['over_budget'])).lower()
+    if policy not in ('reject', 'preview'):
+        raise ValueError('over_budget must be "reject" or "preview"')
+    return policy
+
+def texture_url(result, field='key'):
+    """Absolute URL of a generated texture ('key') or mip atlas ('mip_key'), from a generation result."""
+    extension = IMAGE_FORMATS[result['format']]['extension']
+    return url_for('api.texture', key=result[field], extension=extension.lstrip('.'), _external=True)
+
+def texture_fields(result):
+    """Response fields locating the images of a generation result."""
+    fields = {'image_url': texture_url(result), 'tileable': result['tileable']}
+    if result['mip_key'] is not None:
+        fields['mipmap_url'] = texture_url(result, 'mip_key')
+        fields['mipmaps'] = result['mipmaps']
+    return fields
+
+@api.before_request
+def start_timing():
+    """Start per-request phase timing."""
+    g.request_started = time.perf_counter()
+    g.timing_token = collect_timings()
+
+@api.after_request
+def finish_timing(response):
+    """Record request latency and expose phase timings as Server-Timing."""
+    elapsed = time.perf_counter() - g.request_started
+    timings = finish_timings(g.timing_token)
+    REQUEST_SECONDS.observe(elapsed, endpoint=request.endpoint or 'unknown',
+                            method=request.method, status=response.status_code)
+    if METRICS_SETTINGS['server_timing']:
+        response.headers['Server-Timing'] = server_timing_header(timings, elapsed)
+    return response
 
 @api.route('/calculate', methods=['POST'])
 def calculate():
@@ -25,13 +246,51 @@ def calculate():
         "t_max": float,     # Maximum simulation time
         "delta_t": float,   # Time step size
         "color1": string,   # Base color (hex format)
-        "color2": string    # Contrast color (hex format)
+        "color2": string,   # Contrast color (hex format)
+        "solver": string,   # Optional: "explicit" (default) or "spectral"
+        "size": int,        # Optional: texture edge in pixels (default 512)
+        "multigrid": bool,  # Optional: coarse-to-fine warm start for large sizes
+        "tolerance": float, # Optional: stop once the pattern changes less than
+                            # this per time unit (default 0: run to t_max)
+        "format": string,   # Optional: "png" (default), "webp" or "jpeg"
+        "quality": int,     # Optional: webp/jpeg quality (1 - 100)
+        "compress_level": int, # Optional: png compression (0 fastest - 9 smallest)
+        "tileable": bool,   # Optional: keep edges seamless (png, or lossless webp)
+        "mipmaps": bool,    # Optional: also build a mip pyramid atlas
+        "mip_filter": string, # Optional: "box" (default) or "lanczos"
+        "backend": string,  # Optional: "numpy", "scipy" or "numba" (explicit solver)
+        "precision": string, # Optional: "float32" or "float64" (default per
+                            # solver: PRECISION_SETTINGS['interactive'])
+        "over_budget": string, # Optional: "reject" (429) or "preview" (generate
+                            # at COST_SETTINGS['preview_size'] instead, with
+                            # t_max cut to fit the synchronous limit)
+        "inline": bool      # Optional: respond with the image itself
     }
     
+    Runs synchronously, so it only accepts jobs up to
+    JOB_SETTINGS['sync_max_cell_steps']; larger ones get 413 and should be
+    submitted through POST /jobs instead. Requests over the compute budget
+    (see _over_budget) get 429 with the estimate, and a Retry-After header
+    when waiting would help. Explicit numpy runs over the memory limit are
+    first estimated, and run, in blocks of rows with less scratch memory.
+    
     Returns:
     {
-        "image_url": string  # URL to generated texture image
+        "image_url": string, # Immutable, content-addressed texture URL
+        "tileable": bool,    # True if the image tiles without seams
+        "mipmap_url": string, # With mipmaps: atlas of the base image and all levels
+        "mipmaps": [[x, y, width, height], ...], # With mipmaps: level rectangles
+                             # in the atlas, base first, down to 1x1
+        "cached": bool,      # True if an identical texture was reused
+        "steps": int,        # Simulation steps executed for this request
+        "stop_reason": string, # "t_max", "converged" or "cached"
+        "estimate": {...}    # Predicted cost, as returned by POST /estimate
     } or {"error": string}
+    
+    With "inline": true the response body is the encoded image instead,
+    with the JSON fields above in X-Texture-Url, X-Mipmap-Url,
+    X-Texture-Cached, X-Simulation-Steps and X-Stop-Reason headers. The image is still
+    cached, so the URL stays valid and repeated requests are free.
     """
     try:
         # Extract and validate request data
@@ -40,25 +299,558 @@ def calculate():
             return jsonify({'error': 'No data provided'}), 400
         
         # Validate mathematical parameters using helper function
-        validation_result = validate_texture_params(data)
+        with timed('validate'):
+            validation_result = validate_texture_params(data)
         if not validation_result['valid']:
             return jsonify({'error': validation_result['error']}), 400
+        try:
+            inline = parse_bool(data.get('inline', False))
+            policy = _over_budget_policy(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         params = validation_result['params']
+        service = get_texture_service()
+        
+        # Refuse (or shrink to a preview) what the server cannot afford now
+        with timed('admit'):
+            params, estimate, rejection = _admit(service, params, policy)
+        if rejection is not None:
+            return rejection
         
-        # Generate texture using activator-inhibitor model
-        image_path = texture_service.generate_activator_inhibitor(
-            K=params['K'],
-            t_max=params['t_max'],
-            delta_t=params['delta_t'],
-            color1=params['color1'],
-            color2=params['color2']
-        )
+        # Long simulations would hold this worker for minutes; send them to the queue
+        # (cached images and runs resumed from a checkpoint may be short enough)
+        cell_steps = params['size'] ** 2 * service.steps_to_run(params)
+        if cell_steps > JOB_SETTINGS['sync_max_cell_steps']:
+            return jsonify({'error': 'Simulation too long for a synchronous request, use POST /jobs'}), 413
+        
+        # Generate texture using activator-inhibitor model (cached by content)
+        with _counted_work(estimate):
+            result = service.generate_texture(params)
         
         # Return generated image URL for client consumption
-        image_url = url_for('static', filename='images/activator_inhibitor_texture.png', _external=True)
-        return jsonify({'image_url': image_url})
+        image_url = texture_url(result)
+        if inline:
+            return _inline_texture(result, image_url)
+        return jsonify({
+            **texture_fields(result),
+            'cached': result['cached'],
+            'steps': result['steps'],
+            'stop_reason': result['stop_reason'],
+            'estimate': estimate
+        })
     
     except Exception as e:
         # Log error and return user-friendly message
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+def _inline_texture(result, image_url):
+    """
+    Respond with the encoded image of a generation result.
+    
+    The bytes come from the cache's memory tier that generate_texture just
+    filled, so no file is read back for the response.
+    """
+    spec = IMAGE_FORMATS[result['format']]
+    image_data = get_texture_service().cache.get(result['key'], spec['extension'])
+    if image_data is None:
+        return jsonify({'error': 'Texture was evicted before it could be returned'}), 500
+    
+    response = make_response(image_data)
+    response.mimetype = spec['mimetype']
+    response.set_etag(result['key'])
+    response.headers['X-Texture-Url'] = image_url
+    if result['mip_key'] is not None:
+        response.headers['X-Mipmap-Url'] = texture_url(result, 'mip_key')
+    response.headers['X-Texture-Cached'] = 'true' if result['cached'] else 'false'
+    response.headers['X-Simulation-Steps'] = str(result['steps'])
+    response.headers['X-Stop-Reason'] = result['stop_reason']
+    return response
+
+@api.route('/calculate/batch', methods=['POST'])
+def calculate_batch():
+    """
+    Generate several texture variants in one batched simulation.
+    
+    Expected JSON payload:
+    {
+        "variants": [           # 1 - BATCH_SETTINGS['max_variants'] entries
+            {
+                "K", "t_max", "delta_t", "color1", "color2",  # as /calculate
+                "D_a": float,           # Optional overrides of the
+                "D_b": float,           # configured SIMULATION_PARAMS
+                "feed_rate": float,
+                "kill_rate": float,
+                "random_seed": int
+            },
+            ...
+        ],
+        ...                     # Top-level fields are shared defaults
+    }
+    
+    The whole batch is admitted or refused (429) against the compute
+    budget by the sum of its variants' estimates. It runs synchronously,
+    so the JOB_SETTINGS['sync_max_cell_steps'] limit of /calculate applies
+    to the sum over its variants (413); larger batches should submit their
+    variants through POST /jobs.
+    
+    Returns:
+    {
+        "image_urls": [string], # One URL per variant, in request order
+        "mipmap_urls": [string] # Only if a variant asked for mipmaps; null
+                                # for the variants that did not
+    } or {"error": string} with 400, 413 or 429
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        with timed('validate'):
+            validation_result = validate_batch_params(data)
+        if not validation_result['valid']:
+            return jsonify({'error': validation_result['error']}), 400
+        
+        variants = validation_result['variants']
+        service = get_texture_service()
+        with timed('admit'):
+            estimates = [service.estimate_cost(variant) for variant in variants]
+            estimate = {
+                'cpu_seconds': round(sum(e['cpu_seconds'] for e in estimates), 4),
+                'memory_mb': max(e['memory_mb'] for e in estimates),  # Stacks run one at a time
+                'steps': sum(e['steps'] for e in estimates),
+            }
+            verdict = _over_budget(estimate)
+        if verdict is not None:
+            return _rejection(estimate, verdict)
+        
+        # Cached variants and resumed checkpoints count only the steps left
+        cell_steps = sum(variant['size'] ** 2 * e['steps'] for variant, e in zip(variants, estimates))
+        if cell_steps > JOB_SETTINGS['sync_max_cell_steps']:
+            return jsonify({'error': 'Batch too long for a synchronous request, submit its variants to POST /jobs'}), 413
+        
+        with _counted_work(estimate):
+            results = service.generate_activator_inhibitor_batch(variants)
+        
+        response = {'image_urls': [texture_url(result) for result in results]}
+        if any(result['mip_key'] is not None for result in results):
+            response['mipmap_urls'] = [
+                texture_url(result, 'mip_key') if result['mip_key'] is not None else None
+                for result in results
+            ]
+        return jsonify(response)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/calculate/stream', methods=['GET'])
+def calculate_stream():
+    """
+    Generate a texture while streaming progressive previews (Server-Sent Events).
+    
+    Parameters are passed in the query string (EventSource only issues GET
+    requests) with the same names as the /calculate payload (including
+    "over_budget"), plus an optional "frame_interval" (simulation steps
+    between previews).
+    
+    The simulation runs in this web process, so the
+    JOB_SETTINGS['sync_max_cell_steps'] limit of /calculate applies (413);
+    longer runs belong in POST /jobs.
+    
+    Event stream:
+        event: frame   data: {"step": int, "total": int, "image": data URL}
+        event: result  data: {"image_url": string, "cached": bool,
+                              "steps": int, "stop_reason": string,
+                              "estimate": object,
+                              "tileable", "mipmap_url", "mipmaps" as in /calculate}
+        event: failed  data: {"error": string}
+    
+    Returns:
+        text/event-stream response, or {"error": string} with 400 or 413,
+        or {"error": string, "estimate": object} with 429
+    """
+    with timed('validate'):
+        validation_result = validate_texture_params(request.args)
+    if not validation_result['valid']:
+        return jsonify({'error': validation_result['error']}), 400
+    
+    try:
+        frame_interval = int(request.args.get('frame_interval', STREAM_SETTINGS['frame_interval']))
+    except ValueError:
+        return jsonify({'error': 'frame_interval must be an integer'}), 400
+    try:
+        policy = _over_budget_policy(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    service = get_texture_service()
+    with timed('admit'):
+        params, estimate, rejection = _admit(service, validation_result['params'], policy)
+    if rejection is not None:
+        return rejection
+    
+    cell_steps = params['size'] ** 2 * service.steps_to_run(params)
+    if cell_steps > JOB_SETTINGS['sync_max_cell_steps']:
+        return jsonify({'error': 'Simulation too long for a synchronous request, use POST /jobs'}), 413
+    
+    from services.preview_stream import PreviewStream
+    stream = PreviewStream(
+        service, params,
+        frame_interval=int(clamp(frame_interval, 1, 100000)),
+        preview_size=STREAM_SETTINGS['preview_size'],
+        quality=STREAM_SETTINGS['jpeg_quality']
+    )
+    
+    def generate():
+        with _counted_work(estimate):
+            for event, payload in stream.events():
+                if event == 'result':
+                    payload = {
+                        **texture_fields(payload),
+                        'cached': payload['cached'],
+                        'steps': payload['steps'],
+                        'stop_reason': payload['stop_reason'],
+                        'estimate': estimate
+                    }
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+@api.route('/calculate/animation', methods=['GET'])
+def calculate_animation():
+    """
+    Export a time-lapse of the pattern forming, from one simulation run.
+    
+    Parameters are passed in the query string (so the URL works as a plain
+    download link) with the same names as the /calculate payload, plus:
+        animation_format: "webp" (default), "gif" or "zip" (numbered PNG
+                          frames and a frames.json listing their steps)
+        frame_interval: Simulation steps between frames (default: the run
+                        divided into ANIMATION_SETTINGS['frames'] frames)
+        frame_size: Frame edge in pixels (default 256, at most "size")
+        frame_duration: Milliseconds each frame is shown (default 80)
+    
+    The simulation always starts from the initial state and runs to t_max
+    ("tolerance" is ignored), so X-Frame-Count, sent before the first
+    frame, is the number of frames that follow. Frames are encoded and
+    sent while it runs. The final texture is cached as with /calculate.
+    Runs synchronously, so the JOB_SETTINGS['sync_max_cell_steps'] limit
+    of /calculate applies (413). Requests over the compute budget are
+    refused (429); a smaller preview would not be the animation asked for.
+    
+    Returns:
+        Streamed animation with X-Frame-Count and X-Texture-Url headers,
+        or {"error": string} with 400 or 413, or {"error": string,
+        "estimate": object} with 429
+    """
+    with timed('validate'):
+        validation_result = validate_texture_params(request.args)
+        if validation_result['valid']:
+            animation_result = validate_animation_params(request.args, validation_result['params'])
+    if not validation_result['valid']:
+        return jsonify({'error': validation_result['error']}), 400
+    if not animation_result['valid']:
+        return jsonify({'error': animation_result['error']}), 400
+    
+    # Early termination would end the animation short of its announced frame count
+    params = {**validation_result['params'], 'tolerance': 0.0}
+    animation = animation_result['params']
+    steps = int(params['t_max'] / params['delta_t'])
+    if params['size'] ** 2 * steps > JOB_SETTINGS['sync_max_cell_steps']:
+        return jsonify({'error': 'Simulation too long for a synchronous request'}), 413
+    
+    service = get_texture_service()
+    with timed('admit'):
+        params, estimate, rejection = _admit(service, params, 'reject', from_start=True)
+    if rejection is not None:
+        return rejection
+    
+    from services.animation import AnimationStream
+    stream = AnimationStream(
+        service, params, animation['animation_format'],
+        frame_interval=animation['frame_interval'],
+        frame_size=animation['frame_size'],
+        frame_duration=animation['frame_duration']
+    )
+    
+    spec = ANIMATION_FORMATS[animation['animation_format']]
+    info = service.describe(params)
+    
+    def chunks():
+        with _counted_work(estimate):
+            yield from stream.chunks()
+    
+    response = Response(stream_with_context(chunks()), mimetype=spec['mimetype'])
+    response.headers['Content-Disposition'] = f"attachment; filename=timelapse-{info['key']}{spec['extension']}"
+    response.headers['X-Frame-Count'] = str(animation['frames'])
+    response.headers['X-Texture-Url'] = texture_url(info)
+    response.headers['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+@api.route('/preview', methods=['GET'])
+def preview():
+    """
+    Instant low-resolution preview from the precomputed atlas.
+    
+    Parameters are passed in the query string with the same names as the
+    /calculate payload, plus optional "feed_rate" and "kill_rate"
+    (default SIMULATION_PARAMS). The nearest preview of the atlas built by
+    `flask build-previews` (see services/preview_atlas.py) is colored
+    with color1/color2; nothing is simulated.
+    
+    Returns:
+        PNG image with the grid point it shows in X-Preview-T-Max,
+        X-Preview-Feed-Rate and X-Preview-Kill-Rate headers, or
+        {"error": string} with 400, or 404 if no atlas was built
+    """
+    with timed('validate'):
+        validation_result = validate_texture_params(request.args)
+        if validation_result['valid']:
+            params = validation_result['params']
+            validation_result = validate_simulation_params(request.args, params['delta_t'], params['solver'])
+    if not validation_result['valid']:
+        return jsonify({'error': validation_result['error']}), 400
+    simulation = validation_result['params']
+    
+    from services.preview_atlas import get_atlas
+    try:
+        atlas = get_atlas()
+    except FileNotFoundError:
+        return jsonify({'error': 'Preview atlas not built, run flask build-previews'}), 404
+    
+    with timed('preview'):
+        rgb, point = atlas.render(params['t_max'], simulation['feed_rate'], simulation['kill_rate'],
+                                  params['color1'], params['color2'])
+    with timed('encode'):
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.fromarray(rgb).save(buffer, format='PNG', compress_level=1)
+    
+    response = make_response(buffer.getvalue())
+    response.mimetype = 'image/png'
+    response.headers['Cache-Control'] = f"public, max-age={PREVIEW_ATLAS_SETTINGS['max_age']}"
+    response.headers['X-Preview-T-Max'] = str(point['t_max'])
+    response.headers['X-Preview-Feed-Rate'] = str(point['feed_rate'])
+    response.headers['X-Preview-Kill-Rate'] = str(point['kill_rate'])
+    return response
+
+@api.route('/estimate', methods=['POST'])
+def estimate():
+    """
+    Predict the cost of a /calculate payload without running it.
+    
+    Accepts the same JSON payload as /calculate, so clients can warn
+    before submitting an expensive request.
+    
+    Returns:
+    {
+        "cpu_seconds": float, # Predicted CPU time (0 if cached)
+        "memory_mb": float,   # Predicted peak memory
+        "steps": int,         # Simulation steps still to run
+        "admission": string,  # "accept", "preview" (over budget, but a preview
+                              # fits) or "reject" under the current load
+        "reason": string,     # Why it is over budget, or null
+        "synchronous": bool,  # False if /calculate would answer 413 (use /jobs);
+                              # with "over_budget": "preview", for the preview
+        "preview_size": int   # Edge the "preview" policy would generate at
+    } or {"error": string} with 400
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    validation_result = validate_texture_params(data)
+    if not validation_result['valid']:
+        return jsonify({'error': validation_result['error']}), 400
+    try:
+        policy = _over_budget_policy(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    params = validation_result['params']
+    service = get_texture_service()
+    prediction = service.estimate_cost(params)
+    verdict = _over_budget(prediction)
+    admission = 'accept'
+    if verdict is not None:
+        preview, _, rejection = _admit(service, params, 'preview')
+        admission = 'reject' if rejection is not None else 'preview'
+        if admission == 'preview' and policy == 'preview':
+            params = preview  # What /calculate would actually run
+    cell_steps = params['size'] ** 2 * service.steps_to_run(params)
+    return jsonify({
+        'cpu_seconds': prediction['cpu_seconds'],
+        'memory_mb': prediction['memory_mb'],
+        'steps': prediction['steps'],
+        'admission': admission,
+        'reason': verdict[0] if verdict is not None else None,
+        'synchronous': cell_steps <= JOB_SETTINGS['sync_max_cell_steps'],
+        'preview_size': COST_SETTINGS['preview_size']
+    })
+
+@api.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a texture generation job for background processing.
+    
+    Accepts the same JSON payload as /calculate (including "over_budget"),
+    but "precision" defaults to PRECISION_SETTINGS['reference'] (float64):
+    queued jobs render final textures. Results that are already cached
+    complete immediately. Waiting jobs
+    start shortest estimate first, aged by their waiting time (see
+    services/job_queue.py).
+    
+    Returns:
+    {
+        "job_id": string,
+        "status_url": string, # Poll with GET for progress and result
+        "estimate": object    # As in /calculate
+    } with 202, or {"error": string} (400 invalid, 429 over the compute
+    budget with "estimate", 503 queue full)
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        with timed('validate'):
+            validation_result = validate_texture_params({'precision': PRECISION_SETTINGS['reference'], **data})
+        if not validation_result['valid']:
+            return jsonify({'error': validation_result['error']}), 400
+        
+        try:
+            policy = _over_budget_policy(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        service = get_texture_service()
+        with timed('admit'):
+            params, estimate, rejection = _admit(service, validation_result['params'], policy)
+        if rejection is not None:
+            return rejection
+        
+        info = service.describe(params)
+        cached = info if service.is_cached(info) else None
+        
+        try:
+            job_id = job_queue.submit(params, cached=cached, estimate=estimate)
+        except QueueFullError as e:
+            response = jsonify({'error': str(e)})
+            response.headers['Retry-After'] = '30'
+            return response, 503
+        
+        status_url = url_for('api.job_status', job_id=job_id, _external=True)
+        return jsonify({'job_id': job_id, 'status_url': status_url, 'estimate': estimate}), 202
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Report the state of a queued job.
+    
+    Returns:
+    {
+        "id": string,
+        "status": string,      # queued, running, finished, failed, cancelled
+        "progress": float,     # Fraction of simulation steps completed
+        "estimate": object,    # Predicted cost, as in /calculate
+        "image_url": string,   # Present once finished, with "tileable",
+                               # "mipmap_url", "mipmaps", "cached", "steps"
+                               # and "stop_reason" as in /calculate
+        "error": string        # Present if the job failed
+    } or {"error": string} with 404
+    """
+    info = job_queue.status(job_id)
+    if info is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    result = info.pop('result', None)
+    if info['status'] == FINISHED:
+        info.update(texture_fields(result))
+        info['cached'] = result['cached']
+        info['steps'] = result['steps']
+        info['stop_reason'] = result['stop_reason']
+    return jsonify(info)
+
+@api.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancel a queued or running job.
+    
+    Returns:
+        Current job state, 404 for unknown jobs or 409 if already completed
+    """
+    if job_queue.status(job_id) is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if not job_queue.cancel(job_id):
+        return jsonify({'error': 'Job already completed'}), 409
+    return jsonify(job_queue.status(job_id))
+
+@api.route('/stats', methods=['GET'])
+def stats():
+    """
+    Report cache, checkpoint and job queue counters of this process.
+    
+    Returns:
+    {
+        "textures": {...},     # Texture cache entries, bytes, hits, misses
+        "checkpoints": {...},  # Checkpoint entries, bytes, hits, misses
+        "coalescing": {...},   # Generations led, and requests that waited for
+                               # one in this process ("thread") or another ("process")
+        "cost_model": {...},   # Cost rates per solver kind, and the runs that refined them
+        "jobs": {...}          # Number of jobs per state
+    }
+    """
+    service = get_texture_service()
+    return jsonify({
+        'textures': service.cache.stats(),
+        'checkpoints': service.checkpoints.stats(),
+        'coalescing': service.flights.stats() if service.flights is not None else None,
+        'cost_model': service.cost_model.stats(),
+        'jobs': job_queue.stats()
+    })
+
+@api.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Export counters and histograms in the Prometheus text format.
+    
+    Includes per-phase generation timings, request latency, simulation
+    step rates, job durations and queue depth, and cache hit rates of
+    this process.
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@api.route('/textures/<key>.<extension>')
+def texture(key, extension):
+    """
+    Serve a generated texture by its content address.
+    
+    The URL of a texture changes whenever its pixels would, so responses
+    are marked immutable with a far-future Cache-Control and carry the key
+    as ETag for conditional requests.
+    
+    Args:
+        key: Texture key returned by the generation endpoints
+        extension: File extension of the image format (png, webp, jpg)
+        
+    Returns:
+        Image response, 304 if the client copy is current, or 404
+    """
+    spec = next((spec for spec in IMAGE_FORMATS.values() if spec['extension'] == f'.{extension}'), None)
+    if spec is None or not is_valid_key(key):
+        abort(404)
+    
+    image_data = get_texture_service().cache.get(key, spec['extension'])
+    if image_data is None:
+        abort(404)
+    
+    response = make_response(image_data)
+    response.mimetype = spec['mimetype']
+    response.set_etag(key)
+    response.headers['Cache-Control'] = f"public, max-age={CACHE_SETTINGS['max_age']}, immutable"
+    return response.make_conditional(request)
\ No newline at end of file
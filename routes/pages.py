@@ -7,7 +7,8 @@ show HTML to users (not API endpoints that return data).
 
 This follows Flask Blueprint pattern for better code organization.
 """
-from flask import Blueprint, render_template, send_from_directory
+from flask import Blueprint, render_template, send_from_directory, send_file, request, abort
+from config import SHELL_MODELS, MESH_SETTINGS
 
 # Create a Blueprint - think of it as a mini-app for organizing related routes
 # The 'pages' name helps Flask organize our URL routing
@@ -37,7 +38,9 @@ def activator_inhibitor():
     Returns:
         Rendered HTML template for the activator-inhibitor interface
     """
-    return render_template('activator_inhibitor.html')
+    # Imported on first use; mesh_assets pulls in NumPy, which cold starts should not pay for
+    from services import mesh_assets
+    return render_template('activator_inhibitor.html', mesh_levels=len(mesh_assets.lod_levels()))
 
 @pages.route('/assets/<path:filename>')
 def assets(filename):
@@ -53,4 +56,44 @@ def assets(filename):
     Returns:
         File response for the requested asset
     """
-    return send_from_directory('assets', filename)
\ No newline at end of file
+    return send_from_directory('assets', filename)
+
+@pages.route('/meshes/<model>')
+def mesh(model):
+    """
+    Serve a shell model as a compact binary mesh.
+    
+    The mesh is built from the model's OBJ on first use (or ahead of time
+    with `flask build-meshes`) together with gzip/brotli copies, and the
+    best copy the client accepts is sent as is with its Content-Encoding.
+    Responses carry an ETag and support conditional and range requests.
+    
+    Query parameters:
+        lod: Detail level, 0 (full mesh, default) up to
+             len(MESH_SETTINGS['lod_triangles']) (coarsest)
+    
+    Args:
+        model: Key of SHELL_MODELS (e.g. "pecten", "moon-snail")
+        
+    Returns:
+        Binary mesh response (layout in services/mesh_assets.py), or 404
+    """
+    from services import mesh_assets
+    lod = request.args.get('lod', 0, type=int)
+    if model not in SHELL_MODELS or lod not in mesh_assets.lod_levels():
+        abort(404)
+    try:
+        available = mesh_assets.build_mesh(model)[lod]
+    except FileNotFoundError:
+        abort(404)
+    
+    # Precompressed copies in order of preference
+    encoding = next((name for name in ('br', 'gzip')
+                     if name in available and request.accept_encodings[name]), 'identity')
+    
+    response = send_file(available[encoding], mimetype='application/octet-stream',
+                         conditional=True, etag=True, max_age=MESH_SETTINGS['max_age'])
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
\ No newline at end of file
@@ -0,0 +1,338 @@
+"""
+Time-lapse Animations - Frames of one simulation run, encoded as they arrive
+
+An animation request runs the simulation once, from the initial state, and
+captures a frame every frame_interval steps through the on_frame hook of
+TextureGeneratorService.generate_texture. As in services/preview_stream.py
+the simulation runs in a background thread:
+
+- the simulation thread colorizes the fields at each frame boundary,
+  scales the image to the frame size and puts it on a short queue; when
+  the queue is full the simulation waits, so at most
+  ANIMATION_SETTINGS['queue_frames'] raw frames exist at any time and no
+  frame is dropped
+- the consumer (the HTTP response) encodes frames as they arrive and
+  yields the encoded bytes
+
+Containers (ANIMATION_FORMATS):
+
+- gif: every frame is palettized on its own (local color table) and sent
+  as soon as it is encoded
+- zip: numbered PNG frames (frame_00000.png, ...) plus frames.json with
+  the step of every frame, each sent as soon as it is encoded
+- webp: a RIFF file starts with its total size, so compressed frames are
+  collected in a spooled temporary file (memory, then disk) and the file
+  is sent once the last frame is in
+
+The final texture is stored in the texture cache as a side effect, like
+any other generation.
+"""
+import io
+import json
+import queue
+import struct
+import tempfile
+import threading
+import zipfile
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+from PIL import Image
+
+from config import ANIMATION_FORMATS, ANIMATION_SETTINGS
+
+# Bytes per chunk when sending a spooled file
+_CHUNK_SIZE = 64 * 1024
+
+
+class StreamClosed(Exception):
+    """Raised inside the simulation thread once the consumer has gone away."""
+
+
+class GifWriter:
+    """Animated GIF written frame by frame."""
+
+    def __init__(self, size: int, frame_duration: int, loop: int = 0):
+        self.size = size
+        self.frame_duration = frame_duration
+        self.loop = loop
+        self._started = False
+
+    def add(self, image: Image.Image, step: int) -> bytes:
+        """Encode one frame; returns the bytes to send (header included first)."""
+        buffer = io.BytesIO()
+        image.quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, format='GIF')
+        frame = self._control_extension() + _gif_image_block(buffer.getvalue())
+        if self._started:
+            return frame
+        self._started = True
+        return self._header() + frame
+
+    def finish(self) -> Iterator[bytes]:
+        """Trailer (and the header, if no frame was added)."""
+        yield (b'' if self._started else self._header()) + b';'
+
+    def _header(self) -> bytes:
+        """Signature, screen descriptor without global colors, and loop extension."""
+        screen = struct.pack('<HHBBB', self.size, self.size, 0, 0, 0)
+        loop = b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', self.loop) + b'\x00'
+        return b'GIF89a' + screen + loop
+
+    def _control_extension(self) -> bytes:
+        """Graphic control extension carrying the frame delay (in 1/100 s)."""
+        return b'!\xf9\x04\x00' + struct.pack('<H', max(1, self.frame_duration // 10)) + b'\x00\x00'
+
+
+def _gif_image_block(data: bytes) -> bytes:
+    """
+    Image descriptor and pixel data of a single-frame GIF.
+
+    The global color table of the file becomes the frame's local table, so
+    frames with different palettes can follow each other in one animation.
+    """
+    flags = data[10]
+    position = 13
+    table = b''
+    if flags & 0x80:
+        table_size = 3 << ((flags & 0x07) + 1)
+        table = data[position:position + table_size]
+        position += table_size
+    # Skip extensions (sub-block chains) up to the image descriptor
+    while data[position] == 0x21:
+        position += 2
+        while data[position]:
+            position += data[position] + 1
+        position += 1
+    if data[position] != 0x2C:
+        raise ValueError('GIF frame without an image descriptor')
+    descriptor = bytearray(data[position:position + 10])
+    rest = data[position + 10:data.rindex(b';')]
+    if table and not descriptor[9] & 0x80:
+        descriptor[9] |= 0x80 | (flags & 0x07)
+        return bytes(descriptor) + table + rest
+    return bytes(descriptor) + rest
+
+
+class WebPWriter:
+    """Animated WebP assembled from individually compressed frames."""
+
+    def __init__(self, size: int, frame_duration: int, quality: int, loop: int = 0,
+                 spool_bytes: int = ANIMATION_SETTINGS['spool_mb'] * 1024 * 1024):
+        self.size = size
+        self.frame_duration = frame_duration
+        self.quality = quality
+        self.loop = loop
+        self._frames = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self._length = 0
+
+    def add(self, image: Image.Image, step: int) -> bytes:
+        """Compress one frame into the spool; nothing can be sent yet."""
+        buffer = io.BytesIO()
+        image.save(buffer, format='WEBP', quality=self.quality)
+        bitstream = _webp_bitstream(buffer.getvalue())
+        header = b''.join(value.to_bytes(3, 'little') for value in (
+            0, 0, image.width - 1, image.height - 1, self.frame_duration))
+        payload = header + b'\x02' + bitstream  # Flags: no blending, no disposal
+        chunk = b'ANMF' + struct.pack('<I', len(payload)) + payload
+        self._frames.write(chunk)
+        self._length += len(chunk)
+        return b''
+
+    def finish(self) -> Iterator[bytes]:
+        """RIFF header, animation chunks and every spooled frame."""
+        extended = (b'VP8X' + struct.pack('<I', 10) + b'\x02\x00\x00\x00'
+                    + (self.size - 1).to_bytes(3, 'little') + (self.size - 1).to_bytes(3, 'little'))
+        animation = b'ANIM' + struct.pack('<I', 6) + b'\x00\x00\x00\xff' + struct.pack('<H', self.loop)
+        riff_size = 4 + len(extended) + len(animation) + self._length
+        try:
+            yield b'RIFF' + struct.pack('<I', riff_size) + b'WEBP' + extended + animation
+            self._frames.seek(0)
+            while True:
+                data = self._frames.read(_CHUNK_SIZE)
+                if not data:
+                    return
+                yield data
+        finally:
+            self._frames.close()
+
+
+def _webp_bitstream(data: bytes) -> bytes:
+    """ALPH/VP8/VP8L chunks of a still WebP file, as an ANMF frame needs them."""
+    chunks = []
+    position = 12  # RIFF, size, WEBP
+    while position < len(data):
+        fourcc = data[position:position + 4]
+        length = struct.unpack('<I', data[position + 4:position + 8])[0]
+        end = position + 8 + length + (length & 1)
+        if fourcc in (b'ALPH', b'VP8 ', b'VP8L'):
+            chunks.append(data[position:end])
+        position = end
+    return b''.join(chunks)
+
+
+class _Sink:
+    """Write-only file object that collects bytes until they are drained."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+class FrameArchiveWriter:
+    """ZIP archive of numbered PNG frames, written as a stream."""
+
+    def __init__(self, size: int, frame_duration: int):
+        self.size = size
+        self.frame_duration = frame_duration
+        self._sink = _Sink()
+        # Without tell()/seek() on the sink, zipfile writes data descriptors
+        self._archive = zipfile.ZipFile(self._sink, 'w', zipfile.ZIP_STORED)
+        self._frames = []
+
+    def add(self, image: Image.Image, step: int) -> bytes:
+        """Add one PNG frame; returns the archive bytes written for it."""
+        name = f'frame_{len(self._frames):05d}.png'
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', compress_level=1)
+        self._archive.writestr(zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0)), buffer.getvalue())
+        self._frames.append({'file': name, 'step': step})
+        return self._sink.drain()
+
+    def finish(self) -> Iterator[bytes]:
+        """Manifest and central directory."""
+        manifest = {'frame_duration': self.frame_duration, 'frames': self._frames}
+        self._archive.writestr(zipfile.ZipInfo('frames.json', date_time=(1980, 1, 1, 0, 0, 0)),
+                               json.dumps(manifest, indent=1))
+        self._archive.close()
+        yield self._sink.drain()
+
+
+def create_writer(animation_format: str, size: int, frame_duration: int):
+    """Writer for a key of ANIMATION_FORMATS."""
+    if animation_format == 'gif':
+        return GifWriter(size, frame_duration)
+    if animation_format == 'webp':
+        return WebPWriter(size, frame_duration, ANIMATION_SETTINGS['quality'])
+    if animation_format == 'zip':
+        return FrameArchiveWriter(size, frame_duration)
+    raise ValueError(f"animation format must be one of: {', '.join(ANIMATION_FORMATS)}")
+
+
+class AnimationStream:
+    """Background simulation that yields an encoded time-lapse."""
+
+    def __init__(self, service, params: Dict[str, Any], animation_format: str,
+                 frame_interval: int, frame_size: int, frame_duration: int):
+        """
+        Prepare an animation; the simulation starts when chunks() is iterated.
+
+        Args:
+            service: TextureGeneratorService used for generation and colors
+            params: Normalized parameters from validate_texture_params
+            animation_format: Key of ANIMATION_FORMATS
+            frame_interval: Simulation steps between frames
+            frame_size: Frame edge in pixels
+            frame_duration: Display time of each frame in milliseconds
+        """
+        self.service = service
+        self.params = params
+        self.frame_interval = frame_interval
+        self.frame_size = frame_size
+        self.writer = create_writer(animation_format, frame_size, frame_duration)
+
+        self._frames = queue.Queue(maxsize=ANIMATION_SETTINGS['queue_frames'])
+        self._closed = threading.Event()
+        self._error = None
+        self._last_step = -1
+
+    def chunks(self) -> Iterator[bytes]:
+        """
+        Run the simulation and yield the encoded animation piece by piece.
+
+        Raises:
+            Exception: Whatever failed in the simulation; the output is
+                       incomplete at that point
+        """
+        worker = threading.Thread(target=self._run, daemon=True)
+        worker.start()
+        try:
+            while True:
+                frame = self._frames.get()
+                if frame is None:
+                    break
+                data = self.writer.add(*frame)
+                if data:
+                    yield data
+            if self._error is not None:
+                raise self._error
+            yield from self.writer.finish()
+        finally:
+            # Stops the simulation at its next callback if the client left early
+            self.close()
+
+    def close(self) -> None:
+        """Stop the simulation; waiting frames are discarded."""
+        self._closed.set()
+        while True:
+            try:
+                self._frames.get_nowait()
+            except queue.Empty:
+                return
+
+    def _run(self) -> None:
+        """Simulation thread body."""
+        try:
+            self.service.generate_texture(
+                self.params,
+                progress=self._check_closed,
+                on_frame=self._capture,
+                frame_interval=self.frame_interval,
+                from_start=True
+            )
+        except StreamClosed:
+            pass
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(None)
+
+    def _check_closed(self, done: int, total: int) -> None:
+        """Progress callback: abort once the consumer is gone."""
+        if self._closed.is_set():
+            raise StreamClosed()
+
+    def _capture(self, step: int, A: np.ndarray, B: np.ndarray) -> None:
+        """Frame callback: colorize, scale and queue one frame."""
+        self._check_closed(step, 0)
+        # A multigrid run reports its handover step twice
+        if step <= self._last_step:
+            return
+        self._last_step = step
+        rgb = self.service.colorize(A, B, self.params['color1'], self.params['color2'])
+        image = Image.fromarray(rgb)
+        if image.size != (self.frame_size, self.frame_size):
+            image = image.resize((self.frame_size, self.frame_size), Image.Resampling.BOX)
+        self._put((image, step))
+
+    def _put(self, item: Optional[tuple]) -> None:
+        """Queue an item, waiting for the encoder but not for a departed consumer."""
+        while True:
+            try:
+                self._frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                if self._closed.is_set():
+                    if item is None:
+                        return
+                    raise StreamClosed()
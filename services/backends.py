@@ -0,0 +1,244 @@
+"""
+Compute Backends - Interchangeable implementations of the explicit stepper
+
+The explicit Gray-Scott update (five-point Laplacian plus reaction) can be
+computed in several ways. Each backend is a stepper class with the
+interface of GrayScottStepper (batched fields, per-member parameters,
+step(), A and B):
+
+- numpy: GrayScottStepper, in-place ufuncs on halo-padded buffers
+- scipy: the neighbour sum as one scipy.ndimage.correlate call with
+  wrap-around boundaries, the reaction as in the numpy backend
+- numba: a compiled loop that reads each cell's neighbours and writes the
+  updated A and B in a single pass over memory (parallel over rows)
+
+scipy and numba are optional. They are imported on first use, and a
+backend whose package is missing falls back to BACKEND_SETTINGS['default']
+and then to numpy (resolve_backend). All backends apply the same update
+with the operations grouped like the numpy backend, so results agree to
+rounding (numba matches numpy bitwise); `python -m
+benchmarks.bench_backends` checks this for every installed backend.
+Every backend simulates float32 fields in float32 (numba compiles a
+second specialization of its kernel for them).
+
+The spectral solver works in Fourier space and has no stencil to swap, so
+backends only apply to the explicit solver.
+"""
+import importlib
+from functools import lru_cache
+from typing import Dict, List, Union
+
+import numpy as np
+
+from config import BACKEND_SETTINGS
+from services.simulation import GrayScottStepper, precision_of
+
+# Backend name -> optional package it needs (None: always available)
+BACKEND_REQUIREMENTS = {
+    'numpy': None,
+    'scipy': 'scipy.ndimage',
+    'numba': 'numba',
+}
+
+
+@lru_cache(maxsize=None)
+def _optional_module(name: str):
+    """Import an optional package once; None if it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def backend_available(name: str) -> bool:
+    """Check that a backend is known and its package is installed."""
+    if name not in BACKEND_REQUIREMENTS:
+        return False
+    requirement = BACKEND_REQUIREMENTS[name]
+    return requirement is None or _optional_module(requirement) is not None
+
+
+def available_backends() -> List[str]:
+    """Names of the backends usable in this environment."""
+    return [name for name in BACKEND_REQUIREMENTS if backend_available(name)]
+
+
+def resolve_backend(name: str) -> str:
+    """
+    Backend that runs a request for the given one.
+
+    Args:
+        name: Requested backend (key of BACKEND_REQUIREMENTS)
+
+    Returns:
+        str: name if its package is installed, else the configured default
+             if that one is, else 'numpy'
+    """
+    for candidate in (name, BACKEND_SETTINGS['default']):
+        if backend_available(candidate):
+            return candidate
+    return 'numpy'
+
+
+def create_stepper(backend: str, A: np.ndarray, B: np.ndarray, delta_t: Union[float, np.ndarray],
+                   params: Dict[str, Union[float, np.ndarray]]):
+    """
+    Build an explicit stepper on the resolved backend.
+
+    Args:
+        backend: Requested backend (falls back as in resolve_backend)
+        A, B, delta_t, params: As for GrayScottStepper
+
+    Returns:
+        Stepper with the GrayScottStepper interface
+    """
+    return STEPPER_CLASSES[resolve_backend(backend)](A, B, delta_t, params)
+
+
+class ScipyGrayScottStepper(GrayScottStepper):
+    """
+    Explicit stepper whose neighbour sum is a scipy.ndimage correlation.
+
+    The halo of the inherited padded buffers is never filled: the
+    correlation wraps around the edges of the interior itself.
+    """
+
+    def __init__(self, A: np.ndarray, B: np.ndarray, delta_t: Union[float, np.ndarray],
+                 params: Dict[str, Union[float, np.ndarray]]):
+        super().__init__(A, B, delta_t, params)
+        self._ndimage = _optional_module('scipy.ndimage')
+        # Four von Neumann neighbours on the last two axes only
+        kernel = np.array([[0.0, 1.0, 0.0], [1.0, 0.0, 1.0], [0.0, 1.0, 0.0]])
+        self._kernel = kernel.reshape((1,) * (np.ndim(A) - 2) + kernel.shape)
+
+    def _step_once(self) -> None:
+        """Correlate for the neighbour sums, then update as the numpy backend does."""
+        A, B = self._A, self._B
+        lap, reaction = self._lap, self._reaction
+
+        np.multiply(B, B, out=reaction)
+        reaction *= A
+        reaction *= self.delta_t
+
+        self._ndimage.correlate(A, self._kernel, output=lap, mode='wrap')
+        lap *= self._diff_a
+        lap -= reaction
+        A *= self._keep_a
+        A += lap
+        A += self._feed
+
+        self._ndimage.correlate(B, self._kernel, output=lap, mode='wrap')
+        lap *= self._diff_b
+        lap += reaction
+        B *= self._keep_b
+        B += lap
+
+
+@lru_cache(maxsize=None)
+def _numba_kernel():
+    """Compile the fused update on first use (cached on disk by numba)."""
+    numba = _optional_module('numba')
+
+    @numba.njit(parallel=True, cache=True)
+    def advance(A, B, A_next, B_next, diff_a, diff_b, keep_a, keep_b, feed, delta_t, count):
+        members, rows, cols = A.shape
+        for _ in range(count):
+            for n in range(members):
+                for i in numba.prange(rows):
+                    up = i - 1 if i > 0 else rows - 1
+                    down = i + 1 if i < rows - 1 else 0
+                    for j in range(cols):
+                        left = j - 1 if j > 0 else cols - 1
+                        right = j + 1 if j < cols - 1 else 0
+                        a = A[n, i, j]
+                        b = B[n, i, j]
+                        reaction = b * b * a * delta_t[n]
+                        sum_a = A[n, up, j] + A[n, down, j] + A[n, i, left] + A[n, i, right]
+                        sum_b = B[n, up, j] + B[n, down, j] + B[n, i, left] + B[n, i, right]
+                        A_next[n, i, j] = a * keep_a[n] + (sum_a * diff_a[n] - reaction) + feed[n]
+                        B_next[n, i, j] = b * keep_b[n] + (sum_b * diff_b[n] + reaction)
+            A, A_next = A_next, A
+            B, B_next = B_next, B
+
+    return advance
+
+
+class NumbaGrayScottStepper:
+    """
+    Explicit stepper running a compiled, fused stencil and reaction loop.
+
+    Each step reads the current fields once and writes the next ones once,
+    instead of the numpy backend's dozen passes over full-size grids. The
+    fields ping-pong between two buffer pairs because every cell still
+    needs its neighbours' old values.
+    """
+
+    def __init__(self, A: np.ndarray, B: np.ndarray, delta_t: Union[float, np.ndarray],
+                 params: Dict[str, Union[float, np.ndarray]]):
+        """
+        Copy the fields and expand the update coefficients per member.
+
+        Args:
+            A, B, delta_t, params: As for GrayScottStepper
+        """
+        self._shape = np.shape(A)
+        rows, cols = self._shape[-2:]
+        dtype = precision_of(A)
+        self.dtype = dtype
+        self._A = np.array(A, dtype=dtype).reshape(-1, rows, cols)
+        self._B = np.array(B, dtype=dtype).reshape(-1, rows, cols)
+        self._A_next = np.empty_like(self._A)
+        self._B_next = np.empty_like(self._B)
+        members = self._A.shape[0]
+
+        def per_member(value):
+            return np.ascontiguousarray(np.broadcast_to(np.ravel(value), (members,)), dtype=dtype)
+
+        # Same coefficients as GrayScottStepper, one value per stack member
+        D_a = params['D_a']
+        D_b = params['D_b']
+        feed_rate = params['feed_rate']
+        kill_rate = params['kill_rate']
+        self.delta_t = delta_t
+        self._coefficients = tuple(per_member(value) for value in (
+            delta_t * D_a,
+            delta_t * D_b,
+            1.0 - 4.0 * delta_t * D_a - delta_t * feed_rate,
+            1.0 - 4.0 * delta_t * D_b - delta_t * (kill_rate + feed_rate),
+            delta_t * feed_rate,
+            delta_t,
+        ))
+        self._advance = _numba_kernel()
+
+    @property
+    def A(self) -> np.ndarray:
+        """Current activator field."""
+        return self._A.reshape(self._shape)
+
+    @property
+    def B(self) -> np.ndarray:
+        """Current inhibitor field."""
+        return self._B.reshape(self._shape)
+
+    def step(self, count: int = 1) -> None:
+        """
+        Advance the simulation by a number of time steps.
+
+        Args:
+            count: Number of explicit Euler steps to perform
+        """
+        if count <= 0:
+            return
+        self._advance(self._A, self._B, self._A_next, self._B_next, *self._coefficients, count)
+        # The kernel swaps buffers every step; an odd count ends in the spare pair
+        if count % 2:
+            self._A, self._A_next = self._A_next, self._A
+            self._B, self._B_next = self._B_next, self._B
+
+
+# Stepper class per backend
+STEPPER_CLASSES = {
+    'numpy': GrayScottStepper,
+    'scipy': ScipyGrayScottStepper,
+    'numba': NumbaGrayScottStepper,
+}
@@ -0,0 +1,270 @@
+"""
+Checkpoint Store - Saved simulation states for incremental continuation
+
+Users tend to tune t_max upward (look at t=1000, then 2000, then 5000),
+and every step of the shorter run is also a step of the longer one. The
+final state of each simulation is therefore kept on disk, keyed by
+everything that determines the trajectory except its length:
+
+- time step, solver, compute backend (explicit solver, as resolved on
+  this server), precision and grid size
+- the simulation parameters in effect (D_a, D_b, rates, seed)
+
+A later request with the same state key and a longer run resumes from the
+latest checkpoint at or before its step count. Colors and K do not enter
+the key because they only affect rendering, so a recolored request with an
+equal t_max skips the simulation entirely.
+
+Each checkpoint is one .npy file holding the stacked (2, size, size)
+fields, loaded memory-mapped, plus a small JSON sidecar recording the step
+count and parameters. Fields are stored in the precision they were
+simulated in (float32 or float64), and backends that differ in rounding
+never share a trajectory, so a resumed run is bitwise identical to an
+uninterrupted one. Files are
+evicted least recently used first to stay within the disk budget, and
+files written by other worker processes are picked up on lookup.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.backends import resolve_backend
+
+# Bump when the solvers change in a way that alters trajectories
+CHECKPOINT_VERSION = 1
+
+# <32 hex key>-<step>.npy
+_FILENAME = re.compile(r'^([0-9a-f]{32})-(\d+)\.npy$')
+
+
+def state_key(params: Dict[str, Any], simulation: Dict[str, Any]) -> str:
+    """
+    Compute the trajectory key of a simulation, independent of its length.
+
+    Args:
+        params: Normalized parameters from validate_texture_params
+        simulation: Simulation parameters in effect (D_a, D_b, rates, seed)
+
+    Returns:
+        str: 32-character hexadecimal key
+    """
+    payload = {
+        'version': CHECKPOINT_VERSION,
+        'delta_t': params['delta_t'],
+        'solver': params['solver'],
+        'backend': resolve_backend(params['backend']) if params['solver'] == 'explicit' else None,
+        'precision': params['precision'],
+        'size': params['size'],
+        'simulation': simulation,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class CheckpointStore:
+    """Disk store of simulation states with LRU eviction."""
+
+    def __init__(self, directory: Path, disk_budget: int):
+        """
+        Open the checkpoint directory and index the files already present.
+
+        Args:
+            directory: Where checkpoint files are stored
+            disk_budget: Maximum total size of checkpoint files in bytes;
+                         0 disables checkpointing
+        """
+        self.directory = Path(directory)
+        self.disk_budget = disk_budget
+
+        self._lock = threading.Lock()
+        self._files = OrderedDict()   # file name -> size, least recent first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            self._scan_directory()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether states are stored at all."""
+        return self.disk_budget > 0
+
+    def latest(self, keys: List[str], max_step: int, record: bool = True) -> int:
+        """
+        Find the latest step every key has a checkpoint for.
+
+        Args:
+            keys: State keys of the members of one simulation stack
+            max_step: Step count of the requested run
+            record: Count one hit or miss per key
+
+        Returns:
+            int: Step to resume from, 0 if the run must start from scratch
+        """
+        if not self.enabled:
+            return 0
+        with self._lock:
+            common = None
+            for key in keys:
+                steps = {step for step in self._steps(key) if step <= max_step}
+                common = steps if common is None else common & steps
+            step = max(common) if common else 0
+            if record and step:
+                self.hits += len(keys)
+            elif record:
+                self.misses += len(keys)
+            return step
+
+    def load(self, key: str, step: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Memory-map a stored state.
+
+        Args:
+            key: State key
+            step: Step count of the checkpoint
+
+        Returns:
+            tuple: Read-only (A, B) views of the file, or None if it was evicted
+        """
+        name = self._filename(key, step)
+        try:
+            fields = np.load(self.directory / name, mmap_mode='r')
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(name)
+            return None
+        with self._lock:
+            self._touch(name)
+        return fields[0], fields[1]
+
+    def save(self, key: str, step: int, A: np.ndarray, B: np.ndarray,
+             metadata: Dict[str, Any]) -> None:
+        """
+        Store a state, evicting older checkpoints to stay within budget.
+
+        States larger than the whole budget and states already present are
+        skipped. Files are written under a temporary name and renamed into
+        place, so readers never map a partial file.
+
+        Args:
+            key: State key
+            step: Step count the fields correspond to
+            A: Activator field
+            B: Inhibitor field
+            metadata: Parameters recorded in the JSON sidecar
+        """
+        name = self._filename(key, step)
+        nbytes = A.nbytes + B.nbytes
+        if not self.enabled or step <= 0 or nbytes > self.disk_budget:
+            return
+        with self._lock:
+            if self._adopt(name):
+                self._touch(name)
+                return
+
+        path = self.directory / name
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            fields = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=A.dtype,
+                                               shape=(2,) + A.shape)
+            fields[0] = A
+            fields[1] = B
+            fields.flush()
+            del fields
+            path.with_suffix('.json').write_text(
+                json.dumps({'step': step, **metadata}, sort_keys=True))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._forget(name)
+            self._files[name] = path.stat().st_size
+            self._bytes += self._files[name]
+            self._evict()
+
+    def stats(self) -> Dict[str, int]:
+        """Return checkpoint count, byte total and hit/miss counters."""
+        with self._lock:
+            return {
+                'entries': len(self._files),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _filename(self, key: str, step: int) -> str:
+        """File name of a checkpoint."""
+        return f"{key}-{step}.npy"
+
+    def _steps(self, key: str) -> List[int]:
+        """Steps checkpointed for a key, including other processes' files. Caller holds the lock."""
+        steps = []
+        for path in self.directory.glob(f"{key}-*.npy"):
+            match = _FILENAME.match(path.name)
+            if match and self._adopt(path.name):
+                steps.append(int(match.group(2)))
+        return steps
+
+    def _scan_directory(self) -> None:
+        """Index existing files, oldest modification time first."""
+        entries = []
+        for path in self.directory.glob('*.npy'):
+            if _FILENAME.match(path.name):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self._bytes += size
+        self._evict()
+
+    def _adopt(self, name: str) -> bool:
+        """Index a file written by another process. Caller holds the lock."""
+        if name in self._files:
+            return True
+        path = self.directory / name
+        if not path.exists():
+            return False
+        size = path.stat().st_size
+        self._files[name] = size
+        self._bytes += size
+        return True
+
+    def _touch(self, name: str) -> None:
+        """Mark a file as most recently used. Caller holds the lock."""
+        if name in self._files:
+            self._files.move_to_end(name)
+            try:
+                os.utime(self.directory / name)
+            except FileNotFoundError:
+                self._forget(name)
+
+    def _forget(self, name: str) -> None:
+        """Drop a file from the index. Caller holds the lock."""
+        size = self._files.pop(name, None)
+        if size is not None:
+            self._bytes -= size
+
+    def _evict(self) -> None:
+        """Delete least recently used checkpoints until within budget. Caller holds the lock."""
+        while self._bytes > self.disk_budget and self._files:
+            name, size = self._files.popitem(last=False)
+            self._bytes -= size
+            for path in (self.directory / name, (self.directory / name).with_suffix('.json')):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
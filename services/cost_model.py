@@ -0,0 +1,217 @@
+"""
+Cost Model - Predicted CPU time and memory of a texture request
+
+Validation only checks parameter ranges, but the cost of a request spans
+about seven orders of magnitude: a 4096x4096 run with t_max=10000 and
+delta_t=0.001 is roughly a million times a default request. The model
+predicts, before anything runs:
+
+- CPU-seconds: a fixed overhead, plus simulation work times a rate per
+  solver kind, plus encoding work per pixel. Work is cell-steps (grid
+  cells x steps) for the explicit solver, and cell-steps x log2(cells)
+  for the spectral solver, whose FFTs grow slightly faster than the grid
+- peak memory: a base, plus per grid cell the larger of the simulation's
+  working set (fields, scratch grids, spectra and initial fields, per
+  solver and precision) and the colorized image next to the final fields.
+  Explicit numpy runs that would exceed COST_SETTINGS['max_memory_mb']
+  run, and are costed, in blocks of rows without full-size scratch grids
+  (the 'blocked' layout)
+
+Rates start from COST_SETTINGS['rates'], are overwritten by a calibration
+file if one exists (`flask calibrate-cost` writes it from timed runs on
+this machine), and keep adapting to the timings of real runs: every run
+long enough to measure moves its kind's rate toward the observed one by
+an exponentially weighted average. Job workers (services/job_queue.py)
+run in other processes with models of their own; they record their
+observations and hand them back with each result, and the web process
+replays them into its model, which admission control consults.
+
+Kinds are 'explicit/<backend>' (see services/backends.py) and 'spectral',
+with '/float32' appended for float32 runs, whose speed differs.
+Multi-process tiled runs use the numpy rate: they spend the same CPU time
+spread over more cores, and their wall time is not an observation of it.
+"""
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import COST_SETTINGS
+
+# (grid cells, steps) of one simulation phase
+Phase = Tuple[int, int]
+
+# Bytes per grid cell of each simulation precision
+PRECISION_BYTES = {'float32': 4, 'float64': 8}
+
+# Runs shorter than this are dominated by overhead and not used to calibrate
+MIN_OBSERVED_SECONDS = 0.05
+
+# ('simulation', kind, cells, steps, seconds) or ('encoding', pixels, seconds)
+Observation = Tuple
+
+
+def cost_kind(solver: str, backend: str, precision: str = 'float64') -> str:
+    """Rate key of a solver, (resolved) compute backend and precision."""
+    kind = 'spectral' if solver == 'spectral' else f'explicit/{backend}'
+    return kind if precision == 'float64' else f'{kind}/{precision}'
+
+
+def work_units(kind: str, cells: int, steps: int) -> float:
+    """Simulation work of a phase in the units its rate is expressed in."""
+    if kind.startswith('spectral'):
+        return cells * steps * math.log2(max(2, cells))
+    return cells * steps
+
+
+def encoded_pixels(cells: int, mipmaps: bool) -> float:
+    """Pixels encoded for a texture: the base image, plus a mip atlas of 1.5x its size."""
+    return cells * (2.5 if mipmaps else 1.0)
+
+
+class CostModel:
+    """Predicts CPU-seconds and peak memory; calibrated from observed runs."""
+
+    def __init__(self, calibration_file: Optional[Path] = None,
+                 smoothing: float = COST_SETTINGS['smoothing'], record: bool = False):
+        """
+        Start from the configured rates, then load a calibration file.
+
+        Args:
+            calibration_file: JSON written by save(); ignored if missing
+            smoothing: Weight of each new observation in the running rate
+            record: Keep the observations for take_observations(), so they
+                    can be replayed into another process's model
+        """
+        self.rates = dict(COST_SETTINGS['rates'])
+        self.encode_rate = COST_SETTINGS['encode_rate']
+        self.smoothing = smoothing
+        self.calibration_file = calibration_file
+        self._observations = {}
+        self._recorded = [] if record else None
+        self._lock = threading.Lock()
+        if calibration_file is not None and Path(calibration_file).exists():
+            self.load(calibration_file)
+
+    def estimate(self, kind: str, phases: List[Phase], cells: int, layout: str,
+                 mipmaps: bool = False, precision: str = 'float64') -> Dict[str, Any]:
+        """
+        Predict the cost of a request.
+
+        Args:
+            kind: Rate key (see cost_kind)
+            phases: (cells, steps) of every simulation phase still to run
+            cells: Pixels of the final image
+            layout: Solver name, or 'blocked', for its memory footprint
+            mipmaps: Whether a mip atlas is encoded too
+            precision: Floating point type of the simulation
+
+        Returns:
+            dict: 'cpu_seconds', 'memory_mb' and 'steps' (total of the phases)
+        """
+        steps = sum(phase_steps for _, phase_steps in phases)
+        with self._lock:
+            rate = self.rates.get(kind, self.rates['explicit/numpy'])
+            encode_rate = self.encode_rate
+        simulation = sum(work_units(kind, phase_cells, phase_steps) for phase_cells, phase_steps in phases)
+        encoded = encoded_pixels(cells, mipmaps)
+        seconds = COST_SETTINGS['overhead'] + rate * simulation + encode_rate * encoded
+        return {
+            'cpu_seconds': round(seconds, 4),
+            'memory_mb': round(self.memory_mb(layout, cells, precision), 1),
+            'steps': steps,
+        }
+
+    def memory_mb(self, layout: str, cells: int, precision: str = 'float64') -> float:
+        """
+        Predict the peak memory of a run.
+
+        Args:
+            layout: Solver name, or 'blocked' (see COST_SETTINGS['bytes_per_cell'])
+            cells: Grid cells of the final image
+            precision: Floating point type of the simulation
+
+        Returns:
+            float: Megabytes
+        """
+        simulation = COST_SETTINGS['bytes_per_cell'][layout][precision]
+        encoding = 2 * PRECISION_BYTES[precision] + COST_SETTINGS['image_bytes_per_cell']
+        return COST_SETTINGS['base_memory_mb'] + max(simulation, encoding) * cells / 2**20
+
+    def observe(self, kind: str, cells: int, steps: int, seconds: float) -> None:
+        """
+        Fold a timed simulation phase into the rate of its kind.
+
+        Args:
+            kind: Rate key (see cost_kind)
+            cells: Grid cells per step (all stack members)
+            steps: Steps executed
+            seconds: Wall time of those steps in one process
+        """
+        units = work_units(kind, cells, steps)
+        if seconds < MIN_OBSERVED_SECONDS or units <= 0:
+            return
+        observed = seconds / units
+        with self._lock:
+            if self._recorded is not None:
+                self._recorded.append(('simulation', kind, cells, steps, seconds))
+            current = self.rates.get(kind)
+            self.rates[kind] = observed if current is None else (
+                (1 - self.smoothing) * current + self.smoothing * observed)
+            self._observations[kind] = self._observations.get(kind, 0) + 1
+
+    def observe_encoding(self, pixels: int, seconds: float) -> None:
+        """Fold the time of an encode (colorize to stored bytes) into the per-pixel rate."""
+        if seconds < MIN_OBSERVED_SECONDS or pixels <= 0:
+            return
+        with self._lock:
+            if self._recorded is not None:
+                self._recorded.append(('encoding', pixels, seconds))
+            self.encode_rate = (1 - self.smoothing) * self.encode_rate + self.smoothing * seconds / pixels
+
+    def take_observations(self) -> List[Observation]:
+        """Return the observations recorded since the last call and forget them (see record)."""
+        with self._lock:
+            if self._recorded is None:
+                return []
+            observations, self._recorded = self._recorded, []
+            return observations
+
+    def replay(self, observations: List[Observation]) -> None:
+        """Fold observations recorded by another model into this one, in order."""
+        for observation in observations:
+            if observation[0] == 'simulation':
+                self.observe(*observation[1:])
+            else:
+                self.observe_encoding(*observation[1:])
+
+    def calibrate(self, rates: Dict[str, float], encode_rate: float) -> None:
+        """Replace rates with freshly measured ones (see TextureGeneratorService.calibrate_cost)."""
+        with self._lock:
+            self.rates.update(rates)
+            self.encode_rate = encode_rate
+
+    def stats(self) -> Dict[str, Any]:
+        """Current rates and how many runs have refined each since startup."""
+        with self._lock:
+            return {'rates': dict(self.rates), 'encode_rate': self.encode_rate,
+                    'observations': dict(self._observations)}
+
+    def save(self, path: Optional[Path] = None) -> None:
+        """Write the current rates as a calibration file (atomically)."""
+        path = Path(path or self.calibration_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {'rates': self.rates, 'encode_rate': self.encode_rate}
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(data, indent=2, sort_keys=True))
+        os.replace(temporary, path)
+
+    def load(self, path: Path) -> None:
+        """Replace the rates with those of a calibration file."""
+        data = json.loads(Path(path).read_text())
+        with self._lock:
+            self.rates.update({kind: float(rate) for kind, rate in data.get('rates', {}).items()})
+            self.encode_rate = float(data.get('encode_rate', self.encode_rate))
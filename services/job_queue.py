@@ -0,0 +1,366 @@
+"""
+Job Queue - Asynchronous texture generation in worker processes
+
+Long simulations used to run inside the Flask request thread, holding a
+WSGI worker for minutes and tripping proxy timeouts. Jobs submitted here
+run on a bounded ProcessPoolExecutor instead; clients poll for status,
+progress and the result URL.
+
+Workers share the texture cache directory with the web process, so a
+finished job only hands back its cache key. Progress and cancellation
+flags live in small shared-memory arrays (one slot per in-flight job),
+which avoids a manager process and keeps progress updates to a single
+memory write.
+
+The pool and the shared arrays use the 'spawn' start method. The web
+server runs request threads (and possibly numba's thread pool), and a
+forked worker could inherit a lock one of them holds and deadlock. Spawned
+workers import the configuration afresh, so the parent's cache and
+checkpoint settings are handed to them explicitly.
+
+Jobs are handed to the pool only when a worker is free, so the queue
+decides the order rather than the pool's FIFO. Each job carries its
+estimated CPU-seconds (services/cost_model.py), and the waiting job with
+the highest response ratio (waited + estimate) / estimate goes next:
+cheap interactive jobs overtake expensive ones, and an expensive job's
+ratio keeps growing while it waits, so it is not starved.
+
+Each worker calibrates a cost model of its own from the runs it times.
+Those observations are returned with every job's result and handed to
+the queue's on_observations callback, which folds them into the web
+process's model: estimates there follow the runs made in the workers.
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, CancelledError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import CACHE_SETTINGS, CHECKPOINT_SETTINGS, COST_SETTINGS, IMAGE_FORMATS
+from services.metrics import JOB_SECONDS
+
+# Job lifecycle states reported to clients
+QUEUED = 'queued'
+RUNNING = 'running'
+FINISHED = 'finished'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+# Floor of a job's estimate in the response ratio (cached and tiny jobs)
+MIN_JOB_COST = 0.01
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds the configured number of jobs."""
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker to abort a simulation that was cancelled."""
+
+
+# Worker process state, set up once per process by _init_worker
+_worker_service = None
+_worker_progress = None
+_worker_cancel = None
+
+
+def _init_worker(progress, cancel, settings):
+    """Process pool initializer: keep shared arrays and a service per worker."""
+    global _worker_service, _worker_progress, _worker_cancel
+    from services.cost_model import CostModel
+    from services.texture_cache import TextureCache
+    from services.texture_generator import TextureGeneratorService
+
+    # Settings the parent may have changed at runtime (spawned workers re-import config)
+    CACHE_SETTINGS.update(settings['cache'])
+    CHECKPOINT_SETTINGS.update(settings['checkpoints'])
+    _worker_progress = progress
+    _worker_cancel = cancel
+    # Workers only write to disk; the web process keeps the memory tier.
+    # Their cost observations are recorded to be replayed in the web process
+    _worker_service = TextureGeneratorService(cache=TextureCache(
+        CACHE_SETTINGS['directory'],
+        disk_budget=CACHE_SETTINGS['disk_budget_mb'] * 1024 * 1024,
+        memory_budget=0,
+        extensions=tuple(spec['extension'] for spec in IMAGE_FORMATS.values())
+    ), cost_model=CostModel(COST_SETTINGS['calibration_file'], record=True))
+
+
+def _run_job(slot: int, params: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple]]:
+    """
+    Worker entry point: generate one texture and report progress in its slot.
+
+    Returns the generation result and the cost observations recorded since
+    the previous job (including those of jobs that were cancelled or failed).
+    """
+    def report(done, total):
+        _worker_progress[slot] = done / total
+        if _worker_cancel[slot]:
+            raise JobCancelled()
+
+    _worker_progress[slot] = 0.0
+    if _worker_cancel[slot]:
+        raise JobCancelled()
+    result = _worker_service.generate_texture(params, progress=report)
+    return result, _worker_service.cost_model.take_observations()
+
+
+class JobQueue:
+    """Bounded queue of texture jobs executed by a process pool."""
+
+    def __init__(self, max_workers: int, max_pending: int, result_ttl: float,
+                 on_observations: Optional[Callable[[List[Tuple]], None]] = None):
+        """
+        Configure the queue. Worker processes start on the first submission.
+
+        Args:
+            max_workers: Number of worker processes
+            max_pending: Jobs allowed to wait for a free worker
+            result_ttl: Seconds a finished job stays queryable
+            on_observations: Optional callback receiving the cost
+                             observations a finished job's worker recorded
+                             (see CostModel.replay); called with the
+                             queue's lock held, so it must not use the queue
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.on_observations = on_observations
+
+        # One progress/cancel slot per job that may be in flight at once
+        self._slots = max_workers + max_pending
+        self._free_slots = list(range(self._slots))
+        self._jobs = {}
+        self._waiting = []   # Jobs holding a slot but not yet handed to the pool
+        self._running = 0    # Jobs handed to the pool and not completed
+        self._lock = threading.Lock()
+        self._executor = None
+        self._progress = None
+        self._cancel = None
+
+    def submit(self, params: Dict[str, Any], cached: Optional[Dict[str, Any]] = None,
+               estimate: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Queue a texture generation job.
+
+        Args:
+            params: Normalized parameters from validate_texture_params
+            cached: TextureGeneratorService.describe() of an already cached
+                    result; the job then completes immediately without a worker
+            estimate: TextureGeneratorService.estimate_cost() of the job;
+                      its 'cpu_seconds' orders the queue (0 if omitted)
+
+        Returns:
+            str: Job identifier
+
+        Raises:
+            QueueFullError: If max_workers + max_pending jobs are in flight
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            job = {'id': job_id, 'submitted': now, 'finished': None, 'slot': None,
+                   'future': None, 'result': None, 'error': None, 'status': QUEUED,
+                   'params': params, 'cost': (estimate or {}).get('cpu_seconds', 0.0),
+                   'estimate': estimate}
+            self._jobs[job_id] = job
+
+            if cached is not None:
+                job.update(status=FINISHED, finished=now, result={
+                    **cached, 'cached': True, 'steps': 0, 'stop_reason': 'cached'})
+                return job_id
+
+            if not self._free_slots:
+                del self._jobs[job_id]
+                raise QueueFullError('Job queue is full, try again later')
+
+            self._ensure_executor()
+            slot = self._free_slots.pop()
+            self._progress[slot] = -1.0
+            self._cancel[slot] = 0
+            job['slot'] = slot
+            self._waiting.append(job_id)
+            started = self._dispatch(now)
+
+        self._watch(started)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Describe a job.
+
+        Args:
+            job_id: Identifier returned by submit
+
+        Returns:
+            dict: 'id', 'status', 'progress', 'estimate' (if submitted with
+                  one) and, when finished, 'result' (or 'error' when
+                  failed); None for unknown jobs
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+
+            status, progress = job['status'], 1.0 if job['status'] == FINISHED else 0.0
+            if status == QUEUED and job['slot'] is not None:
+                progress = max(0.0, self._progress[job['slot']])
+                if self._progress[job['slot']] >= 0:
+                    status = RUNNING
+
+            info = {'id': job_id, 'status': status, 'progress': round(progress, 4)}
+            if job['estimate'] is not None:
+                info['estimate'] = job['estimate']
+            if job['result'] is not None:
+                info['result'] = job['result']
+            if job['error'] is not None:
+                info['error'] = job['error']
+            return info
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Queued jobs are removed from the pool; running jobs stop at their
+        next progress report.
+
+        Args:
+            job_id: Identifier returned by submit
+
+        Returns:
+            bool: False if the job is unknown or already completed
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != QUEUED:
+                return False
+            if job['future'] is None:
+                # Still waiting for a worker: never reaches the pool
+                self._waiting.remove(job_id)
+                self._finish(job, CANCELLED)
+                return True
+            self._cancel[job['slot']] = 1
+            future = job['future']
+        # Outside the lock: cancel() runs done callbacks synchronously
+        future.cancel()
+        return True
+
+    def load(self) -> float:
+        """
+        Estimated CPU-seconds of work in flight.
+
+        Waiting jobs count with their whole estimate, running jobs with the
+        share their progress says is left.
+        """
+        with self._lock:
+            total = 0.0
+            for job in self._jobs.values():
+                if job['status'] != QUEUED or job['slot'] is None:
+                    continue
+                done = max(0.0, self._progress[job['slot']]) if job['future'] is not None else 0.0
+                total += job['cost'] * (1.0 - done)
+            return total
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        counts = {QUEUED: 0, RUNNING: 0, FINISHED: 0, FAILED: 0, CANCELLED: 0}
+        for job_id in list(self._jobs):
+            info = self.status(job_id)
+            if info is not None:
+                counts[info['status']] += 1
+        return counts
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; jobs still waiting for a worker never run."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _ensure_executor(self) -> None:
+        """Start the worker pool and shared arrays. Caller holds the lock."""
+        if self._executor is not None:
+            return
+        context = multiprocessing.get_context('spawn')
+        self._progress = context.Array('d', self._slots, lock=False)
+        self._cancel = context.Array('b', self._slots, lock=False)
+        settings = {'cache': dict(CACHE_SETTINGS), 'checkpoints': dict(CHECKPOINT_SETTINGS)}
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._progress, self._cancel, settings)
+        )
+
+    def _dispatch(self, now: float) -> List[Tuple[str, Future]]:
+        """
+        Hand waiting jobs to free workers, highest response ratio first.
+
+        Caller holds the lock and passes the returned (job_id, future)
+        pairs to _watch once it has released it.
+        """
+        started = []
+        while self._waiting and self._running < self.max_workers:
+            job_id = max(self._waiting, key=lambda waiting: self._response_ratio(self._jobs[waiting], now))
+            self._waiting.remove(job_id)
+            job = self._jobs[job_id]
+            job['future'] = self._executor.submit(_run_job, job['slot'], job['params'])
+            self._running += 1
+            started.append((job_id, job['future']))
+        return started
+
+    def _response_ratio(self, job: Dict[str, Any], now: float) -> float:
+        """(time waited + estimated run time) / estimated run time."""
+        cost = max(job['cost'], MIN_JOB_COST)
+        return (now - job['submitted'] + cost) / cost
+
+    def _watch(self, started: List[Tuple[str, Future]]) -> None:
+        """Register completion callbacks (without the lock: they may run at once)."""
+        for job_id, future in started:
+            future.add_done_callback(lambda future, job_id=job_id: self._complete(job_id))
+
+    def _complete(self, job_id: str) -> None:
+        """Record the outcome of a finished future, then start the next job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != QUEUED:
+                return
+            future = job['future']
+            observations = []
+            try:
+                job['result'], observations = future.result()
+                status = FINISHED
+            except (CancelledError, JobCancelled):
+                status = CANCELLED
+            except Exception as e:
+                status = FAILED
+                job['error'] = str(e)
+            job['future'] = None
+            self._running -= 1
+            # Before the job shows as finished, so its client sees the calibrated model
+            if observations and self.on_observations is not None:
+                self.on_observations(observations)
+            self._finish(job, status)
+            started = self._dispatch(time.time())
+        self._watch(started)
+
+    def _finish(self, job: Dict[str, Any], status: str) -> None:
+        """Mark a job completed and release its slot. Caller holds the lock."""
+        job['status'] = status
+        job['finished'] = time.time()
+        job['params'] = None
+        JOB_SECONDS.observe(job['finished'] - job['submitted'], status=status)
+        self._free_slots.append(job['slot'])
+        job['slot'] = None
+
+    def _prune(self, now: float) -> None:
+        """Forget completed jobs older than result_ttl. Caller holds the lock."""
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job['finished'] is not None and now - job['finished'] > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
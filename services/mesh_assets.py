@@ -0,0 +1,420 @@
+"""
+Mesh Assets - Compact binary shell meshes built from the OBJ models
+
+The viewer used to download each model as OBJ text (Pecten.obj alone is
+3.8 MB) and parse it line by line in JavaScript on every page load. The
+build step here converts every model in SHELL_MODELS once into an indexed
+binary mesh the browser maps straight onto typed arrays, and stores gzip
+(and, if the brotli package is installed, brotli) copies next to it so
+the server never compresses per request.
+
+Binary layout (version 1, little-endian, every section 4-byte aligned):
+
+    offset  type        field
+    0       char[4]     magic "STGM"
+    4       uint32      format version
+    8       uint32      vertex count V
+    12      uint32      index count I (3 per triangle)
+    16      uint32      bytes per index (2 if V <= 65536, else 4)
+    20      uint32      flags: 1 = normals present, 2 = UVs present
+    24      float32[3]  position offset
+    36      float32[3]  position scale
+    48      float32[2]  UV offset
+    56      float32[2]  UV scale
+    64      uint16[V*3] positions, value = offset + q * scale
+            int8[V*3]   normals, value = q / 127           (if flag 1)
+            uint16[V*2] UVs, value = offset + q * scale    (if flag 2)
+            uint16/uint32[I] triangle indices
+
+Positions and UVs are quantized to 16 bits over their bounding box (for a
+unit-sized shell that is a step of about 15 micrometres) and normals to 8
+bits per component, which shading cannot tell apart from float32 but
+halves the compressed size. OBJ vertices are split where a position is
+shared by corners with different UVs or normals, and ordered by first use
+so the index buffer stays local. All groups and materials of an OBJ are
+merged into one mesh, as the viewer textures the whole shell at once.
+
+Each model is also decimated to the triangle budgets in
+MESH_SETTINGS['lod_triangles'] (levels 1, 2, ... of decreasing detail;
+level 0 is the full mesh), so the viewer can show a coarse shell at once
+and swap in the detailed one when it arrives. Decimation clusters vertices
+on a uniform grid: every cell collapses to the mean of its vertices, and
+triangles whose corners fall into fewer than three cells disappear. The
+grid is refined by bisection until the triangle count just fits the
+budget. Vertices are clustered by UV cell as well as by position, so
+texture seams stay sharp, while all vertices of a position cell share one
+position, so the two sides of a seam do not crack apart.
+"""
+import gzip
+import os
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import ASSETS_DIR, MESH_SETTINGS, SHELL_MODELS
+
+try:
+    import brotli
+except ImportError:  # Optional: .br copies are skipped without it
+    brotli = None
+
+MESH_MAGIC = b'STGM'
+MESH_VERSION = 1
+FLAG_NORMALS = 1
+FLAG_UVS = 2
+
+# magic, version, vertices, indices, index bytes, flags, position offset/scale, UV offset/scale
+_HEADER = struct.Struct('<4s5I3f3f2f2f')
+
+# Components read per OBJ vertex element (extra ones, e.g. vertex colors, are ignored)
+_WIDTHS = {'v': 3, 'vt': 2, 'vn': 3}
+
+# Extension of each stored representation, by Content-Encoding
+ENCODINGS = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+
+_build_lock = threading.Lock()
+
+
+def load_obj(path: Path) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Read a Wavefront OBJ file into indexed triangle arrays.
+
+    Polygons are fan-triangulated. Every distinct position/UV/normal
+    combination used by a face corner becomes one vertex.
+
+    Args:
+        path: OBJ file
+
+    Returns:
+        dict: 'positions' float32 (V, 3), 'normals' float32 (V, 3) or None,
+              'uvs' float32 (V, 2) or None, 'indices' uint32 (I,)
+
+    Raises:
+        ValueError: If the file contains no triangles
+    """
+    rows = {'v': [], 'vt': [], 'vn': []}
+    corners = []
+    for line in Path(path).read_text(errors='replace').splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        kind = fields[0]
+        if kind in rows:
+            rows[kind].append(fields[1:1 + _WIDTHS[kind]])
+        elif kind == 'f' and len(fields) >= 4:
+            face = fields[1:]
+            if any('-' in corner for corner in face):
+                face = [_absolute_corner(corner, rows) for corner in face]
+            for i in range(1, len(face) - 1):
+                corners += (face[0], face[i], face[i + 1])
+    if not corners:
+        raise ValueError(f'{path} contains no faces')
+
+    positions = np.array(rows['v'], dtype=np.float32)
+    uvs = np.array(rows['vt'], dtype=np.float32).reshape(-1, 2)
+    normals = np.array(rows['vn'], dtype=np.float32).reshape(-1, 3)
+
+    # One vertex per distinct corner, numbered in order of first use
+    unique, indices = _number_by_first_use(np.array(corners))
+    references = np.array([(corner.split('/') + ['', ''])[:3] for corner in unique])
+    references = np.where(references == '', '0', references).astype(np.int64) - 1
+
+    has_uvs = len(uvs) > 0 and bool(np.any(references[:, 1] >= 0))
+    has_normals = len(normals) > 0 and bool(np.any(references[:, 2] >= 0))
+    return {
+        'positions': positions[references[:, 0]],
+        'uvs': np.where(references[:, 1:2] >= 0, uvs[references[:, 1]], 0).astype(np.float32) if has_uvs else None,
+        'normals': np.where(references[:, 2:3] >= 0, normals[references[:, 2]], 0).astype(np.float32) if has_normals else None,
+        'indices': indices.astype(np.uint32),
+    }
+
+
+def _number_by_first_use(values: np.ndarray):
+    """Distinct values in order of first appearance, and each value's position among them."""
+    unique, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return unique[order], rank[inverse.reshape(-1)]
+
+
+def decimate(mesh: Dict[str, Optional[np.ndarray]], max_triangles: int) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Reduce a mesh to at most a number of triangles by vertex clustering.
+
+    Args:
+        mesh: Arrays as returned by load_obj
+        max_triangles: Triangle budget
+
+    Returns:
+        dict: Decimated mesh in the same form (the input if it already fits)
+    """
+    if len(mesh['indices']) // 3 <= max_triangles:
+        return mesh
+    # Finer grids keep more triangles; find the finest grid within budget
+    best = None
+    low, high = 1, 4096
+    while low <= high:
+        resolution = (low + high) // 2
+        candidate = _cluster(mesh, resolution)
+        if len(candidate['indices']) // 3 <= max_triangles:
+            best, low = candidate, resolution + 1
+        else:
+            high = resolution - 1
+    return best if best is not None else _cluster(mesh, 1)
+
+
+def _cluster(mesh: Dict[str, Optional[np.ndarray]], resolution: int) -> Dict[str, Optional[np.ndarray]]:
+    """Collapse the vertices of every grid cell (resolution cells along the longest side)."""
+    positions, uvs, normals = mesh['positions'], mesh['uvs'], mesh['normals']
+    cells = _grid_cells(positions, resolution)
+    position_key = cells[:, 0] + resolution * (cells[:, 1] + resolution * cells[:, 2])
+    key = position_key
+    if uvs is not None:
+        uv_cells = _grid_cells(uvs, resolution)
+        key = (position_key * resolution + uv_cells[:, 0]) * resolution + uv_cells[:, 1]
+    _, cluster = np.unique(key, return_inverse=True)
+    _, position_cluster = np.unique(position_key, return_inverse=True)
+    cluster, position_cluster = cluster.reshape(-1), position_cluster.reshape(-1)
+    count = cluster.max() + 1
+
+    # Triangles with two corners in one cluster collapse; keep one copy of
+    # each remaining triangle per orientation (front and back of thin walls)
+    triangles = cluster[mesh['indices']].reshape(-1, 3)
+    triangles = triangles[(triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) &
+                          (triangles[:, 2] != triangles[:, 0])]
+    start = np.argmin(triangles, axis=1)[:, np.newaxis]
+    triangles = np.unique(np.take_along_axis(triangles, (start + np.arange(3)) % 3, axis=1), axis=0)
+    used, indices = _number_by_first_use(triangles.reshape(-1))
+
+    # Every cluster lies inside one position cell and takes that cell's mean position
+    owner = np.zeros(count, dtype=np.int64)
+    owner[cluster] = position_cluster
+    return {
+        'positions': _group_mean(positions, position_cluster)[owner[used]],
+        'uvs': None if uvs is None else _group_mean(uvs, cluster)[used],
+        'normals': None if normals is None else _group_mean(normals, cluster)[used],
+        'indices': indices.astype(np.uint32),
+    }
+
+
+def _grid_cells(values: np.ndarray, resolution: int) -> np.ndarray:
+    """Integer cell coordinates of points on a cubic grid over their bounding box."""
+    low = values.min(axis=0)
+    extent = np.ptp(values, axis=0).max()
+    cells = (values - low) * (resolution / (extent if extent > 0 else 1))
+    return np.minimum(cells.astype(np.int64), resolution - 1)
+
+
+def _group_mean(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """Per-group mean of the rows of values."""
+    counts = np.bincount(groups)
+    sums = [np.bincount(groups, weights=values[:, column], minlength=len(counts))
+            for column in range(values.shape[1])]
+    return (np.stack(sums, axis=1) / counts[:, np.newaxis]).astype(np.float32)
+
+
+def _absolute_corner(corner: str, rows: Dict[str, List]) -> str:
+    """Resolve negative (relative) OBJ indices against the elements read so far."""
+    parts = corner.split('/')
+    for position, kind in enumerate(('v', 'vt', 'vn')[:len(parts)]):
+        if parts[position].startswith('-'):
+            parts[position] = str(len(rows[kind]) + 1 + int(parts[position]))
+    return '/'.join(parts)
+
+
+def _quantize(values: np.ndarray):
+    """Map values to uint16 over their bounding box; returns (q, offset, scale)."""
+    low = values.min(axis=0)
+    scale = (values.max(axis=0) - low) / 65535
+    scale = np.where(scale > 0, scale, 1).astype(np.float32)
+    q = np.rint((values - low) / scale)
+    return np.clip(q, 0, 65535).astype('<u2'), low.astype(np.float32), scale
+
+
+def _pad(data: bytes) -> bytes:
+    """Zero-pad a section to a multiple of 4 bytes."""
+    return data + b'\0' * (-len(data) % 4)
+
+
+def encode_mesh(mesh: Dict[str, Optional[np.ndarray]]) -> bytes:
+    """
+    Serialize a mesh in the binary layout described in the module docstring.
+
+    Args:
+        mesh: Arrays as returned by load_obj
+
+    Returns:
+        bytes: Encoded mesh
+    """
+    positions, normals, uvs = mesh['positions'], mesh['normals'], mesh['uvs']
+    vertex_count = len(positions)
+    index_dtype = '<u2' if vertex_count <= 65536 else '<u4'
+
+    q_positions, position_offset, position_scale = _quantize(positions)
+    sections = [_pad(q_positions.tobytes())]
+    flags = 0
+    if normals is not None:
+        flags |= FLAG_NORMALS
+        length = np.linalg.norm(normals, axis=1, keepdims=True)
+        unit = normals / np.where(length > 0, length, 1)
+        sections.append(_pad(np.rint(unit * 127).astype(np.int8).tobytes()))
+    uv_offset = uv_scale = np.zeros(2, dtype=np.float32)
+    if uvs is not None:
+        flags |= FLAG_UVS
+        q_uvs, uv_offset, uv_scale = _quantize(uvs)
+        sections.append(_pad(q_uvs.tobytes()))
+    sections.append(_pad(mesh['indices'].astype(index_dtype).tobytes()))
+
+    header = _HEADER.pack(MESH_MAGIC, MESH_VERSION, vertex_count, len(mesh['indices']),
+                          np.dtype(index_dtype).itemsize, flags,
+                          *position_offset, *position_scale, *uv_offset, *uv_scale)
+    return header + b''.join(sections)
+
+
+def decode_mesh(data: bytes) -> Dict[str, Optional[np.ndarray]]:
+    """
+    Read an encoded mesh back into float32/uint32 arrays (the inverse of
+    encode_mesh up to quantization), as the viewer does.
+
+    Args:
+        data: Encoded mesh
+
+    Returns:
+        dict: Arrays in the form returned by load_obj
+
+    Raises:
+        ValueError: If the data is not a mesh of the supported version
+    """
+    fields = _HEADER.unpack_from(data)
+    magic, version, vertex_count, index_count, index_size, flags = fields[:6]
+    if magic != MESH_MAGIC or version != MESH_VERSION:
+        raise ValueError(f'Not a version {MESH_VERSION} mesh')
+    position_offset, position_scale = np.array(fields[6:9]), np.array(fields[9:12])
+    uv_offset, uv_scale = np.array(fields[12:14]), np.array(fields[14:16])
+
+    offset = _HEADER.size
+
+    def section(dtype, count):
+        nonlocal offset
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        offset += -(-array.nbytes // 4) * 4
+        return array
+
+    positions = section('<u2', vertex_count * 3).reshape(-1, 3) * position_scale + position_offset
+    normals = section(np.int8, vertex_count * 3).reshape(-1, 3) / 127.0 if flags & FLAG_NORMALS else None
+    uvs = section('<u2', vertex_count * 2).reshape(-1, 2) * uv_scale + uv_offset if flags & FLAG_UVS else None
+    indices = section('<u2' if index_size == 2 else '<u4', index_count)
+    return {
+        'positions': positions.astype(np.float32),
+        'normals': None if normals is None else normals.astype(np.float32),
+        'uvs': None if uvs is None else uvs.astype(np.float32),
+        'indices': indices.astype(np.uint32),
+    }
+
+
+def source_path(model: str) -> Path:
+    """OBJ file of a model in SHELL_MODELS."""
+    return ASSETS_DIR / SHELL_MODELS[model]
+
+
+def lod_levels() -> range:
+    """Detail levels built per model; 0 is the full mesh."""
+    return range(len(MESH_SETTINGS['lod_triangles']) + 1)
+
+
+def mesh_path(model: str, encoding: str = 'identity', lod: int = 0) -> Path:
+    """Built mesh file of a model in one representation (whether or not it exists)."""
+    level = f".lod{lod}" if lod else ''
+    return MESH_SETTINGS['directory'] / f"{model}{level}.mesh{ENCODINGS[encoding]}"
+
+
+def is_current(model: str) -> bool:
+    """Whether all levels are built, match the format version and are newer than the OBJ."""
+    path = mesh_path(model)
+    try:
+        with open(path, 'rb') as handle:
+            magic, version = struct.unpack('<4sI', handle.read(8))
+        return (magic == MESH_MAGIC and version == MESH_VERSION and
+                path.stat().st_mtime >= source_path(model).stat().st_mtime and
+                all(mesh_path(model, lod=lod).exists() for lod in lod_levels()))
+    except (OSError, struct.error):
+        return False
+
+
+def build_mesh(model: str, force: bool = False) -> Dict[int, Dict[str, Path]]:
+    """
+    Convert one model to binary meshes at every detail level, plus their
+    precompressed copies.
+
+    Files are written under temporary names and renamed into place, so
+    concurrent builds (and readers in other processes) never see a
+    partial file.
+
+    Args:
+        model: Key of SHELL_MODELS
+        force: Rebuild even if the stored meshes are current
+
+    Returns:
+        dict: Detail level -> Content-Encoding -> path of every stored representation
+
+    Raises:
+        FileNotFoundError: If the model's OBJ file is missing
+    """
+    with _build_lock:
+        if force or not is_current(model):
+            mesh = load_obj(source_path(model))
+            levels = [mesh] + [decimate(mesh, budget) for budget in MESH_SETTINGS['lod_triangles']]
+            os.makedirs(MESH_SETTINGS['directory'], exist_ok=True)
+            # The full mesh goes last; its presence marks a finished build
+            for lod in reversed(lod_levels()):
+                _write_representations(model, lod, encode_mesh(levels[lod]))
+        return {lod: {encoding: mesh_path(model, encoding, lod) for encoding in ENCODINGS
+                      if mesh_path(model, encoding, lod).exists()}
+                for lod in lod_levels()}
+
+
+def _write_representations(model: str, lod: int, data: bytes) -> None:
+    """Store one level uncompressed and precompressed; the uncompressed file last."""
+    representations = {
+        'gzip': gzip.compress(data, MESH_SETTINGS['gzip_level'], mtime=0),
+        'br': brotli.compress(data, quality=MESH_SETTINGS['brotli_quality']) if brotli else None,
+        'identity': data,
+    }
+    for encoding, encoded in representations.items():
+        path = mesh_path(model, encoding, lod)
+        if encoded is not None:
+            _write_atomic(path, encoded)
+        elif path.exists():
+            os.remove(path)  # Left over from a build with brotli installed
+
+
+def build_all(force: bool = False) -> Dict[str, Dict[int, Dict[str, Path]]]:
+    """
+    Build every model in SHELL_MODELS whose OBJ file is present.
+
+    Args:
+        force: Rebuild meshes that are already current
+
+    Returns:
+        dict: Model -> levels and representations, as returned by build_mesh
+    """
+    return {model: build_mesh(model, force) for model in SHELL_MODELS
+            if source_path(model).exists()}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file under a temporary name and rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,251 @@
+"""
+Metrics - Low-overhead timers, counters and a Prometheus text exporter
+
+Hot paths call timed('phase') around each stage of a texture request. A
+timed block costs two perf_counter() calls and one short lock, so the
+instrumentation stays on in production. Every block feeds:
+
+- the PHASE_SECONDS histogram, exported at /metrics
+- the timings of the current request, if the API started a collection
+  with collect_timings(); they become the Server-Timing header
+
+Metrics live in this process. Job queue workers run in their own
+processes, so their phases are not exported; the web process records job
+durations and queue depth instead.
+
+Metric values are either updated in place (inc/observe) or read from a
+callback at export time, which keeps counters such as cache hits in the
+objects that own them.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import METRICS_SETTINGS
+
+# Timings of the request being handled in this context (None outside requests)
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = '') -> str:
+    """Render a Prometheus label set, e.g. {phase="encode",le="0.1"}."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    """Render a sample value the way Prometheus expects."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Common parts of counters, gauges and histograms."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.callback = callback
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Label values in declaration order."""
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self) -> List[Tuple[str, float]]:
+        """Current (suffix+labels, value) pairs for export."""
+        if self.callback is not None:
+            values = self.callback()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [(_format_labels(self.labels, key), value) for key, value in sorted(values.items())]
+
+    def render(self) -> str:
+        """HELP, TYPE and sample lines of this metric."""
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        lines += [f'{self.name}{labels} {_format_number(value)}' for labels, value in self.samples()]
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Add to the counter for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        """Replace the gauge value for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = ()):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        """Count one observation in its bucket."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def render(self) -> str:
+        """Cumulative bucket, sum and count lines per label set."""
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_number(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {cumulative}')
+        return '\n'.join(lines)
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, replacing one registered under the same name."""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition (format version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+PHASE_SECONDS = REGISTRY.register(Histogram(
+    'texture_phase_seconds', 'Time spent per stage of texture generation.',
+    labels=('phase',), buckets=METRICS_SETTINGS['phase_buckets']))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'http_request_duration_seconds', 'API request latency until the response is ready.',
+    labels=('endpoint', 'method', 'status'), buckets=METRICS_SETTINGS['request_buckets']))
+SIMULATION_STEPS = REGISTRY.register(Counter(
+    'texture_simulation_steps_total', 'Simulation time steps executed.'))
+SIMULATION_CELL_STEPS = REGISTRY.register(Counter(
+    'texture_simulation_cell_steps_total', 'Grid cell updates executed (cells x steps).'))
+SIMULATION_SECONDS = REGISTRY.register(Counter(
+    'texture_simulation_seconds_total', 'Time spent in the integration loop.'))
+STEPS_PER_SECOND = REGISTRY.register(Gauge(
+    'texture_simulation_steps_per_second', 'Step rate of the most recent simulation run.'))
+JOB_SECONDS = REGISTRY.register(Histogram(
+    'texture_job_duration_seconds', 'Queued job time from submission to completion.',
+    labels=('status',), buckets=METRICS_SETTINGS['request_buckets'] + (120, 300, 600)))
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Time a block as one phase of texture generation.
+
+    Args:
+        phase: Phase name, used as the histogram label and Server-Timing entry
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PHASE_SECONDS.observe(elapsed, phase=phase)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + elapsed
+
+
+def record_simulation(steps: int, cells: int, seconds: float) -> None:
+    """
+    Account for a finished stretch of the integration loop.
+
+    Args:
+        steps: Time steps executed
+        cells: Grid cells updated per step (all stack members)
+        seconds: Wall time the steps took
+    """
+    SIMULATION_STEPS.inc(steps)
+    SIMULATION_CELL_STEPS.inc(steps * cells)
+    SIMULATION_SECONDS.inc(seconds)
+    if steps and seconds > 0:
+        STEPS_PER_SECOND.set(steps / seconds)
+
+
+def collect_timings() -> contextvars.Token:
+    """Start collecting phase timings for the current request."""
+    return _request_timings.set({})
+
+
+def finish_timings(token: contextvars.Token) -> Dict[str, float]:
+    """Stop collecting and return the phase durations in seconds."""
+    timings = _request_timings.get() or {}
+    _request_timings.reset(token)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    """
+    Format phase durations as a Server-Timing header value.
+
+    Args:
+        timings: Phase durations in seconds
+        total: Whole request duration in seconds
+
+    Returns:
+        str: e.g. 'validate;dur=0.2, simulate;dur=812.5, total;dur=820.1'
+    """
+    entries = [f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in timings.items()]
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
@@ -0,0 +1,208 @@
+"""
+Mip Pyramids - Periodic downsampling of textures and atlas packing
+
+Shell textures are sampled with repeat wrapping, so every level is
+resampled with wrap-around indexing: the pixels left of column 0 are the
+last columns of the image. Since the simulation itself is periodic, each
+level then tiles as seamlessly as the base image.
+
+Levels follow the GPU convention: level k is max(1, floor(size / 2^k))
+pixels along each axis, down to 1x1. Each level is resampled from the one
+before it with a separable filter (area-weighted box or Lanczos-3), in
+linear light so that thin bright stripes do not darken as they shrink.
+
+All levels are packed into one atlas image so a single download (and a
+single cache entry) carries the whole pyramid:
+
+    +-----------+-----+
+    |           |  1  |
+    |     0     +--+--+
+    |           |2 |
+    |           +-++
+    |           |3|
+    +-----------+-+
+
+Level 0 sits at the origin, the others are stacked in the column to its
+right. mip_layout() gives the rectangle of every level.
+"""
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+# Resampling kernels: (support radius in output pixels, weight function)
+KERNELS = {
+    'box': (0.5, None),  # Exact area overlap, computed in _resample_weights
+    'lanczos': (3.0, lambda x: np.sinc(x) * np.sinc(x / 3.0)),
+}
+
+# sRGB value (0 - 255) to linear intensity
+_SRGB_TO_LINEAR = np.array([
+    value / 12.92 if value <= 0.04045 else ((value + 0.055) / 1.055) ** 2.4
+    for value in np.arange(256) / 255.0
+], dtype=np.float32)
+
+Rect = Tuple[int, int, int, int]
+
+
+def level_sizes(width: int, height: int) -> List[Tuple[int, int]]:
+    """
+    Dimensions of every mip level, base first.
+
+    Args:
+        width: Base image width in pixels
+        height: Base image height in pixels
+
+    Returns:
+        list: (width, height) per level, ending with (1, 1)
+    """
+    sizes = [(width, height)]
+    while sizes[-1] != (1, 1):
+        w, h = sizes[-1]
+        sizes.append((max(1, w // 2), max(1, h // 2)))
+    return sizes
+
+
+def mip_layout(width: int, height: int) -> List[Rect]:
+    """
+    Rectangles of the mip levels inside the atlas.
+
+    Args:
+        width: Base image width in pixels
+        height: Base image height in pixels
+
+    Returns:
+        list: (x, y, width, height) per level, base first
+    """
+    sizes = level_sizes(width, height)
+    layout = [(0, 0, width, height)]
+    y = 0
+    for w, h in sizes[1:]:
+        layout.append((width, y, w, h))
+        y += h
+    return layout
+
+
+def atlas_size(width: int, height: int) -> Tuple[int, int]:
+    """Width and height of the atlas holding all levels of an image."""
+    layout = mip_layout(width, height)
+    return (max(x + w for x, _, w, _ in layout),
+            max(y + h for _, y, _, h in layout))
+
+
+def _resample_weights(source: int, target: int, kernel: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Taps of a periodic 1D resampling from source to target pixels.
+
+    Args:
+        source: Input length in pixels
+        target: Output length in pixels (at most source)
+        kernel: Key of KERNELS
+
+    Returns:
+        tuple: (indices, weights), both shaped (target, taps); indices
+               are already wrapped into [0, source) and the weights of
+               every output pixel sum to 1
+    """
+    scale = source / target
+    radius, function = KERNELS[kernel]
+    support = radius * scale
+    taps = int(math.ceil(2 * support)) + 1
+
+    # Output pixel j covers source coordinates [j * scale, (j + 1) * scale)
+    centers = (np.arange(target) + 0.5) * scale
+    first = np.floor(centers - support).astype(np.int64)
+    positions = first[:, np.newaxis] + np.arange(taps)
+
+    if function is None:
+        # Overlap of source pixel [p, p + 1) with the output footprint
+        low = np.maximum(positions, (centers - support)[:, np.newaxis])
+        high = np.minimum(positions + 1, (centers + support)[:, np.newaxis])
+        weights = np.clip(high - low, 0, None)
+    else:
+        weights = function((positions + 0.5 - centers[:, np.newaxis]) / scale)
+        weights[np.abs(positions + 0.5 - centers[:, np.newaxis]) >= support] = 0
+
+    weights /= weights.sum(axis=1, keepdims=True)
+    used = np.any(weights != 0, axis=0)  # e.g. the spare tap of an exact 2:1 box
+    return positions[:, used] % source, weights[:, used].astype(np.float32)
+
+
+def _resample_axis(image: np.ndarray, axis: int, target: int, kernel: str) -> np.ndarray:
+    """
+    Resample one axis of a float32 (height, width, channels) image.
+
+    Loops over the filter taps rather than gathering every tap at once,
+    so memory stays at one output-sized temporary.
+    """
+    if image.shape[axis] == target:
+        return image
+    indices, weights = _resample_weights(image.shape[axis], target, kernel)
+    shape = [1, 1, 1]
+    shape[axis] = target
+    result = None
+    for tap in range(indices.shape[1]):
+        term = np.take(image, indices[:, tap], axis=axis)
+        term *= weights[:, tap].reshape(shape)
+        if result is None:
+            result = term
+        else:
+            result += term
+    return result
+
+
+def srgb_to_linear(rgb: np.ndarray) -> np.ndarray:
+    """Linear float32 intensities of a uint8 sRGB image."""
+    return _SRGB_TO_LINEAR[rgb]
+
+
+def linear_to_srgb(linear: np.ndarray) -> np.ndarray:
+    """uint8 sRGB image of linear intensities (clipped to [0, 1])."""
+    linear = np.clip(linear, 0.0, 1.0)
+    srgb = np.where(linear <= 0.0031308, linear * 12.92,
+                    1.055 * np.power(linear, 1 / 2.4, dtype=np.float32) - 0.055)
+    return np.rint(srgb * 255).astype(np.uint8)
+
+
+def build_pyramid(rgb: np.ndarray, kernel: str = 'box', linear_light: bool = True) -> List[np.ndarray]:
+    """
+    Downsample an image into its mip levels.
+
+    Args:
+        rgb: uint8 image shaped (height, width, 3)
+        kernel: Key of KERNELS
+        linear_light: Filter linear intensities instead of sRGB values
+
+    Returns:
+        list: uint8 images of levels 1.. (the base is not repeated)
+    """
+    height, width = rgb.shape[:2]
+    current = srgb_to_linear(rgb) if linear_light else rgb.astype(np.float32) / 255
+    levels = []
+    for w, h in level_sizes(width, height)[1:]:
+        # Levels are chained, each built from the unquantized one above it
+        current = _resample_axis(_resample_axis(current, 0, h, kernel), 1, w, kernel)
+        if linear_light:
+            levels.append(linear_to_srgb(current))
+        else:
+            levels.append(np.rint(np.clip(current, 0, 1) * 255).astype(np.uint8))
+    return levels
+
+
+def pack_atlas(rgb: np.ndarray, levels: List[np.ndarray]) -> np.ndarray:
+    """
+    Place the base image and its mip levels into one atlas (see mip_layout).
+
+    Args:
+        rgb: Base image shaped (height, width, 3)
+        levels: Output of build_pyramid for that image
+
+    Returns:
+        np.ndarray: uint8 atlas; pixels outside every level are black
+    """
+    height, width = rgb.shape[:2]
+    atlas_width, atlas_height = atlas_size(width, height)
+    atlas = np.zeros((atlas_height, atlas_width, rgb.shape[2]), dtype=np.uint8)
+    for (x, y, w, h), level in zip(mip_layout(width, height), [rgb] + levels):
+        atlas[y:y + h, x:x + w] = level
+    return atlas
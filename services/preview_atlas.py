@@ -0,0 +1,298 @@
+"""
+Preview Atlas - Precomputed low-resolution previews of the parameter space
+
+Every slider change on the activator-inhibitor page used to wait for a
+full /calculate round-trip. The atlas answers it from previews simulated
+ahead of time instead. `flask build-previews` sweeps the grid of
+PREVIEW_ATLAS_SETTINGS:
+
+- t_max: all snapshots of one run per parameter set, taken as the run
+  passes each listed time
+- feed_rate x kill_rate: every combination, simulated together as
+  stacked members with per-member parameters (in stacks of about
+  BATCH_SETTINGS['chunk_cells'] cells, as /calculate/batch does)
+
+Previews are `size` pixels wide but stand in for a `texture_size` texture:
+diffusion rates are divided by (texture_size / size)^2, as in the coarse
+phase of a multigrid run, so a preview shows the same pattern scale as
+the full render, downsampled. Early termination is off, and every run
+starts from the seeded initial state of SIMULATION_PARAMS.
+
+K only distinguishes cache entries and does not enter the simulation, and
+delta_t changes a pattern far less than t_max does, so neither is an axis:
+lookups accept them and use the nearest snapshot in time.
+
+Files in PREVIEW_ATLAS_SETTINGS['directory']:
+
+    atlas-<build>.npy  uint8[t_max, feed_rate, kill_rate, 2, size, size]:
+                       activator and inhibitor of every grid point, each
+                       normalized to 0 - 255 as colorize() normalizes it.
+                       Memory-mapped, so a lookup touches only the pages of
+                       one preview
+    index.json         axis values, the simulation settings the atlas was
+                       built with and the name of its array
+
+A rebuild writes its array under a new name, then replaces index.json,
+so a reader always pairs an index with the array it describes. The
+previous build's array is kept for readers that have just read the old
+index; older ones are deleted.
+
+A lookup picks the nearest value on each axis (t_max on a log scale) and
+blends the two colors over the stored fields, like colorize() does for a
+full render, so colors need no axis of their own.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import BATCH_SETTINGS, BACKEND_SETTINGS, PREVIEW_ATLAS_SETTINGS, SIMULATION_PARAMS
+from utils.helpers import hex_to_rgb, validate_texture_params
+
+# Layout version stored in the index; atlases of another version are rebuilt
+ATLAS_VERSION = 2
+
+# Callback receiving (previews_done, previews_total) during a build
+BuildProgress = Callable[[int, int], None]
+
+
+def index_path(directory: Optional[Path] = None) -> Path:
+    """Path of the atlas index."""
+    return Path(directory or PREVIEW_ATLAS_SETTINGS['directory']) / 'index.json'
+
+
+def atlas_paths(directory: Optional[Path] = None) -> Tuple[Path, Path]:
+    """
+    Paths of the current atlas array and its index.
+
+    Raises:
+        FileNotFoundError: If no atlas was built
+    """
+    path = index_path(directory)
+    return path.parent / _array_name(json.loads(path.read_text())), path
+
+
+def build_atlas(service, directory: Optional[Path] = None,
+                progress: Optional[BuildProgress] = None) -> Dict[str, Any]:
+    """
+    Simulate every preview of PREVIEW_ATLAS_SETTINGS and write the atlas.
+
+    Args:
+        service: TextureGeneratorService to simulate with (checkpoints
+                 are not needed and best disabled in it)
+        directory: Output directory (default from PREVIEW_ATLAS_SETTINGS)
+        progress: Optional callback receiving (previews_done, previews_total)
+
+    Returns:
+        dict: The index written next to the atlas
+    """
+    settings = PREVIEW_ATLAS_SETTINGS
+    size, delta_t = settings['size'], settings['delta_t']
+    times = sorted(settings['t_max'])
+    feeds, kills = list(settings['feed_rate']), list(settings['kill_rate'])
+    scale = (settings['texture_size'] / size) ** 2
+    snapshots = {int(round(t_max / delta_t)): index for index, t_max in enumerate(times)}
+    interval = math.gcd(*snapshots)
+
+    # One member per (feed_rate, kill_rate), run to the last snapshot
+    result = validate_texture_params({
+        't_max': times[-1], 'delta_t': delta_t, 'size': size, 'tolerance': 0,
+        'backend': BACKEND_SETTINGS['default']
+    })
+    if not result['valid']:
+        raise ValueError(result['error'])
+    combinations = [(f, k) for f in range(len(feeds)) for k in range(len(kills))]
+    variants = [{
+        **result['params'],
+        'D_a': SIMULATION_PARAMS['D_a'] / scale,
+        'D_b': SIMULATION_PARAMS['D_b'] / scale,
+        'feed_rate': feeds[f],
+        'kill_rate': kills[k],
+        'random_seed': SIMULATION_PARAMS['random_seed'],
+    } for f, k in combinations]
+
+    path = index_path(directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        previous = _array_name(json.loads(path.read_text()))
+    except (FileNotFoundError, ValueError):
+        previous = None
+    # A fresh name: readers of the current index keep mapping the current array
+    array_name = f'atlas-{uuid.uuid4().hex[:12]}.npy'
+    fd, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        atlas = np.lib.format.open_memmap(
+            temporary, mode='w+', dtype=np.uint8,
+            shape=(len(times), len(feeds), len(kills), 2, size, size))
+        stack_size = max(1, BATCH_SETTINGS['chunk_cells'] // (size * size))
+        done, total = 0, len(times) * len(combinations)
+        for start in range(0, len(combinations), stack_size):
+            members = combinations[start:start + stack_size]
+
+            def snapshot(step, A, B, members=members):
+                nonlocal done
+                if step not in snapshots:
+                    return
+                for offset, (f, k) in enumerate(members):
+                    atlas[snapshots[step], f, k, 0] = _quantize(A[offset])
+                    atlas[snapshots[step], f, k, 1] = _quantize(B[offset])
+                done += len(members)
+                if progress is not None:
+                    progress(done, total)
+
+            service.simulate_stack(variants[start:start + stack_size], snapshot, interval)
+        atlas.flush()
+        del atlas
+        os.replace(temporary, path.parent / array_name)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    index = {
+        'version': ATLAS_VERSION,
+        'size': size,
+        'texture_size': settings['texture_size'],
+        'delta_t': delta_t,
+        't_max': times,
+        'feed_rate': feeds,
+        'kill_rate': kills,
+        'simulation': {name: SIMULATION_PARAMS[name] for name in ('D_a', 'D_b', 'random_seed')},
+        'atlas': array_name,
+    }
+    # The index goes last: once it names the new array, the build is visible
+    _write_atomic(path, json.dumps(index, indent=2).encode('utf-8'))
+    for stale in path.parent.glob('atlas*.npy'):
+        if stale.name not in (array_name, previous):
+            stale.unlink(missing_ok=True)
+    return index
+
+
+def _array_name(index: Dict[str, Any]) -> str:
+    """File name of the array an index describes (before version 2: atlas.npy)."""
+    return index.get('atlas', 'atlas.npy')
+
+
+def _quantize(field: np.ndarray) -> np.ndarray:
+    """Normalize a field to 0 - 255 as colorize() does (a uniform field maps to 0)."""
+    low, high = field.min(), field.max()
+    normalized = np.subtract(field, low, dtype=np.float32)
+    span = np.float32(high - low)
+    if not span > 0:
+        return np.zeros(field.shape, dtype=np.uint8)
+    normalized /= span
+    normalized *= 255
+    return np.rint(normalized).astype(np.uint8)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file under a temporary name and rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class PreviewAtlas:
+    """A built atlas, memory-mapped, with nearest-neighbour lookup."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        """
+        Map the atlas of a directory.
+
+        Args:
+            directory: Directory written by build_atlas (default from
+                       PREVIEW_ATLAS_SETTINGS)
+
+        Raises:
+            FileNotFoundError: If no atlas of the current version was built there
+        """
+        path = index_path(directory)
+        self.index = json.loads(path.read_text())
+        if self.index.get('version') != ATLAS_VERSION:
+            raise FileNotFoundError(f'{path} is not a version {ATLAS_VERSION} preview atlas')
+        self.previews = np.load(path.parent / _array_name(self.index), mmap_mode='r')
+        self._log_times = np.log(np.array(self.index['t_max'], dtype=np.float64))
+        self._feeds = np.array(self.index['feed_rate'], dtype=np.float64)
+        self._kills = np.array(self.index['kill_rate'], dtype=np.float64)
+
+    def nearest(self, t_max: float, feed_rate: float, kill_rate: float) -> Dict[str, Any]:
+        """
+        Grid point closest to a parameter set.
+
+        Args:
+            t_max: Simulation time (compared on a log scale)
+            feed_rate: Feed rate
+            kill_rate: Kill rate
+
+        Returns:
+            dict: 'index' (t, feed, kill positions) and the 't_max',
+                  'feed_rate' and 'kill_rate' of the preview
+        """
+        t = int(np.abs(self._log_times - math.log(t_max)).argmin())
+        f = int(np.abs(self._feeds - feed_rate).argmin())
+        k = int(np.abs(self._kills - kill_rate).argmin())
+        return {
+            'index': (t, f, k),
+            't_max': self.index['t_max'][t],
+            'feed_rate': self.index['feed_rate'][f],
+            'kill_rate': self.index['kill_rate'][k],
+        }
+
+    def render(self, t_max: float, feed_rate: float, kill_rate: float,
+               color1: str, color2: str) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Colorize the nearest preview.
+
+        Args:
+            t_max, feed_rate, kill_rate: Parameter set to look up
+            color1: Base color in HEX format
+            color2: Contrast color in HEX format
+
+        Returns:
+            tuple: uint8 RGB image of shape (size, size, 3), and the grid
+                   point it shows (see nearest)
+        """
+        point = self.nearest(t_max, feed_rate, kill_rate)
+        fields = self.previews[point['index']]
+        # Stored fields are already scaled by 255, so colors stay in 0 - 1
+        color1_rgb = np.array(hex_to_rgb(color1), dtype=np.float32)
+        color2_rgb = np.array(hex_to_rgb(color2), dtype=np.float32)
+        img_data = fields[0][..., np.newaxis] * color1_rgb
+        img_data += fields[1][..., np.newaxis] * color2_rgb
+        np.clip(img_data, 0, 255, out=img_data)
+        return img_data.astype(np.uint8), point
+
+
+_atlas = None
+_atlas_lock = threading.Lock()
+
+
+def get_atlas(directory: Optional[Path] = None) -> PreviewAtlas:
+    """
+    Atlas of this process, mapped on first use and remapped after a rebuild.
+
+    Raises:
+        FileNotFoundError: If no atlas was built
+    """
+    global _atlas
+    path = index_path(directory)
+    stat = path.stat()
+    # A rebuild replaces the index file, so its inode changes even within one mtime tick
+    stamp = (str(path), stat.st_ino, stat.st_mtime_ns)
+    with _atlas_lock:
+        if _atlas is None or _atlas[0] != stamp:
+            _atlas = (stamp, PreviewAtlas(directory))
+        return _atlas[1]
@@ -0,0 +1,129 @@
+"""
+Preview Stream - Progressive texture previews during a simulation
+
+Runs one texture generation in a background thread and turns its
+intermediate states into small JPEG frames, so the client sees the
+pattern forming instead of a spinner. Three parties are involved:
+
+- the simulation thread, which only copies a strided, downscaled view of
+  the fields at each frame boundary and hands it over
+- a single encoder thread, which colorizes and JPEG-encodes frames; while
+  it is busy new frames are dropped rather than queued, so a slow encoder
+  or client never slows the solver down
+- the consumer (the HTTP response), which iterates over events()
+
+The final full-resolution texture goes through the normal texture cache,
+and its key is delivered as the last event.
+"""
+import base64
+import io
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Tuple
+
+import numpy as np
+
+
+class StreamClosed(Exception):
+    """Raised inside the simulation thread once the consumer has gone away."""
+
+
+class PreviewStream:
+    """Background texture generation that emits preview frame events."""
+
+    def __init__(self, service, params: Dict[str, Any],
+                 frame_interval: int, preview_size: int, quality: int):
+        """
+        Prepare a stream; the simulation starts when events() is iterated.
+
+        Args:
+            service: TextureGeneratorService used for generation and colors
+            params: Normalized parameters from validate_texture_params
+            frame_interval: Simulation steps between preview frames
+            preview_size: Longest edge of preview frames in pixels
+            quality: JPEG quality of preview frames
+        """
+        self.service = service
+        self.params = params
+        self.frame_interval = frame_interval
+        self.preview_size = preview_size
+        self.quality = quality
+
+        self._events = queue.Queue()
+        self._encoder = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+        self._closed = threading.Event()
+
+    def events(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run the simulation and yield (event, payload) pairs as they occur.
+
+        Events are 'frame' (step, total, data URL of the JPEG preview),
+        then either 'result' (generation result with the cache key) or
+        'failed' (error message).
+        """
+        worker = threading.Thread(target=self._run, daemon=True)
+        worker.start()
+        try:
+            while True:
+                event = self._events.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            # Stops the simulation at its next callback if the client left early
+            self.close()
+
+    def close(self) -> None:
+        """Stop the simulation and release the encoder thread."""
+        self._closed.set()
+        self._encoder.shutdown(wait=False)
+
+    def _run(self) -> None:
+        """Simulation thread body."""
+        steps = int(self.params['t_max'] / self.params['delta_t'])
+        try:
+            result = self.service.generate_texture(
+                self.params,
+                progress=self._check_closed,
+                on_frame=lambda step, A, B: self._capture(step, steps, A, B),
+                frame_interval=self.frame_interval
+            )
+            # Let the last preview out before the final result
+            if self._pending is not None:
+                self._pending.result()
+            self._events.put(('result', result))
+        except StreamClosed:
+            pass
+        except Exception as e:
+            self._events.put(('failed', {'error': str(e)}))
+        finally:
+            self._events.put(None)
+
+    def _check_closed(self, done: int, total: int) -> None:
+        """Progress callback: abort once the consumer is gone."""
+        if self._closed.is_set():
+            raise StreamClosed()
+
+    def _capture(self, step: int, total: int, A: np.ndarray, B: np.ndarray) -> None:
+        """Frame callback: hand a downscaled copy to the encoder if it is idle."""
+        self._check_closed(step, total)
+        if self._pending is not None and not self._pending.done():
+            return
+        # Strided copies are tiny; the live buffers keep changing after we return.
+        # The stride follows the field, which is smaller in a multigrid coarse phase.
+        stride = max(1, A.shape[-1] // self.preview_size)
+        A_small = A[::stride, ::stride].copy()
+        B_small = B[::stride, ::stride].copy()
+        self._pending = self._encoder.submit(self._encode, step, total, A_small, B_small)
+
+    def _encode(self, step: int, total: int, A: np.ndarray, B: np.ndarray) -> None:
+        """Encoder thread body: colorize and JPEG-encode one frame."""
+        from PIL import Image
+
+        rgb = self.service.colorize(A, B, self.params['color1'], self.params['color2'])
+        buffer = io.BytesIO()
+        Image.fromarray(rgb).save(buffer, format='JPEG', quality=self.quality)
+        image = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+        self._events.put(('frame', {'step': step, 'total': total, 'image': image}))
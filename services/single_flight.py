@@ -0,0 +1,161 @@
+"""
+Single Flight - One computation per texture, however many ask for it
+
+A shared preset brings many identical /calculate requests within seconds.
+Without coordination each one misses the cache and runs the whole
+simulation. SingleFlight.run() lets only the first caller for a key (the
+leader) compute; later callers with the same key wait and receive its
+result:
+
+- within a process, followers wait on the leader's in-memory entry and
+  get the same result object
+- across processes on the same host (WSGI workers, job queue workers), the
+  leader holds an exclusive flock on a marker file named after the key in
+  COALESCING_SETTINGS['directory']; a process that finds the file locked
+  waits for the lock and then runs its function, which by then finds the
+  texture in the shared cache
+
+The marker file only exists while a computation is in flight. Its owner
+deletes it before unlocking, and a waiter that wins the lock on a file
+that has meanwhile been deleted retries on the current one.
+
+Platforms without fcntl (Windows) coalesce within each process only.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Optional: no cross-process coalescing without it
+    fcntl = None
+
+# Called while waiting, e.g. to check for cancellation; may raise to stop waiting
+Heartbeat = Callable[[], None]
+
+
+class _Flight:
+    """A computation in progress in this process."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with equal keys into one computation."""
+
+    def __init__(self, directory: Optional[Path], poll_interval: float = 0.05):
+        """
+        Args:
+            directory: Where marker files are created; None coalesces
+                       within this process only
+            poll_interval: Seconds between checks while waiting
+        """
+        self.directory = Path(directory) if directory is not None and fcntl is not None else None
+        self.poll_interval = poll_interval
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'thread': 0, 'process': 0}
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def run(self, key: str, function: Callable[[], Any],
+            heartbeat: Optional[Heartbeat] = None) -> Any:
+        """
+        Call function, unless an identical call is already in flight.
+
+        Args:
+            key: Identity of the computation (a hex cache key)
+            function: Computes the result; called by the leader only, and
+                      by followers from other processes after the leader
+                      has finished
+            heartbeat: Optional callback invoked every poll_interval while
+                       waiting; an exception it raises abandons the wait
+
+        Returns:
+            The leader's result within a process, the function's own result otherwise
+
+        Raises:
+            Exception: Whatever the leader's function raised
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._count('thread')
+            while not flight.done.wait(self.poll_interval):
+                if heartbeat is not None:
+                    heartbeat()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            with self._marker(key, heartbeat):
+                flight.result = function()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Computations led and requests coalesced (by scope) since startup."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._stats[field] += 1
+
+    @contextmanager
+    def _marker(self, key: str, heartbeat: Optional[Heartbeat]) -> Iterator[None]:
+        """Hold the marker file of a key for the duration of the block."""
+        if self.directory is None:
+            self._count('leaders')
+            yield
+            return
+
+        path = self.directory / f'{key}.lock'
+        waited = False
+        while True:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                while True:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        waited = True
+                        if heartbeat is not None:
+                            heartbeat()
+                        time.sleep(self.poll_interval)
+            except BaseException:
+                os.close(fd)
+                raise
+            # The previous owner may have deleted the file before we got the lock
+            try:
+                current = os.stat(path).st_ino == os.fstat(fd).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                break
+            os.close(fd)
+
+        self._count('process' if waited else 'leaders')
+        try:
+            yield
+        finally:
+            os.unlink(path)
+            os.close(fd)  # Releases the lock
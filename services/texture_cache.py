@@ -0,0 +1,280 @@
+"""
+Texture Cache - Content-addressed storage for generated textures
+
+Generated images are stored under a hash of everything that determines
+their pixels (normalized request parameters, texture size and the
+simulation parameters in effect). Identical requests therefore map to the
+same file, concurrent users never overwrite each other's results, and the
+URL of a texture can be cached forever by browsers and CDNs.
+
+Two tiers are kept, both with least-recently-used eviction:
+- memory: encoded image bytes for the hottest entries
+- disk: one file per key in the cache directory
+
+Files written by other worker processes are adopted on first lookup, so
+several processes can share one cache directory. The image format is part
+of the key, and the file extension follows the format, so one directory
+holds PNG, WebP and JPEG entries side by side.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Bump when the simulation or rendering changes in a way that alters pixels
+CACHE_VERSION = 2
+
+
+def texture_key(params: Dict[str, Any], size: int, simulation: Dict[str, Any]) -> str:
+    """
+    Compute the content address of a texture.
+
+    Args:
+        params: Normalized parameters from validate_texture_params
+        size: Texture dimensions in pixels
+        simulation: Simulation parameters in effect (D_a, D_b, rates, seed)
+
+    Returns:
+        str: 32-character hexadecimal key
+    """
+    payload = {
+        'version': CACHE_VERSION,
+        'params': params,
+        'size': size,
+        'simulation': simulation,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+def is_valid_key(key: str) -> bool:
+    """Check that a string looks like a key produced by texture_key."""
+    return len(key) == 32 and all(c in '0123456789abcdef' for c in key)
+
+
+class TextureCache:
+    """Two-tier (memory + disk) LRU cache of encoded texture images."""
+
+    def __init__(self, directory: Path, disk_budget: int, memory_budget: int,
+                 extensions: Tuple[str, ...] = ('.png',)):
+        """
+        Open the cache directory and index the files already present.
+
+        Args:
+            directory: Where cached image files are stored
+            disk_budget: Maximum total size of cached files in bytes
+            memory_budget: Maximum total size of in-memory entries in bytes
+            extensions: File extensions of cached images; the first one is
+                        the default for calls that do not name one
+        """
+        self.directory = Path(directory)
+        self.disk_budget = disk_budget
+        self.memory_budget = memory_budget
+        self.extensions = tuple(extensions)
+
+        # Entries are identified by file name (key + extension)
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # name -> bytes, least recent first
+        self._memory_bytes = 0
+        self._disk = OrderedDict()    # name -> file size, least recent first
+        self._disk_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan_directory()
+
+    def path_for(self, key: str, extension: Optional[str] = None) -> Path:
+        """Return the file path used for a key (whether or not it exists)."""
+        return self.directory / self._name(key, extension)
+
+    def contains(self, key: str, extension: Optional[str] = None, record: bool = True) -> bool:
+        """
+        Check whether a key is cached.
+
+        Args:
+            key: Texture key
+            extension: File extension of the image format (default: first)
+            record: Count the lookup as a hit or miss (probes that do not
+                    serve a request pass False)
+
+        Returns:
+            bool: True if the texture is available
+        """
+        name = self._name(key, extension)
+        with self._lock:
+            found = name in self._memory or self._adopt(name)
+            if found:
+                self._touch(name)
+            if record:
+                self._record(found)
+            return found
+
+    def record_lookup(self, found: bool) -> None:
+        """Count a lookup made of several unrecorded contains() probes as one hit or miss."""
+        with self._lock:
+            self._record(found)
+
+    def get(self, key: str, extension: Optional[str] = None) -> Optional[bytes]:
+        """
+        Fetch the encoded image for a key.
+
+        Args:
+            key: Texture key
+            extension: File extension of the image format (default: first)
+
+        Returns:
+            bytes: Encoded image data, or None if not cached
+        """
+        name = self._name(key, extension)
+        with self._lock:
+            data = self._memory.get(name)
+            if data is not None:
+                self._touch(name)
+                return data
+            if not self._adopt(name):
+                return None
+
+        # Read outside the lock; the file may be evicted concurrently
+        try:
+            data = (self.directory / name).read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._forget_disk(name)
+            return None
+
+        with self._lock:
+            self._touch(name)
+            self._remember(name, data)
+        return data
+
+    def put(self, key: str, data: bytes, extension: Optional[str] = None) -> Path:
+        """
+        Store an encoded image, evicting older entries to stay within budget.
+
+        The file is written to a temporary name and renamed into place so
+        readers never observe a partially written image.
+
+        Args:
+            key: Texture key
+            data: Encoded image bytes
+            extension: File extension of the image format (default: first)
+
+        Returns:
+            Path: Location of the cached file
+        """
+        name = self._name(key, extension)
+        path = self.directory / name
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._forget_disk(name)
+            self._disk[name] = len(data)
+            self._disk_bytes += len(data)
+            self._remember(name, data)
+            self._evict_disk()
+        return path
+
+    def stats(self) -> Dict[str, int]:
+        """Return entry counts, byte totals and hit/miss counters."""
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def _record(self, found: bool) -> None:
+        """Count a hit or a miss. Caller holds the lock."""
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def _name(self, key: str, extension: Optional[str]) -> str:
+        """File name of an entry."""
+        return f"{key}{extension or self.extensions[0]}"
+
+    def _scan_directory(self) -> None:
+        """Index existing files, oldest modification time first."""
+        entries = []
+        for extension in self.extensions:
+            for path in self.directory.glob(f"*{extension}"):
+                if is_valid_key(path.name[:-len(extension)]):
+                    stat = path.stat()
+                    entries.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _adopt(self, name: str) -> bool:
+        """Index a file written by another process. Caller holds the lock."""
+        if name in self._disk:
+            return True
+        path = self.directory / name
+        if not path.exists():
+            return False
+        size = path.stat().st_size
+        self._disk[name] = size
+        self._disk_bytes += size
+        return True
+
+    def _touch(self, name: str) -> None:
+        """Mark an entry as most recently used. Caller holds the lock."""
+        if name in self._memory:
+            self._memory.move_to_end(name)
+        if name in self._disk:
+            self._disk.move_to_end(name)
+            # Keep recency visible to other processes and after restarts
+            try:
+                os.utime(self.directory / name)
+            except FileNotFoundError:
+                self._forget_disk(name)
+
+    def _remember(self, name: str, data: bytes) -> None:
+        """Insert into the memory tier and evict. Caller holds the lock."""
+        if len(data) > self.memory_budget:
+            return
+        previous = self._memory.pop(name, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[name] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_budget:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _forget_disk(self, name: str) -> None:
+        """Drop an entry from the disk index. Caller holds the lock."""
+        size = self._disk.pop(name, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until within budget. Caller holds the lock."""
+        while self._disk_bytes > self.disk_budget and len(self._disk) > 1:
+            name, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            evicted = self._memory.pop(name, None)
+            if evicted is not None:
+                self._memory_bytes -= len(evicted)
+            try:
+                os.remove(self.directory / name)
+            except FileNotFoundError:
+                pass
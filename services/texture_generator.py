@@ -5,20 +5,97 @@ Business logic for generating mathematical textures using reaction-diffusion
 algorithms. Implements activator-inhibitor models for natural pattern simulation.
 """
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend for serverless deployment
-import matplotlib.pyplot as plt
+import io
+import itertools
 import os
-from config import IMAGES_DIR, SIMULATION_PARAMS, DEFAULT_TEXTURE_SIZE
-from utils.helpers import hex_to_rgb
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config import IMAGES_DIR, SIMULATION_PARAMS, DEFAULT_TEXTURE_SIZE, BATCH_SETTINGS, CACHE_SETTINGS, PYRAMID_SETTINGS, TILING_SETTINGS, CHECKPOINT_SETTINGS, CONVERGENCE_SETTINGS, IMAGE_FORMATS, ENCODING_SETTINGS, MIPMAP_SETTINGS, STARTUP_SETTINGS, SOLVER_SETTINGS, TEXTURE_DEFAULTS, COALESCING_SETTINGS, BACKEND_SETTINGS, COST_SETTINGS, PRECISION_SETTINGS
+from services.backends import available_backends, create_stepper, resolve_backend
+from services.cost_model import CostModel, cost_kind, encoded_pixels, work_units
+from services.simulation import STEPPERS, ConvergenceMonitor, GrayScottStepper, flush_underflow, upsample_periodic
+from services.checkpoint_store import CheckpointStore, state_key
+from services.metrics import record_simulation, timed
+from services.mipmaps import build_pyramid, mip_layout, pack_atlas
+from services.single_flight import SingleFlight
+from services.texture_cache import TextureCache, texture_key
+from services.tiled_simulation import TiledGrayScottStepper
+from utils.helpers import hex_to_rgb, image_format_available, validate_texture_params
+
+# Steps between progress callbacks during a simulation run
+PROGRESS_INTERVAL = 100
+
+ProgressCallback = Callable[[int, int], None]
+FrameCallback = Callable[[int, np.ndarray, np.ndarray], None]
 
 class TextureGeneratorService:
     """Service class for generating mathematical textures using various algorithms."""
     
-    def __init__(self):
-        """Initialize the texture generator service and ensure output directory exists."""
+    def __init__(self, cache: Optional[TextureCache] = None,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 flights: Optional[SingleFlight] = None,
+                 cost_model: Optional[CostModel] = None):
+        """
+        Initialize the texture generator service, its result cache, its
+        store of simulation checkpoints, the coalescing of identical
+        in-flight requests and the cost model.
+        
+        Args:
+            cache: Texture cache to use (default built from CACHE_SETTINGS)
+            checkpoints: Checkpoint store to use (default built from CHECKPOINT_SETTINGS)
+            flights: Request coalescing to use (default built from
+                     COALESCING_SETTINGS; None there if disabled)
+            cost_model: Cost model to use and calibrate (default loads
+                        COST_SETTINGS['calibration_file'] if present)
+        """
         # Create images directory if it doesn't exist
         os.makedirs(IMAGES_DIR, exist_ok=True)
+        self.cache = cache or TextureCache(
+            CACHE_SETTINGS['directory'],
+            disk_budget=CACHE_SETTINGS['disk_budget_mb'] * 1024 * 1024,
+            memory_budget=CACHE_SETTINGS['memory_budget_mb'] * 1024 * 1024,
+            extensions=tuple(spec['extension'] for spec in IMAGE_FORMATS.values())
+        )
+        self.checkpoints = checkpoints or CheckpointStore(
+            CHECKPOINT_SETTINGS['directory'],
+            disk_budget=CHECKPOINT_SETTINGS['disk_budget_mb'] * 1024 * 1024
+        )
+        if flights is None and COALESCING_SETTINGS['enabled']:
+            flights = SingleFlight(COALESCING_SETTINGS['directory'], COALESCING_SETTINGS['poll_interval'])
+        self.flights = flights
+        self.cost_model = cost_model or CostModel(COST_SETTINGS['calibration_file'])
+    
+    def prewarm(self) -> None:
+        """
+        Exercise the code paths of a first request without producing a texture.
+        
+        Runs STARTUP_SETTINGS['prewarm_steps'] steps of every solver in its
+        default precision (the explicit one on the default backend, which
+        compiles it if needed)
+        on a small grid, then colorizes, encodes (every available format) and
+        mipmaps the result, so module imports, Pillow plugin loading and
+        first-touch page faults happen now rather than in a user's request.
+        Nothing is cached or checkpointed and no metrics are recorded.
+        """
+        size = STARTUP_SETTINGS['prewarm_size']
+        physics = {
+            name: np.array([SIMULATION_PARAMS[name]]).reshape(-1, 1, 1)
+            for name in ('D_a', 'D_b', 'feed_rate', 'kill_rate')
+        }
+        delta_t = np.ones((1, 1, 1))
+        for solver in SOLVER_SETTINGS['available']:
+            precision = PRECISION_SETTINGS['interactive'][solver]
+            A, B = self._stack_initial_fields([SIMULATION_PARAMS['random_seed']], size, precision)
+            stepper = self._create_stepper(solver, BACKEND_SETTINGS['default'], A, B, delta_t, physics)
+            stepper.step(STARTUP_SETTINGS['prewarm_steps'])
+        
+        img_data = self.colorize(stepper.A[0], stepper.B[0], TEXTURE_DEFAULTS['color1'], TEXTURE_DEFAULTS['color2'])
+        from PIL import Image
+        for image_format, spec in IMAGE_FORMATS.items():
+            if image_format_available(image_format):
+                Image.fromarray(img_data).save(io.BytesIO(), format=spec['pil_format'])
+        for mip_filter in MIPMAP_SETTINGS['filters']:
+            build_pyramid(img_data, mip_filter, MIPMAP_SETTINGS['linear_light'])
     
     def generate_activator_inhibitor(self, K: float, t_max: float, delta_t: float, 
                                    color1: str, color2: str, size: int = DEFAULT_TEXTURE_SIZE) -> str:
@@ -39,41 +116,659 @@ class TextureGeneratorService:
         Returns:
             str: Path to generated image file
         """
-        # Initialize concentration grids with equilibrium values
-        A = np.ones((size, size)) * 0.5  # Activator concentration
-        B = np.ones((size, size)) * 0.25  # Inhibitor concentration
+        # Route through validation so every option gets its normalized default
+        validation_result = validate_texture_params({
+            'K': K, 't_max': t_max, 'delta_t': delta_t,
+            'color1': color1, 'color2': color2, 'size': size
+        })
+        if not validation_result['valid']:
+            raise ValueError(validation_result['error'])
+        
+        params = validation_result['params']
+        result = self.generate_texture(params)
+        return str(self.cache.path_for(result['key'], self.extension(params)))
+    
+    def generate_texture(self, params: Dict[str, Any],
+                         progress: Optional[ProgressCallback] = None,
+                         on_frame: Optional[FrameCallback] = None,
+                         frame_interval: int = PROGRESS_INTERVAL,
+                         from_start: bool = False) -> Dict[str, Any]:
+        """
+        Generate a texture, reusing the cached image for identical requests.
+        
+        Concurrent calls for the same images without on_frame share one
+        simulation (see services/single_flight.py): they wait for the
+        first, calling progress with 0 steps done while they wait, and
+        receive its result.
+        
+        Args:
+            params: Normalized parameters from validate_texture_params,
+                    optionally with simulation overrides
+            progress: Optional callback receiving (steps_done, steps_total)
+            on_frame: Optional callback receiving (step, A, B) at the start
+                      and every frame_interval steps; the fields are live
+                      buffers and must be copied if kept
+            frame_interval: Steps between on_frame calls
+            from_start: Simulate from the initial state even if the image is
+                        cached or a checkpoint exists, so on_frame sees the
+                        whole run (time-lapse export)
+            
+        Returns:
+            dict: Generation result, describe() plus:
+                - 'cached': True if the image was already available
+                - 'steps': simulation steps executed for this request
+                - 'stop_reason': 't_max', 'converged' or 'cached'
+        """
+        info = self.describe(params)
+        with timed('lookup'):
+            cached = self.is_cached(info)
+        if cached and not from_start:
+            return {**info, 'cached': True, 'steps': 0, 'stop_reason': 'cached'}
+        
+        if on_frame is None and not from_start and self.flights is not None:
+            def generate():
+                # Another process may have stored the texture while we waited
+                if self.is_cached(info, record=False):
+                    return {**info, 'cached': True, 'steps': 0, 'stop_reason': 'cached'}
+                return self._generate(params, info, False, progress)
+            
+            steps = int(params['t_max'] / params['delta_t'])
+            heartbeat = (lambda: progress(0, steps)) if progress is not None else None
+            return self.flights.run(info['mip_key'] or info['key'], generate, heartbeat)
+        
+        return self._generate(params, info, cached, progress, on_frame, frame_interval, from_start)
+    
+    def _generate(self, params: Dict[str, Any], info: Dict[str, Any], cached: bool,
+                  progress: Optional[ProgressCallback] = None,
+                  on_frame: Optional[FrameCallback] = None,
+                  frame_interval: int = PROGRESS_INTERVAL,
+                  from_start: bool = False) -> Dict[str, Any]:
+        """Simulate one texture and store its images unless cached (see generate_texture)."""
+        if on_frame is not None:
+            frame_callback = on_frame
+            on_frame = lambda step, A, B: frame_callback(step, A[0], B[0])
+        A, B, run = self._simulate([params], progress, on_frame, frame_interval, resume=not from_start)
+        
+        # Generate final texture image (and mip atlas) from simulation results
+        if not cached:
+            self._store_texture(A[0], B[0], params, info)
+        return {**info, 'cached': cached, **run}
+    
+    def generate_activator_inhibitor_batch(self, variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Generate several textures in one stacked simulation.
+        
+        Variants are simulated together as a single (N, size, size) array with
+        their physical parameters broadcast along the batch axis, so the
+        per-step NumPy overhead is paid once for the whole batch. Variants
+        that differ in step count, solver, backend, size or multigrid mode
+        run in separate groups, and groups are split into stacks of about
+        BATCH_SETTINGS['chunk_cells'] grid cells so the working set stays
+        cache-resident. Variants already in the texture cache are not
+        simulated again.
+        
+        Args:
+            variants: Normalized parameter sets from validate_batch_params
+                      (texture parameters plus D_a, D_b, feed_rate,
+                      kill_rate and random_seed)
+            
+        Returns:
+            list: Generation results (see generate_texture), in the order of variants
+        """
+        results = [None] * len(variants)
+        
+        groups = {}
+        for index, variant in enumerate(variants):
+            info = self.describe(variant)
+            if self.is_cached(info):
+                results[index] = {**info, 'cached': True}
+                continue
+            results[index] = {**info, 'cached': False}
+            groups.setdefault(self._stack_signature(variant), []).append(index)
+        
+        stacks = []
+        for members in groups.values():
+            size = variants[members[0]]['size']
+            stack_size = max(1, BATCH_SETTINGS['chunk_cells'] // (size * size))
+            stacks.extend(members[start:start + stack_size] for start in range(0, len(members), stack_size))
+        
+        for members in stacks:
+            A, B, _ = self._simulate([variants[index] for index in members])
+            
+            # Colorization is the only per-member stage
+            for offset, index in enumerate(members):
+                self._store_texture(A[offset], B[offset], variants[index], results[index])
+        
+        return results
+    
+    def simulate_stack(self, variants: List[Dict[str, Any]], on_frame: FrameCallback,
+                       frame_interval: int) -> Dict[str, Any]:
+        """
+        Simulate a stack of variants from their initial state, without storing images.
+        
+        For offline builds that only need intermediate states, such as the
+        preview atlas (services/preview_atlas.py). Final states are still
+        checkpointed if the service's checkpoint store is enabled.
+        
+        Args:
+            variants: Normalized parameter sets sharing _stack_signature,
+                      as validate_batch_params returns them
+            on_frame: Callback receiving (step, A, B) stacks shaped
+                      (N, size, size) at step 0 and every frame_interval steps
+            frame_interval: Steps between on_frame calls
+            
+        Returns:
+            dict: 'steps' executed and 'stop_reason'
+        """
+        _, _, run = self._simulate(variants, on_frame=on_frame, frame_interval=frame_interval, resume=False)
+        return run
+    
+    def texture_key(self, params: Dict[str, Any], mipmaps: bool = False) -> str:
+        """
+        Compute the cache key for a request.
+        
+        Simulation parameters are keyed by their effective values, so a
+        request that spells out the configured defaults shares its entry
+        with one that omits them. The base image does not depend on the
+        mip settings, so requests with and without mipmaps share it, nor
+        (beyond rounding) on the compute backend.
+        
+        Args:
+            params: Normalized request parameters
+            mipmaps: Key the mip atlas instead of the base image
+            
+        Returns:
+            str: Content address of the resulting image
+        """
+        texture_params = {
+            name: value for name, value in params.items()
+            if name not in SIMULATION_PARAMS and name not in ('size', 'backend', 'mipmaps', 'mip_filter')
+        }
+        if mipmaps:
+            texture_params['mip_filter'] = params['mip_filter']
+        return texture_key(texture_params, params['size'], self._simulation_params(params))
+    
+    def describe(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache entries and layout a request produces, without generating it.
+        
+        Args:
+            params: Normalized request parameters
+            
+        Returns:
+            dict: Texture description:
+                - 'key': content address of the base image
+                - 'format': image format the texture is encoded in
+                - 'tileable': True if the encoding keeps edges seamless
+                - 'mip_key': content address of the mip atlas, or None
+                - 'mipmaps': (x, y, width, height) of every level in the
+                  atlas (see services/mipmaps.py), or None
+        """
+        mipmaps = params['mipmaps']
+        return {
+            'key': self.texture_key(params),
+            'format': params['format'],
+            'tileable': params['tileable'],
+            'mip_key': self.texture_key(params, mipmaps=True) if mipmaps else None,
+            'mipmaps': mip_layout(params['size'], params['size']) if mipmaps else None,
+        }
+    
+    def is_cached(self, info: Dict[str, Any], record: bool = True) -> bool:
+        """
+        Check that every image of a describe() result is in the cache.
+        
+        Args:
+            info: Result of describe()
+            record: Count the lookup as one cache hit or miss; internal
+                    probes (estimates, single-flight rechecks) pass False so
+                    every request is counted once
+            
+        Returns:
+            bool: True if the base image and any mip atlas are cached
+        """
+        extension = IMAGE_FORMATS[info['format']]['extension']
+        found = (self.cache.contains(info['key'], extension, record=False)
+                 and (info['mip_key'] is None or self.cache.contains(info['mip_key'], extension, record=False)))
+        if record:
+            self.cache.record_lookup(found)
+        return found
+    
+    def extension(self, params: Dict[str, Any]) -> str:
+        """File extension of the image format a request asks for."""
+        return IMAGE_FORMATS[params['format']]['extension']
+    
+    def estimate_cost(self, params: Dict[str, Any], from_start: bool = False) -> Dict[str, Any]:
+        """
+        Predict what a request costs before running it (see services/cost_model.py).
+        
+        Cached images cost nothing, runs resume from their latest checkpoint,
+        and multigrid runs are costed as their coarse and fine phases.
+        Early convergence is not predicted, so the estimate is an upper bound.
+        
+        Args:
+            params: Normalized request parameters
+            from_start: Cost the whole run, as generate_texture(from_start=True)
+                        simulates it
+            
+        Returns:
+            dict: 'cpu_seconds', 'memory_mb' and 'steps' (still to simulate)
+        """
+        if from_start:
+            steps = int(params['t_max'] / params['delta_t'])
+        elif self.is_cached(self.describe(params), record=False):
+            return {'cpu_seconds': 0.0, 'memory_mb': 0.0, 'steps': 0}
+        else:
+            steps = self.steps_to_run(params)
+        size = params['size']
+        factor = self._pyramid_factor(params)
+        if factor > 1:
+            coarse_steps = int(steps * (1 - PYRAMID_SETTINGS['refine_fraction']))
+            phases = [((size // factor) ** 2, coarse_steps), (size * size, steps - coarse_steps)]
+        else:
+            phases = [(size * size, steps)]
+        kind = cost_kind(params['solver'], resolve_backend(params['backend']), params['precision'])
+        return self.cost_model.estimate(kind, phases, size * size, self._memory_layout(params),
+                                        params['mipmaps'], params['precision'])
+    
+    def calibrate_cost(self, sizes: Tuple[int, ...] = (128, 512), seconds: float = 0.5) -> Dict[str, Any]:
+        """
+        Measure this machine's rates for every solver kind and encoding.
+        
+        Each installed backend of the explicit solver, and the spectral
+        solver, is timed in every precision for about `seconds` per grid
+        size (after one untimed step that absorbs compilation and
+        first-touch costs); the per-size rates are averaged. The rates
+        replace the cost model's.
+        
+        Args:
+            sizes: Grid sizes to time
+            seconds: Minimum timed duration per kind and size
+            
+        Returns:
+            dict: The cost model's stats() after calibration
+        """
+        physics = {
+            name: np.array([SIMULATION_PARAMS[name]]).reshape(-1, 1, 1)
+            for name in ('D_a', 'D_b', 'feed_rate', 'kill_rate')
+        }
+        delta_t = np.ones((1, 1, 1))
+        kinds = [('explicit', backend) for backend in available_backends()] + [('spectral', 'numpy')]
+        rates = {}
+        for (solver, backend), precision in itertools.product(kinds, PRECISION_SETTINGS['available']):
+            kind = cost_kind(solver, backend, precision)
+            samples = []
+            for size in sizes:
+                A, B = self._stack_initial_fields([SIMULATION_PARAMS['random_seed']], size, precision)
+                if solver == 'explicit':
+                    stepper = create_stepper(backend, A, B, delta_t, physics)
+                else:
+                    stepper = STEPPERS[solver](A, B, delta_t, physics)
+                stepper.step(1)
+                steps, elapsed, batch = 0, 0.0, 1
+                while elapsed < seconds:
+                    started = time.perf_counter()
+                    stepper.step(batch)
+                    elapsed += time.perf_counter() - started
+                    steps += batch
+                    batch = min(batch * 2, PROGRESS_INTERVAL)
+                    # As _run_stepper does, so float32 rates exclude subnormal arithmetic
+                    flush_underflow(stepper.A)
+                    flush_underflow(stepper.B)
+                samples.append(elapsed / work_units(kind, A.size, steps))
+            rates[kind] = sum(samples) / len(samples)
+        
+        img_data = self.colorize(stepper.A[0], stepper.B[0], TEXTURE_DEFAULTS['color1'], TEXTURE_DEFAULTS['color2'])
+        started = time.perf_counter()
+        self._encode_image(img_data, ENCODING_SETTINGS['format'])
+        encode_rate = (time.perf_counter() - started) / img_data.shape[0] / img_data.shape[1]
+        self.cost_model.calibrate(rates, encode_rate)
+        return self.cost_model.stats()
+    
+    def steps_to_run(self, params: Dict[str, Any]) -> int:
+        """
+        Estimate the simulation steps a request still needs.
+        
+        Args:
+            params: Normalized request parameters
+            
+        Returns:
+            int: 0 if the image is cached, otherwise the steps left after
+                 resuming from the latest checkpoint
+        """
+        if self.is_cached(self.describe(params), record=False):
+            return 0
+        steps = int(params['t_max'] / params['delta_t'])
+        # Coarse-to-fine runs start from scratch; multigrid requests too small
+        # to coarsen run plain and resume like any other
+        if self._pyramid_factor(params) > 1:
+            return steps
+        key = state_key(params, self._simulation_params(params))
+        return steps - self.checkpoints.latest([key], steps, record=False)
+    
+    def _simulation_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge per-request simulation overrides over SIMULATION_PARAMS."""
+        return {name: params.get(name, default) for name, default in SIMULATION_PARAMS.items()}
+    
+    def _memory_layout(self, params: Dict[str, Any]) -> str:
+        """
+        Memory layout a request runs in (key of COST_SETTINGS['bytes_per_cell']).
+        
+        This is the solver, except for explicit runs on the numpy backend
+        whose working set would exceed COST_SETTINGS['max_memory_mb']:
+        those update the grid COST_SETTINGS['block_rows'] rows at a time
+        ('blocked'), without full-size scratch grids. Requests still over
+        the limit then are refused by admission control.
+        """
+        solver = params['solver']
+        if solver != 'explicit' or resolve_backend(params['backend']) != 'numpy':
+            return solver
+        memory_mb = self.cost_model.memory_mb(solver, params['size'] ** 2, params['precision'])
+        return solver if memory_mb <= COST_SETTINGS['max_memory_mb'] else 'blocked'
+    
+    def _stack_signature(self, params: Dict[str, Any]) -> Tuple:
+        """Settings that members of one simulation stack must share."""
+        steps = int(params['t_max'] / params['delta_t'])
+        return (steps, params['solver'], params['backend'], params['precision'], params['size'],
+                self._pyramid_factor(params))
+    
+    def _simulate(self, variants: List[Dict[str, Any]],
+                  progress: Optional[ProgressCallback] = None,
+                  on_frame: Optional[FrameCallback] = None,
+                  frame_interval: int = PROGRESS_INTERVAL,
+                  resume: bool = True) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Run the reaction-diffusion simulation for a stack of parameter sets.
+        
+        All variants must share _stack_signature. With multigrid enabled,
+        most of the run happens on a grid PYRAMID_SETTINGS['factor'] times
+        coarser (diffusion rates scaled by 1/factor^2 to keep the physical
+        pattern scale), and only the last refine_fraction of the steps runs
+        at full resolution after a periodic bilinear upsampling. Otherwise
+        the run resumes from the latest checkpoint shared by all members,
+        and the final states are checkpointed for longer runs to build on.
+        
+        The full-resolution phase stops early once every member has settled
+        into a stationary pattern (see CONVERGENCE_SETTINGS); a tolerance
+        of 0 disables the check.
+        
+        Args:
+            variants: Normalized request parameters, one per stack member
+            progress: Optional callback receiving (steps_done, steps_total)
+                      every PROGRESS_INTERVAL steps
+            on_frame: Optional callback receiving (step, A, B) at the start
+                      of each phase and every frame_interval steps
+            frame_interval: Steps between on_frame calls
+            resume: Start from the latest shared checkpoint, if any
+            
+        Returns:
+            tuple: Final activator and inhibitor stacks, shaped (N, size, size),
+                   and a dict with 'steps' (steps executed) and 'stop_reason'
+                   ('t_max' or 'converged')
+        """
+        first = variants[0]
+        steps = int(first['t_max'] / first['delta_t'])
+        size = first['size']
+        dtype = np.dtype(first['precision'])
+        block_rows = COST_SETTINGS['block_rows'] if self._memory_layout(first) == 'blocked' else None
+        simulation = [self._simulation_params(v) for v in variants]
+        seeds = [sim['random_seed'] for sim in simulation]
+        
+        # Per-member parameters shaped (N, 1, 1) to broadcast over the grids
+        physics = {
+            name: np.array([sim[name] for sim in simulation]).reshape(-1, 1, 1)
+            for name in ('D_a', 'D_b', 'feed_rate', 'kill_rate')
+        }
+        delta_t = np.array([v['delta_t'] for v in variants]).reshape(-1, 1, 1)
+        
+        # Calibrate the cost model with runs whose timing is pure stepping
+        # (frame callbacks encode images, tiled runs spread over processes)
+        kind = None
+        if on_frame is None:
+            kind = cost_kind(first['solver'], resolve_backend(first['backend']), first['precision'])
+        
+        factor = self._pyramid_factor(first)
+        if factor > 1:
+            # Coarse phase: h = factor, so D / h^2 keeps the pattern wavelength
+            start_step = int(steps * (1 - PYRAMID_SETTINGS['refine_fraction']))
+            coarse_physics = dict(physics, D_a=physics['D_a'] / factor**2, D_b=physics['D_b'] / factor**2)
+            with timed('init'):
+                A, B = self._stack_initial_fields(seeds, size // factor, dtype)
+                stepper = self._create_stepper(first['solver'], first['backend'], A, B, delta_t, coarse_physics)
+            try:
+                self._run_stepper(stepper, 0, start_step, steps, progress, on_frame, frame_interval,
+                                  kind=self._observed_kind(stepper, kind))
+            finally:
+                self._close_stepper(stepper)
+            with timed('init'):
+                A = upsample_periodic(stepper.A, factor).astype(dtype, copy=False)
+                B = upsample_periodic(stepper.B, factor).astype(dtype, copy=False)
+            del stepper
+        else:
+            # Resume from the latest checkpoint all members share, if any
+            state_keys = [state_key(v, sim) for v, sim in zip(variants, simulation)]
+            with timed('init'):
+                if resume:
+                    start_step, A, B = self._resume(state_keys, steps, seeds, size, dtype)
+                else:
+                    start_step, (A, B) = 0, self._stack_initial_fields(seeds, size, dtype)
+        executed = start_step if factor > 1 else 0
+        
+        # Stop early once the pattern is stationary (tolerance 0 disables)
+        tolerance = np.array([v['tolerance'] for v in variants])
+        monitor = None
+        if np.all(tolerance > 0):
+            monitor = ConvergenceMonitor(tolerance, delta_t, CONVERGENCE_SETTINGS['norm'])
+        
+        # Run numerical simulation with the selected solver
+        with timed('init'):
+            stepper = self._create_stepper(first['solver'], first['backend'], A, B, delta_t, physics, block_rows)
+        del A, B
+        try:
+            end_step = self._run_stepper(stepper, start_step, steps, steps, progress, on_frame,
+                                         frame_interval, monitor, self._observed_kind(stepper, kind))
+        finally:
+            self._close_stepper(stepper)
+        executed += end_step - start_step
+        
+        # Multigrid trajectories depend on the run length, so only plain runs are resumable
+        if factor == 1 and end_step > start_step:
+            with timed('checkpoint'):
+                for index, key in enumerate(state_keys):
+                    self.checkpoints.save(key, end_step, stepper.A[index], stepper.B[index], {
+                        'delta_t': variants[index]['delta_t'], 'solver': first['solver'],
+                        'precision': first['precision'], 'size': size, 'simulation': simulation[index]
+                    })
+        
+        stop_reason = 't_max' if end_step == steps else 'converged'
+        return stepper.A, stepper.B, {'steps': executed, 'stop_reason': stop_reason}
+    
+    def _resume(self, keys: List[str], steps: int, seeds: List[int], size: int,
+                dtype: np.dtype = np.float64) -> Tuple[int, np.ndarray, np.ndarray]:
+        """
+        Initial stack for a full-resolution run.
+        
+        Args:
+            keys: State keys of the stack members
+            steps: Step count of the requested run
+            seeds: Random seeds for members that start from scratch
+            size: Grid dimensions in cells
+            dtype: Floating point type of the simulation
+            
+        Returns:
+            tuple: (step the fields correspond to, A stack, B stack)
+        """
+        start = self.checkpoints.latest(keys, steps)
+        if start:
+            A = np.empty((len(keys), size, size), dtype=dtype)
+            B = np.empty((len(keys), size, size), dtype=dtype)
+            for index, key in enumerate(keys):
+                state = self.checkpoints.load(key, start)
+                if state is None:
+                    break  # Evicted since the lookup
+                A[index], B[index] = state
+            else:
+                return start, A, B
+        A, B = self._stack_initial_fields(seeds, size, dtype)
+        return 0, A, B
+    
+    def _create_stepper(self, solver: str, backend: str, A: np.ndarray, B: np.ndarray,
+                        delta_t: np.ndarray, physics: Dict[str, np.ndarray],
+                        block_rows: Optional[int] = None) -> Any:
+        """
+        Build the stepper for one simulation phase.
+        
+        The explicit solver runs on the requested compute backend (see
+        services/backends.py), in the precision of A. Runs given block_rows
+        (see _memory_layout) update the grid that many rows at a time in
+        one process. Other large explicit runs on the numpy backend are
+        spread over TILING_SETTINGS['workers'] processes; release them
+        with _close_stepper.
+        """
+        if solver != 'explicit':
+            return STEPPERS[solver](A, B, delta_t, physics)
+        backend = resolve_backend(backend)
+        if block_rows is not None and backend == 'numpy':
+            return GrayScottStepper(A, B, delta_t, physics, block_rows=block_rows)
+        workers = TILING_SETTINGS['workers']
+        if backend == 'numpy' and workers > 1 and A.size >= TILING_SETTINGS['min_cells']:
+            return TiledGrayScottStepper(A, B, delta_t, physics, workers=workers,
+                                         halo=TILING_SETTINGS['halo'])
+        return create_stepper(backend, A, B, delta_t, physics)
+    
+    def _observed_kind(self, stepper: Any, kind: Optional[str]) -> Optional[str]:
+        """Cost model rate key to record a stepper's timing under (tiled runs: none)."""
+        return None if isinstance(stepper, TiledGrayScottStepper) else kind
+    
+    def _close_stepper(self, stepper: Any) -> None:
+        """Release worker processes and shared memory held by a stepper."""
+        if isinstance(stepper, TiledGrayScottStepper):
+            stepper.close()
+    
+    def _pyramid_factor(self, params: Dict[str, Any]) -> int:
+        """
+        Coarsening factor of a request's run.
+        
+        The largest configured factor that divides the size evenly for
+        multigrid requests; 1 (a plain, resumable run) otherwise, and for
+        multigrid requests too small to coarsen.
+        """
+        if not params['multigrid']:
+            return 1
+        size = params['size']
+        factor = PYRAMID_SETTINGS['factor']
+        while factor > 1 and (size % factor or size // factor < PYRAMID_SETTINGS['min_coarse_size']):
+            factor //= 2
+        return factor
+    
+    def _run_stepper(self, stepper: Any, start: int, stop: int, total: int,
+                     progress: Optional[ProgressCallback] = None,
+                     on_frame: Optional[FrameCallback] = None,
+                     frame_interval: int = PROGRESS_INTERVAL,
+                     monitor: Optional[ConvergenceMonitor] = None,
+                     kind: Optional[str] = None) -> int:
+        """
+        Advance a stepper, pausing only where a callback or check is due.
+        
+        Callbacks may raise to abort the run (e.g. job cancellation or a
+        disconnected streaming client).
+        
+        Args:
+            stepper: Initialized simulation stepper (any STEPPERS entry)
+            start: Global step number the stepper is at
+            stop: Global step number to advance to
+            total: Total steps of the whole run, for progress reports
+            progress: Optional callback receiving (steps_done, steps_total)
+            on_frame: Optional callback receiving (step, A, B)
+            frame_interval: Steps between on_frame calls
+            monitor: Optional convergence monitor, sampled every
+                     CONVERGENCE_SETTINGS['interval'] steps
+            kind: Cost model rate key to calibrate with this run's timing
+                  (see services/cost_model.py), or None
+            
+        Returns:
+            int: Step the run ended at (stop, or earlier once converged)
+        """
+        if on_frame is None:
+            frame_interval = PROGRESS_INTERVAL
+        else:
+            on_frame(start, stepper.A, stepper.B)
+        check_interval = PROGRESS_INTERVAL
+        if monitor is not None:
+            check_interval = CONVERGENCE_SETTINGS['interval']
+            monitor.update(start, stepper.A, stepper.B)
+        
+        step = start
+        started = time.perf_counter()
+        with timed('simulate'):
+            while step < stop:
+                next_progress = (step // PROGRESS_INTERVAL + 1) * PROGRESS_INTERVAL
+                next_frame = (step // frame_interval + 1) * frame_interval
+                next_check = (step // check_interval + 1) * check_interval
+                target = min(next_progress, next_frame, next_check, stop)
+                stepper.step(target - step)
+                step = target
+                
+                # At fixed global steps, so resumed runs stay bitwise identical
+                if step % PROGRESS_INTERVAL == 0:
+                    flush_underflow(stepper.A)
+                    flush_underflow(stepper.B)
+                
+                # A stationary pattern ends the run; the last state still gets reported
+                converged = (monitor is not None and step < stop and step % check_interval == 0
+                             and monitor.update(step, stepper.A, stepper.B))
+                
+                # Report simulation progress for monitoring
+                if progress is not None and (step % PROGRESS_INTERVAL == 0 or step == stop or converged):
+                    progress(total if converged else step, total)
+                if on_frame is not None and (step % frame_interval == 0 or step == stop or converged):
+                    on_frame(step, stepper.A, stepper.B)
+                if converged:
+                    break
+        elapsed = time.perf_counter() - started
+        record_simulation(step - start, stepper.A.size, elapsed)
+        if kind is not None:
+            self.cost_model.observe(kind, stepper.A.size, step - start, elapsed)
+        return step
+    
+    def _stack_initial_fields(self, seeds: List[int], size: int,
+                              dtype: np.dtype = np.float64) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack seeded initial conditions, one (size, size) pair per seed, in a floating point type."""
+        A = np.empty((len(seeds), size, size), dtype=dtype)
+        B = np.empty((len(seeds), size, size), dtype=dtype)
+        for index, seed in enumerate(seeds):
+            self._initial_fields(seed, size, out=(A[index], B[index]))
+        return A, B
+    
+    def _initial_fields(self, seed: int, size: int,
+                        out: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Create seeded starting concentration grids.
+        
+        Args:
+            seed: Random seed for the initial perturbation
+            size: Grid dimensions in cells
+            out: Optional (A, B) grids to fill, of any floating point type
+                 (the values are computed in float64 and rounded once)
+            
+        Returns:
+            tuple: Activator and inhibitor grids
+        """
+        if out is None:
+            out = (np.empty((size, size)), np.empty((size, size)))
+        A, B = out
         
         # Add random noise as initial perturbation for pattern formation
-        np.random.seed(SIMULATION_PARAMS['random_seed'])
-        noise = (np.random.rand(size, size) - 0.5) * 0.1
-        A += noise
-        B += noise
-        
-        # Get physical parameters from configuration
-        D_a = SIMULATION_PARAMS['D_a']  # Activator diffusion rate
-        D_b = SIMULATION_PARAMS['D_b']  # Inhibitor diffusion rate
-        feed_rate = SIMULATION_PARAMS['feed_rate']  # Feed rate parameter
-        kill_rate = SIMULATION_PARAMS['kill_rate']  # Kill rate parameter
-        
-        # Run numerical simulation
-        steps = int(t_max / delta_t)
-        for step in range(steps):
-            # Calculate spatial derivatives using discrete Laplacian operator
-            A_laplace = self._calculate_laplacian(A)
-            B_laplace = self._calculate_laplacian(B)
-            
-            # Apply Gray-Scott reaction-diffusion equations
-            reaction = A * B**2  # Autocatalytic reaction term
-            A += delta_t * (D_a * A_laplace - reaction + feed_rate * (1 - A))
-            B += delta_t * (D_b * B_laplace + reaction - (kill_rate + feed_rate) * B)
-            
-            # Log simulation progress for monitoring
-            if step % 100 == 0:
-                pass  # Skip logging to avoid Windows console issues
-        
-        # Generate final texture image from simulation results
-        image_path = self._create_texture_image(A, B, color1, color2, size)
-        return image_path
+        # (RandomState yields the same stream as np.random.seed without
+        # touching global state shared with other requests)
+        rng = np.random.RandomState(seed)
+        noise = rng.rand(size, size)
+        noise -= 0.5
+        noise *= 0.1
+        
+        # Equilibrium values plus the perturbation, written in place
+        np.add(noise, 0.5, out=A)  # Activator concentration
+        np.add(noise, 0.25, out=B)  # Inhibitor concentration
+        return A, B
     
     def _calculate_laplacian(self, grid: np.ndarray) -> np.ndarray:
         """
@@ -93,10 +788,91 @@ class TextureGeneratorService:
             np.roll(grid, 1, axis=1) + np.roll(grid, -1, axis=1) - 4 * grid
         )
     
+    def colorize(self, A: np.ndarray, B: np.ndarray, color1: str, color2: str) -> np.ndarray:
+        """
+        Map concentration fields to an RGB image.
+        
+        Both fields are normalized to [0, 1] in float32 and blended with the
+        two colors by broadcasting over the channel axis, into one float32
+        image and one float32 scratch image (no float64 image is built).
+        
+        Args:
+            A: Activator concentration grid
+            B: Inhibitor concentration grid
+            color1: Base color in HEX format
+            color2: Contrast color in HEX format
+            
+        Returns:
+            np.ndarray: uint8 array of shape (height, width, 3)
+        """
+        # Colors pre-scaled to 0 - 255, so the blend lands directly in pixel units
+        color1_rgb = np.array(hex_to_rgb(color1), dtype=np.float32) * 255
+        color2_rgb = np.array(hex_to_rgb(color2), dtype=np.float32) * 255
+        
+        # Create RGB image by blending colors based on concentrations
+        img_data = self._normalize(A)[..., np.newaxis] * color1_rgb
+        contrast = np.multiply(self._normalize(B)[..., np.newaxis], color2_rgb)
+        img_data += contrast
+        del contrast
+        np.clip(img_data, 0, 255, out=img_data)
+        return img_data.astype(np.uint8)
+    
+    def _normalize(self, field: np.ndarray) -> np.ndarray:
+        """Scale a field to [0, 1] as float32; a uniform field maps to 0."""
+        low, high = field.min(), field.max()
+        # The difference is taken at the field's precision, then stored as float32
+        normalized = np.empty(field.shape, dtype=np.float32)
+        np.subtract(field, low, out=normalized)
+        span = np.float32(high - low)
+        if span > 0:
+            normalized /= span
+        else:
+            normalized.fill(0.0)
+        return normalized
+    
+    def _store_texture(self, A: np.ndarray, B: np.ndarray, params: Dict[str, Any],
+                       info: Dict[str, Any]) -> None:
+        """
+        Encode a finished simulation and put its images into the cache.
+        
+        The fields are colorized once; the base image and, if requested,
+        the mip atlas are both encoded from that RGB image.
+        
+        Args:
+            A: Activator concentration grid
+            B: Inhibitor concentration grid
+            params: Normalized request parameters
+            info: describe() result of the request
+        """
+        started = time.perf_counter()
+        with timed('colorize'):
+            img_data = self.colorize(A, B, params['color1'], params['color2'])
+        encoding = (params['format'], params['quality'], params['compress_level'], params['tileable'])
+        extension = self.extension(params)
+        
+        image_data = self._encode_image(img_data, *encoding)
+        with timed('store'):
+            self.cache.put(info['key'], image_data, extension)
+        
+        if info['mip_key'] is not None:
+            with timed('mipmaps'):
+                levels = build_pyramid(img_data, params['mip_filter'], MIPMAP_SETTINGS['linear_light'])
+                atlas = pack_atlas(img_data, levels)
+            atlas_data = self._encode_image(atlas, *encoding)
+            with timed('store'):
+                self.cache.put(info['mip_key'], atlas_data, extension)
+        
+        pixels = encoded_pixels(A.size, info['mip_key'] is not None)
+        self.cost_model.observe_encoding(pixels, time.perf_counter() - started)
+    
     def _create_texture_image(self, A: np.ndarray, B: np.ndarray, 
-                            color1: str, color2: str, size: int) -> str:
+                            color1: str, color2: str, size: int,
+                            image_format: str = ENCODING_SETTINGS['format'],
+                            quality: Optional[int] = None,
+                            compress_level: Optional[int] = None,
+                            lossless: bool = False) -> bytes:
         """
-        Create and save texture image from simulation concentration fields.
+        Create an encoded texture image from simulation concentration fields.
         
         Converts numerical simulation results into a visually appealing texture
         by mapping concentration values to color gradients.
@@ -107,34 +883,32 @@ class TextureGeneratorService:
             color1: Base color in HEX format
             color2: Contrast color in HEX format
             size: Image dimensions in pixels
+            image_format: Key of IMAGE_FORMATS
+            quality: Lossy quality for webp/jpeg (default from ENCODING_SETTINGS)
+            compress_level: zlib level for png (default from ENCODING_SETTINGS)
+            lossless: Encode webp losslessly (tileable textures)
             
         Returns:
-            str: Path to saved image file
+            bytes: Encoded image data
         """
-        # Normalize concentration values to [0, 1] range for color mapping
-        A_norm = np.clip((A - np.min(A)) / (np.max(A) - np.min(A)), 0, 1)
-        B_norm = np.clip((B - np.min(B)) / (np.max(B) - np.min(B)), 0, 1)
-        
-        # Convert HEX colors to RGB values for image creation
-        color1_rgb = np.array(hex_to_rgb(color1))
-        color2_rgb = np.array(hex_to_rgb(color2))
-        
-        # Create RGB image by blending colors based on concentrations
-        img_data = np.zeros((size, size, 3))
-        for i in range(3):
-            img_data[:, :, i] = np.clip(color1_rgb[i] * A_norm + color2_rgb[i] * B_norm, 0, 1)
-        
-        # Save image to static directory for web serving
-        output_path = os.path.join(IMAGES_DIR, "activator_inhibitor_texture.png")
+        with timed('colorize'):
+            img_data = self.colorize(A, B, color1, color2)
+        return self._encode_image(img_data, image_format, quality, compress_level, lossless)
+    
+    def _encode_image(self, img_data: np.ndarray, image_format: str,
+                      quality: Optional[int] = None, compress_level: Optional[int] = None,
+                      lossless: bool = False) -> bytes:
+        """Encode an RGB image with the settings of _create_texture_image."""
+        if image_format == 'png':
+            options = {'compress_level': ENCODING_SETTINGS['compress_level'] if compress_level is None else compress_level}
+        else:
+            options = {'quality': ENCODING_SETTINGS['quality'] if quality is None else quality}
+            if image_format == 'webp' and lossless:
+                options['lossless'] = True
         
-        try:
-            # Use PIL for better Windows compatibility
-            from PIL import Image
-            img_pil = Image.fromarray((img_data * 255).astype('uint8'))
-            img_pil.save(output_path)
-            # Skip logging to avoid Windows console issues
-        except Exception as e:
-            # Skip detailed logging to avoid Windows console issues
-            raise
-        
-        return output_path
\ No newline at end of file
+        # Encode in memory; the texture cache decides where the bytes live
+        from PIL import Image
+        with timed('encode'):
+            buffer = io.BytesIO()
+            Image.fromarray(img_data).save(buffer, format=IMAGE_FORMATS[image_format]['pil_format'], **options)
+        return buffer.getvalue()
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+Tiled Simulation - Multi-core Gray-Scott stepping by domain decomposition
+
+A single NumPy process keeps about one core busy with the stencil. For
+large grids this engine splits the field into horizontal strips and
+advances each strip in its own worker process:
+
+- the A and B fields live in multiprocessing.shared_memory, so workers and
+  the parent see the same grids without copying them through pipes
+- every worker keeps a private GrayScottStepper over its strip plus
+  ``halo`` rows borrowed from its neighbours (wrapping around the top and
+  bottom edge, which keeps the boundaries periodic)
+- a round loads the strip and halo from shared memory, runs up to ``halo``
+  steps locally, and writes the owned rows back; two barriers per round
+  keep a worker from overwriting rows a neighbour has not read yet
+
+Each local step invalidates one more halo row from the outside in, so a
+halo of k rows allows k steps between exchanges. Strips span the full
+width, so the left/right wrap is handled by the local stepper itself.
+
+Workers are started with the 'spawn' method: the parent may already run
+threads (numba's pool, request threads of the web server), and a forked
+child could inherit one of their locks held and never exit. Every
+stepper that is not closed explicitly is closed at interpreter exit, so
+no worker or shared memory block outlives the parent.
+
+Accuracy: the owned rows go through exactly the same floating point
+operations as in the single-process GrayScottStepper, so results are
+bitwise identical for any number of workers and any halo width. Shared
+fields keep the type of the initial A (float32 or float64), as the local
+steppers do.
+"""
+import atexit
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from services.simulation import GrayScottStepper, precision_of
+
+
+def strip_bounds(rows: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Split a number of rows into contiguous, nearly equal strips.
+
+    Args:
+        rows: Grid rows to distribute
+        workers: Number of strips (at most one per row)
+
+    Returns:
+        list: (first_row, end_row) per strip
+    """
+    workers = max(1, min(workers, rows))
+    edges = [rows * index // workers for index in range(workers + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _tile_worker(conn, barrier, names: Tuple[str, str], shape: Tuple[int, ...],
+                 dtype: np.dtype, bounds: Tuple[int, int], halo: int,
+                 delta_t: Union[float, np.ndarray],
+                 params: Dict[str, Union[float, np.ndarray]]) -> None:
+    """Worker process entry point: attach the shared fields and serve one strip."""
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        fields = [np.ndarray(shape, dtype=dtype, buffer=block.buf) for block in blocks]
+        _serve_strip(conn, barrier, *fields, bounds, halo, delta_t, params)
+        del fields
+    finally:
+        conn.close()
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # A traceback still references the views; process exit frees them
+                pass
+
+
+def _serve_strip(conn, barrier, A: np.ndarray, B: np.ndarray,
+                 bounds: Tuple[int, int], halo: int,
+                 delta_t: Union[float, np.ndarray],
+                 params: Dict[str, Union[float, np.ndarray]]) -> None:
+    """
+    Advance one strip of the shared fields on request.
+
+    Receives ('step', count) commands over conn and answers with None on
+    success or an error message. Returns on ('stop',) or after an error.
+    """
+    first, end = bounds
+    rows = range(first - halo, end + halo)
+    owned = slice(halo, halo + end - first)
+    stepper = GrayScottStepper(
+        np.take(A, rows, axis=-2, mode='wrap'),
+        np.take(B, rows, axis=-2, mode='wrap'),
+        delta_t, params
+    )
+
+    while True:
+        command = conn.recv()
+        if command[0] == 'stop':
+            return
+        try:
+            remaining = command[1]
+            while remaining > 0:
+                count = min(halo, remaining)
+                np.take(A, rows, axis=-2, mode='wrap', out=stepper.A)
+                np.take(B, rows, axis=-2, mode='wrap', out=stepper.B)
+                stepper.step(count)
+                # Every strip has read its halo before anyone writes
+                barrier.wait()
+                A[..., first:end, :] = stepper.A[..., owned, :]
+                B[..., first:end, :] = stepper.B[..., owned, :]
+                barrier.wait()
+                remaining -= count
+            conn.send(None)
+        except Exception as e:
+            # Release the other workers instead of leaving them blocked
+            barrier.abort()
+            conn.send(f"{type(e).__name__}: {e}")
+            return
+
+
+class TiledGrayScottStepper:
+    """
+    GrayScottStepper split across worker processes by horizontal strips.
+
+    Exposes the same interface as GrayScottStepper (A, B, step) plus
+    close(). The A and B properties are views of the shared fields, valid
+    until the next step(); after close() they become private copies.
+    Fields may be batched (N, size, size) with per-member parameters.
+    """
+
+    def __init__(self, A: np.ndarray, B: np.ndarray, delta_t: Union[float, np.ndarray],
+                 params: Dict[str, Union[float, np.ndarray]],
+                 workers: int, halo: int = 1):
+        """
+        Copy the fields into shared memory and start the workers.
+
+        Args:
+            A: Initial activator concentration grid (or stack of grids);
+               float32 fields are simulated in float32, others in float64
+            B: Initial inhibitor concentration grid (or stack of grids)
+            delta_t: Time step for numerical integration (scalar or per member)
+            params: Physical parameters (D_a, D_b, feed_rate, kill_rate),
+                    scalars or per-member arrays
+            workers: Number of worker processes (capped at one per row)
+            halo: Rows exchanged per strip edge, i.e. steps between exchanges
+        """
+        if halo < 1:
+            raise ValueError('halo must be at least 1')
+        shape = A.shape
+        self.delta_t = delta_t
+        self.dtype = precision_of(A)
+        self._A = self._B = None
+        self._blocks = []
+        self._workers = []
+        self._connections = []
+        atexit.register(self.close)
+
+        try:
+            self._A = self._share(A)
+            self._B = self._share(B)
+
+            context = multiprocessing.get_context('spawn')
+            bounds = strip_bounds(shape[-2], workers)
+            # Kept alive with the stepper: spawned workers attach to it by name
+            self._barrier = barrier = context.Barrier(len(bounds))
+            names = tuple(block.name for block in self._blocks)
+            for strip in bounds:
+                parent_end, child_end = context.Pipe()
+                worker = context.Process(
+                    target=_tile_worker,
+                    args=(child_end, barrier, names, shape, self.dtype, strip, halo, delta_t, params),
+                    daemon=True
+                )
+                worker.start()
+                child_end.close()
+                self._workers.append(worker)
+                self._connections.append(parent_end)
+        except BaseException:
+            self.close()
+            raise
+
+    def _share(self, field: np.ndarray) -> np.ndarray:
+        """Copy a field into a new shared memory block and return its view."""
+        shared_bytes = field.size * self.dtype.itemsize
+        block = shared_memory.SharedMemory(create=True, size=max(1, shared_bytes))
+        self._blocks.append(block)
+        shared = np.ndarray(field.shape, dtype=self.dtype, buffer=block.buf)
+        shared[...] = field
+        return shared
+
+    @property
+    def A(self) -> np.ndarray:
+        """Current activator field (view into shared memory)."""
+        return self._A
+
+    @property
+    def B(self) -> np.ndarray:
+        """Current inhibitor field (view into shared memory)."""
+        return self._B
+
+    @property
+    def workers(self) -> int:
+        """Number of worker processes."""
+        return len(self._workers)
+
+    def step(self, count: int = 1) -> None:
+        """
+        Advance the simulation by a number of time steps.
+
+        Args:
+            count: Number of explicit Euler steps to perform
+
+        Raises:
+            RuntimeError: If a worker failed or exited
+        """
+        if count <= 0:
+            return
+        for conn in self._connections:
+            conn.send(('step', count))
+        errors = []
+        for conn in self._connections:
+            try:
+                reply = conn.recv()
+            except EOFError:
+                reply = 'worker exited unexpectedly'
+            if reply is not None:
+                errors.append(reply)
+        if errors:
+            self.close()
+            raise RuntimeError(f"Tiled simulation failed: {errors[0]}")
+
+    def close(self) -> None:
+        """Stop the workers and release shared memory; fields stay readable."""
+        atexit.unregister(self.close)
+        for conn in self._connections:
+            try:
+                conn.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._connections = []
+        self._workers = []
+
+        if self._blocks:
+            # Detach the fields before the shared buffers go away
+            if self._A is not None:
+                self._A = np.array(self._A)
+            if self._B is not None:
+                self._B = np.array(self._B)
+            for block in self._blocks:
+                block.close()
+                block.unlink()
+            self._blocks = []
+
+    def __enter__(self) -> 'TiledGrayScottStepper':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
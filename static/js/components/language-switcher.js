@@ -76,6 +76,11 @@ class LanguageSwitcher {
                 'enter-valid-values': 'Zadejte platné hodnoty pro všechny parametry',
                 'fallback-model': 'Použit náhradní model',
                 
+                // Cost estimate
+                'estimate-slow': 'Odhadovaná doba výpočtu (s):',
+                'estimate-preview': 'Server je vytížen, vygeneruje se náhled v nižším rozlišení',
+                'estimate-rejected': 'Požadavek je příliš náročný, zkraťte čas nebo zvětšete krok',
+                
                 // Language switcher
                 'language': 'Jazyk',
                 'czech': 'Čeština',
@@ -164,6 +169,11 @@ class LanguageSwitcher {
                 'enter-valid-values': 'Enter valid values for all parameters',
                 'fallback-model': 'Using fallback model',
                 
+                // Cost estimate
+                'estimate-slow': 'Estimated computation time (s):',
+                'estimate-preview': 'Server is busy, a lower resolution preview will be generated',
+                'estimate-rejected': 'Request is too expensive, shorten the time or enlarge the step',
+                
                 // Language switcher
                 'language': 'Language',
                 'czech': 'Czech',
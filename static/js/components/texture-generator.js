@@ -7,6 +7,10 @@
 class TextureGenerator {
     constructor() {
         this.isGenerating = false;
+        this.estimateTimer = null;
+        this.previewUrl = null;
+        this.previewObjectUrl = null;
+        this.atlasAvailable = true;
         this.init();
     }
 
@@ -32,10 +36,86 @@ class TextureGenerator {
             if (input) {
                 input.addEventListener('input', () => this.validateInput(input));
                 input.addEventListener('change', () => this.validateInput(input));
+                input.addEventListener('input', () => this.scheduleEstimate());
+                input.addEventListener('input', () => this.showAtlasPreview());
             }
         });
     }
 
+    async showAtlasPreview() {
+        // Show the nearest precomputed preview at once; only submitting renders in full
+        if (this.isGenerating || !this.atlasAvailable) return;
+        const params = this.getFormParams();
+        if (!params) return;
+
+        const url = '/preview?' + new URLSearchParams({
+            K: params.K,
+            t_max: params.t_max,
+            delta_t: params.delta_t,
+            color1: params.color1,
+            color2: params.color2
+        });
+        this.previewUrl = url;
+
+        try {
+            const response = await fetch(url);
+            if (response.status === 404) {
+                // No atlas built on this server; stop asking
+                this.atlasAvailable = false;
+                return;
+            }
+            // Drop answers overtaken by a newer slider position or a real render
+            if (!response.ok || url !== this.previewUrl || this.isGenerating) return;
+
+            const blob = await response.blob();
+            if (url !== this.previewUrl || this.isGenerating) return;
+            if (this.previewObjectUrl) URL.revokeObjectURL(this.previewObjectUrl);
+            this.previewObjectUrl = URL.createObjectURL(blob);
+            this.showPreviewFrame(this.previewObjectUrl);
+        } catch (error) {
+            // Previews are best effort; generation reports real errors
+        }
+    }
+
+    scheduleEstimate() {
+        // Ask for a cost estimate once typing pauses, not on every keystroke
+        clearTimeout(this.estimateTimer);
+        this.estimateTimer = setTimeout(() => this.updateEstimate(), 400);
+    }
+
+    async updateEstimate() {
+        // Warn before submitting a request that is slow or over the server's budget
+        const hint = document.getElementById('costEstimate');
+        const params = this.getFormParams();
+        if (!hint || !params) return;
+
+        try {
+            const response = await fetch('/estimate', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify(params)
+            });
+            if (!response.ok) return;
+            const estimate = await response.json();
+
+            const t = window.t || ((key) => key);
+            let message = '';
+            if (estimate.admission === 'reject') {
+                message = t('estimate-rejected');
+            } else if (estimate.admission === 'preview') {
+                message = t('estimate-preview');
+            } else if (estimate.cpu_seconds >= 5) {
+                message = `${t('estimate-slow')} ${Math.round(estimate.cpu_seconds)}`;
+            }
+            hint.textContent = message;
+            hint.style.display = message ? 'block' : 'none';
+        } catch (error) {
+            // The estimate is advisory; generation reports real errors
+        }
+    }
+
     setupFormValidation() {
         // Initialize form with default values
         this.setDefaultValues();
@@ -121,21 +201,17 @@ class TextureGenerator {
         this.setGeneratingState(true);
 
         try {
-            // Send POST request to texture generation API
-            const response = await fetch('/calculate', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(params)
-            });
-
-            const data = await response.json();
+            // Prefer streaming previews; fall back to the job queue if the
+            // stream cannot be opened (no EventSource, proxy, old server)
+            let result = window.EventSource ? await this.streamTexture(params) : null;
+            if (!result) {
+                result = await this.generateViaJob(params);
+            }
 
-            if (response.ok) {
-                this.handleGenerationSuccess(data.image_url);
+            if (result.status === 'finished') {
+                this.handleGenerationSuccess(result.image_url, result);
             } else {
-                this.handleGenerationError(data.error || 'Unknown error occurred');
+                this.handleGenerationError(result.error || 'Generation ' + result.status);
             }
         } catch (error) {
             this.handleGenerationError('Network error: ' + error.message);
@@ -144,6 +220,92 @@ class TextureGenerator {
         }
     }
 
+    streamTexture(params) {
+        // Show server-sent preview frames while the simulation runs.
+        // Resolves with the final result, or null if the stream never opened.
+        return new Promise((resolve) => {
+            const source = new EventSource('/calculate/stream?' + new URLSearchParams(params));
+            let received = false;
+
+            source.addEventListener('frame', (event) => {
+                received = true;
+                const frame = JSON.parse(event.data);
+                this.showPreviewFrame(frame.image);
+                this.updateProgress(frame.total ? frame.step / frame.total : 1);
+            });
+
+            source.addEventListener('result', (event) => {
+                source.close();
+                resolve({ status: 'finished', ...JSON.parse(event.data) });
+            });
+
+            source.addEventListener('failed', (event) => {
+                source.close();
+                resolve({ status: 'failed', ...JSON.parse(event.data) });
+            });
+
+            source.onerror = () => {
+                // EventSource would reconnect and restart the simulation; stop instead
+                source.close();
+                resolve(received ? { status: 'failed', error: 'Preview stream interrupted' } : null);
+            };
+        });
+    }
+
+    showPreviewFrame(imageData) {
+        const img = document.getElementById('generatedImage');
+        const placeholder = document.querySelector('.image-placeholder');
+
+        if (img) {
+            img.src = imageData;
+            img.style.display = 'block';
+            if (placeholder) placeholder.style.display = 'none';
+        }
+    }
+
+    async generateViaJob(params) {
+        // Queue the simulation; long runs would time out as a single request
+        const response = await fetch('/jobs', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(params)
+        });
+
+        const data = await response.json();
+        if (!response.ok) {
+            return { status: 'failed', error: data.error || 'Unknown error occurred' };
+        }
+        return this.waitForJob(data.status_url);
+    }
+
+    async waitForJob(statusUrl) {
+        // Poll the job until it completes, showing progress on the button
+        while (true) {
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+
+            if (!response.ok) {
+                return { status: 'failed', error: job.error };
+            }
+            if (job.status !== 'queued' && job.status !== 'running') {
+                return job;
+            }
+
+            this.updateProgress(job.progress);
+            await new Promise(resolve => setTimeout(resolve, 500));
+        }
+    }
+
+    updateProgress(progress) {
+        const btn = document.getElementById('generateBtn');
+        if (btn && this.isGenerating) {
+            const label = window.t ? window.t('generating') : 'Generating...';
+            btn.textContent = `${label} ${Math.round(progress * 100)}%`;
+        }
+    }
+
     getFormParams() {
         // Extract form parameters for API submission
         const inputs = {
@@ -170,6 +332,14 @@ class TextureGenerator {
             params[key] = input.value;
         });
 
+        // The 3D viewer uploads precomputed mip levels instead of generating them
+        if (document.getElementById('threejs-container')) {
+            params.mipmaps = true;
+        }
+
+        // A busy server should answer with a quick preview rather than an error
+        params.over_budget = 'preview';
+
         return isValid ? params : null;
     }
 
@@ -188,13 +358,14 @@ class TextureGenerator {
         }
     }
 
-    handleGenerationSuccess(imageUrl) {
+    handleGenerationSuccess(imageUrl, result = {}) {
         // Display generated texture in the designated image element
         const img = document.getElementById('generatedImage');
         const placeholder = document.querySelector('.image-placeholder');
         
         if (img) {
-            img.src = imageUrl + "?t=" + new Date().getTime();
+            // Texture URLs are content-addressed, so no cache-buster is needed
+            img.src = imageUrl;
             img.style.display = "block";
             if (placeholder) placeholder.style.display = "none";
         }
@@ -219,7 +390,7 @@ class TextureGenerator {
 
         // Trigger custom event for other components
         document.dispatchEvent(new CustomEvent('textureGenerated', {
-            detail: { imageUrl }
+            detail: { imageUrl, mipmapUrl: result.mipmap_url, mipmaps: result.mipmaps }
         }));
     }
 
@@ -0,0 +1,65 @@
+"""
+Test Fixtures - seeded fields and services shared by the test modules
+
+Run the suite from the repository root:
+
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pytest
+from config import PATTERN_PARAMS, SIMULATION_PARAMS
+from services.checkpoint_store import CheckpointStore
+from services.cost_model import CostModel
+from services.single_flight import SingleFlight
+from services.texture_cache import TextureCache
+from services.texture_generator import TextureGeneratorService
+
+
+@pytest.fixture
+def seeded_fields():
+    """Factory of seeded (A, B) starting grids, shaped like the service's."""
+    def make(size, dtype=np.float64, seed=SIMULATION_PARAMS['random_seed']):
+        rng = np.random.RandomState(seed)
+        noise = (rng.rand(size, size) - 0.5) * 0.1
+        return (0.5 + noise).astype(dtype), (0.25 + noise).astype(dtype)
+    return make
+
+
+@pytest.fixture(params=[np.float64, np.float32], ids=['float64', 'float32'])
+def dtype(request):
+    """Simulation precision."""
+    return request.param
+
+
+@pytest.fixture(params=['single', 'batched'])
+def case(request, dtype, seeded_fields):
+    """
+    Seeded (A, B, delta_t, params) to step: one 24x24 grid with the pattern
+    parameters, or a stack of three with per-member physics and time steps.
+    """
+    A, B = seeded_fields(24, dtype)
+    if request.param == 'single':
+        return A, B, 1.0, PATTERN_PARAMS
+    members = [SIMULATION_PARAMS, PATTERN_PARAMS, {**PATTERN_PARAMS, 'feed_rate': 0.055}]
+    physics = {
+        name: np.array([member[name] for member in members]).reshape(-1, 1, 1)
+        for name in ('D_a', 'D_b', 'feed_rate', 'kill_rate')
+    }
+    delta_t = np.array([1.0, 0.5, 1.0]).reshape(-1, 1, 1)
+    return np.stack([A] * 3), np.stack([B] * 3), delta_t, physics
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Texture service whose cache, checkpoints and flight markers live in tmp_path."""
+    return TextureGeneratorService(
+        cache=TextureCache(tmp_path / 'cache', disk_budget=1 << 30, memory_budget=1 << 20),
+        checkpoints=CheckpointStore(tmp_path / 'checkpoints', disk_budget=1 << 30),
+        flights=SingleFlight(tmp_path / 'flights', poll_interval=0.01),
+        cost_model=CostModel(None),
+    )
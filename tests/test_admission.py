@@ -0,0 +1,89 @@
+"""
+Admission Tests - estimates, budgets and the preview downgrade of _admit
+
+Requests run when their estimate fits the per-request limits and the work
+in flight; otherwise they are refused with 429, or with the "preview"
+policy shrunk to a preview that fits.
+"""
+import flask
+import pytest
+from config import COST_SETTINGS, JOB_SETTINGS
+from routes import api
+from utils.helpers import validate_texture_params
+
+
+def request(**data):
+    result = validate_texture_params(data)
+    assert result['valid'], result.get('error')
+    return result['params']
+
+
+@pytest.fixture(autouse=True)
+def app_context():
+    """Rejections are built with jsonify."""
+    with flask.Flask(__name__).app_context():
+        yield
+
+
+# Far beyond COST_SETTINGS['max_cpu_seconds']
+HUGE = {'size': 4096, 't_max': 10000, 'delta_t': 0.001}
+
+
+def test_affordable_request_runs(service):
+    params = request(size=64, t_max=100, delta_t=1)
+    admitted, estimate, rejection = api._admit(service, params)
+    assert rejection is None
+    assert admitted is params
+    assert estimate == service.estimate_cost(params)
+
+
+def test_over_limit_is_rejected(service):
+    admitted, estimate, rejection = api._admit(service, request(**HUGE))
+    assert admitted is None
+    response, status = rejection
+    assert status == 429
+    assert estimate['cpu_seconds'] > COST_SETTINGS['max_cpu_seconds']
+    assert response.get_json()['estimate'] == estimate
+    assert 'CPU-seconds' in response.get_json()['error']
+    # Waiting would not help, so there is no Retry-After
+    assert 'Retry-After' not in response.headers
+
+
+def test_memory_limit_is_rejected(service, monkeypatch):
+    monkeypatch.setitem(COST_SETTINGS, 'max_memory_mb', 1)
+    _, _, rejection = api._admit(service, request(size=256, t_max=10, delta_t=1))
+    assert rejection[1] == 429
+    assert 'memory' in rejection[0].get_json()['error']
+
+
+def test_busy_server_asks_to_retry(service, monkeypatch):
+    monkeypatch.setattr(api, '_sync_work', COST_SETTINGS['cpu_budget_seconds'])
+    for policy in ('reject', 'preview'):
+        _, _, rejection = api._admit(service, request(size=64, t_max=100, delta_t=1), policy)
+        response, status = rejection
+        assert status == 429
+        assert 1 <= int(response.headers['Retry-After']) <= COST_SETTINGS['retry_after_max']
+
+
+def test_preview_policy_downgrades(service):
+    params = request(**HUGE)
+    admitted, estimate, rejection = api._admit(service, params, 'preview')
+    assert rejection is None
+    size = COST_SETTINGS['preview_size']
+    assert admitted['size'] == size
+    # Short enough to run synchronously
+    steps = int(admitted['t_max'] / admitted['delta_t'])
+    assert size * size * steps <= JOB_SETTINGS['sync_max_cell_steps']
+    assert admitted['t_max'] < params['t_max']
+    assert {name: admitted[name] for name in ('K', 'color1', 'delta_t')} == \
+        {name: params[name] for name in ('K', 'color1', 'delta_t')}
+    assert estimate['preview'] is True
+    assert (estimate['requested_size'], estimate['requested_t_max']) == (4096, 10000)
+    assert estimate['cpu_seconds'] == service.estimate_cost(admitted)['cpu_seconds']
+
+
+def test_preview_of_small_request_is_not_retried(service, monkeypatch):
+    # Nothing to downgrade: the request is already preview-sized
+    monkeypatch.setitem(COST_SETTINGS, 'max_cpu_seconds', 0)
+    _, _, rejection = api._admit(service, request(size=64, t_max=100, delta_t=1), 'preview')
+    assert rejection[1] == 429
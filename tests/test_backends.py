@@ -0,0 +1,22 @@
+"""
+Backend Tests - backend selection and fallback
+
+Numerical agreement of the backends with numpy is checked in
+test_steppers.py.
+"""
+from config import PATTERN_PARAMS
+from services import backends
+from services.backends import STEPPER_CLASSES, available_backends, create_stepper, resolve_backend
+
+
+def test_create_stepper_uses_requested_backend(seeded_fields):
+    A, B = seeded_fields(16)
+    for backend in available_backends():
+        assert isinstance(create_stepper(backend, A, B, 1.0, PATTERN_PARAMS), STEPPER_CLASSES[backend])
+
+
+def test_missing_backend_falls_back(monkeypatch):
+    monkeypatch.setattr(backends, 'backend_available', lambda name: name == 'numpy')
+    assert resolve_backend('numba') == 'numpy'
+    assert resolve_backend('scipy') == 'numpy'
+    assert resolve_backend('numpy') == 'numpy'
@@ -0,0 +1,71 @@
+"""
+Checkpoint Tests - resumed runs against uninterrupted ones
+
+A run to t2 that resumes from the checkpoint of a run to t1 must end in
+exactly the fields of a run straight to t2, for every solver, backend and
+precision. Runs that differ in backend or precision must not share a
+trajectory.
+"""
+import numpy as np
+import pytest
+from config import SIMULATION_PARAMS
+from services.backends import backend_available
+from services.checkpoint_store import state_key
+from utils.helpers import validate_texture_params
+
+T1, T2 = 20.0, 50.0
+
+
+def request(**overrides):
+    data = {'size': 32, 'delta_t': 1.0, 't_max': T2, **overrides}
+    result = validate_texture_params(data)
+    assert result['valid'], result.get('error')
+    return result['params']
+
+
+@pytest.mark.parametrize('solver, backend', [
+    ('explicit', 'numpy'), ('explicit', 'scipy'), ('explicit', 'numba'), ('spectral', 'numpy'),
+])
+@pytest.mark.parametrize('precision', ['float64', 'float32'])
+def test_resumed_run_matches_direct_run(service, solver, backend, precision):
+    if not backend_available(backend):
+        pytest.skip(f'{backend} is not installed')
+    params = request(solver=solver, backend=backend, precision=precision)
+
+    _, _, first = service._simulate([{**params, 't_max': T1}])
+    assert first['steps'] == T1
+    A, B, resumed = service._simulate([params])
+    # Only the steps beyond the checkpoint are executed
+    assert resumed['steps'] == T2 - T1
+
+    expected_A, expected_B, direct = service._simulate([params], resume=False)
+    assert direct['steps'] == T2
+    assert A.dtype == np.dtype(precision)
+    assert np.array_equal(A, expected_A)
+    assert np.array_equal(B, expected_B)
+
+
+@pytest.mark.parametrize('change', [
+    {'precision': 'float64'}, {'backend': 'scipy'}, {'backend': 'numba'}, {'delta_t': 0.5},
+])
+def test_trajectories_are_not_shared(service, change):
+    params = request(precision='float32', backend='numpy')
+    other = {**params, **change}
+    if not backend_available(other['backend']):
+        pytest.skip(f"{other['backend']} is not installed")
+
+    service._simulate([{**params, 't_max': T1}])
+    _, _, run = service._simulate([other])
+    assert run['steps'] == int(T2 / other['delta_t'])
+
+
+def test_backend_is_keyed_as_resolved(monkeypatch):
+    params = request(backend='numpy')
+    simulation = SIMULATION_PARAMS
+    # A backend that falls back to numpy on this server shares its trajectory
+    monkeypatch.setattr('services.backends.backend_available', lambda name: name == 'numpy')
+    assert state_key({**params, 'backend': 'numba'}, simulation) == state_key(params, simulation)
+    monkeypatch.undo()
+    # The spectral solver has no backends
+    spectral = request(solver='spectral', backend='numpy')
+    assert state_key({**spectral, 'backend': 'scipy'}, simulation) == state_key(spectral, simulation)
@@ -0,0 +1,33 @@
+"""
+Cost Model Tests - calibration from observed runs, across processes
+
+A job worker's model records what it observes; replaying the recording
+into another model must leave it where observing directly would have.
+"""
+from services.cost_model import MIN_OBSERVED_SECONDS, CostModel
+
+
+def observe_runs(model):
+    model.observe('explicit/numpy', 512 * 512, 1000, 2.0)
+    model.observe('spectral', 256 * 256, 100, 0.5)
+    model.observe_encoding(512 * 512, 0.1)
+    # Too short to measure: not recorded either
+    model.observe('explicit/numpy', 64 * 64, 10, MIN_OBSERVED_SECONDS / 2)
+
+
+def test_replay_matches_direct_observation():
+    direct, worker, parent = CostModel(None), CostModel(None, record=True), CostModel(None)
+    observe_runs(direct)
+    observe_runs(worker)
+
+    observations = worker.take_observations()
+    assert [observation[0] for observation in observations] == ['simulation', 'simulation', 'encoding']
+    assert worker.take_observations() == []
+    parent.replay(observations)
+    assert parent.stats() == direct.stats()
+
+
+def test_models_do_not_record_by_default():
+    model = CostModel(None)
+    observe_runs(model)
+    assert model.take_observations() == []
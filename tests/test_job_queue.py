@@ -0,0 +1,102 @@
+"""
+Job Queue Tests - background generation in spawned worker processes
+
+Workers get the parent's cache and checkpoint settings, so these tests
+point both at a temporary directory before the pool starts.
+"""
+import time
+
+import pytest
+from config import CACHE_SETTINGS, CHECKPOINT_SETTINGS
+from services.cost_model import CostModel, cost_kind
+from services.job_queue import CANCELLED, FINISHED, QUEUED, RUNNING, JobQueue, QueueFullError
+from utils.helpers import validate_texture_params
+
+# Generous bound for a spawned worker to import numpy and the service
+TIMEOUT = 120
+
+
+def params_of(**request):
+    """Normalized parameters of a small request."""
+    return validate_texture_params({'size': 32, 't_max': 10, 'delta_t': 1, **request})['params']
+
+
+def wait_for(queue, job_id, states=(FINISHED,)):
+    """Poll a job until it reaches one of states; return its status."""
+    deadline = time.time() + TIMEOUT
+    while time.time() < deadline:
+        info = queue.status(job_id)
+        if info['status'] in states:
+            return info
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {info['status']}")
+
+
+@pytest.fixture
+def make_queue(tmp_path, monkeypatch):
+    """Factory of job queues writing into tmp_path; shut down after the test."""
+    monkeypatch.setitem(CACHE_SETTINGS, 'directory', tmp_path / 'cache')
+    monkeypatch.setitem(CHECKPOINT_SETTINGS, 'directory', tmp_path / 'checkpoints')
+    queues = []
+
+    def make(max_workers=1, max_pending=4, on_observations=None):
+        queue = JobQueue(max_workers=max_workers, max_pending=max_pending, result_ttl=3600,
+                         on_observations=on_observations)
+        queues.append(queue)
+        return queue
+    yield make
+    for queue in queues:
+        queue.shutdown()
+
+
+def test_job_generates_texture(make_queue, tmp_path):
+    queue = make_queue()
+    job_id = queue.submit(params_of())
+    info = wait_for(queue, job_id)
+    result = info['result']
+    assert info['progress'] == 1.0
+    assert result['cached'] is False and result['steps'] == 10
+    assert (tmp_path / 'cache' / f"{result['key']}.png").exists()
+
+
+def test_cached_job_completes_without_worker(make_queue):
+    queue = make_queue()
+    job_id = queue.submit(params_of(), cached={'key': 'f' * 32})
+    info = queue.status(job_id)
+    assert info['status'] == FINISHED
+    assert info['result']['stop_reason'] == 'cached'
+    assert queue._executor is None
+
+
+def test_full_queue_rejects_and_cancel_frees_slot(make_queue):
+    queue = make_queue(max_workers=1, max_pending=0)
+    long_job = queue.submit(params_of(size=256, t_max=10000))
+    with pytest.raises(QueueFullError):
+        queue.submit(params_of())
+    assert queue.cancel(long_job)
+    assert wait_for(queue, long_job, (CANCELLED,))['status'] == CANCELLED
+    assert queue.status(queue.submit(params_of(K=1.5)))['status'] in (QUEUED, RUNNING)
+    assert queue.cancel('unknown') is False
+
+
+def test_cheap_jobs_overtake_expensive_ones(make_queue):
+    queue = make_queue(max_workers=1)
+    blocker = queue.submit(params_of(K=1.1))
+    expensive = queue.submit(params_of(K=1.2), estimate={'cpu_seconds': 100.0})
+    cheap = queue.submit(params_of(K=1.3), estimate={'cpu_seconds': 0.1})
+    for job_id in (blocker, expensive, cheap):
+        wait_for(queue, job_id)
+    assert queue._jobs[cheap]['finished'] <= queue._jobs[expensive]['finished']
+    assert queue.load() == 0.0
+
+
+def test_worker_observations_calibrate_parent_model(make_queue):
+    model = CostModel(None)
+    kind = cost_kind('explicit', 'numpy', 'float64')
+    configured = model.rates[kind]
+    queue = make_queue(on_observations=model.replay)
+    # Long enough for the worker to time it (MIN_OBSERVED_SECONDS)
+    job_id = queue.submit(params_of(size=256, t_max=300, precision='float64'))
+    assert wait_for(queue, job_id)['result']['steps'] == 300
+    assert model.stats()['observations'][kind] >= 1
+    assert model.rates[kind] != configured
@@ -0,0 +1,117 @@
+"""
+Mipmap Tests - level sizes, atlas layout and periodic resampling
+
+Levels follow the GPU convention for any size, including odd and
+non-square ones; the box filter averages exact areas; and since levels are
+resampled with wrap-around indexing, a periodic image keeps tiling at
+every level.
+"""
+import itertools
+
+import numpy as np
+import pytest
+from services.mipmaps import (KERNELS, _resample_weights, atlas_size, build_pyramid, level_sizes,
+                              mip_layout, pack_atlas)
+
+SIZES = [(1, 1), (2, 1), (7, 3), (5, 12), (64, 64), (100, 37), (513, 511)]
+
+
+@pytest.mark.parametrize('width, height, expected', [
+    (7, 3, [(7, 3), (3, 1), (1, 1)]),
+    (5, 12, [(5, 12), (2, 6), (1, 3), (1, 1)]),
+    (1, 1, [(1, 1)]),
+])
+def test_level_sizes(width, height, expected):
+    assert level_sizes(width, height) == expected
+
+
+@pytest.mark.parametrize('width, height', SIZES)
+def test_level_sizes_follow_gpu_convention(width, height):
+    sizes = level_sizes(width, height)
+    assert len(sizes) == max(width, height).bit_length()
+    for level, (w, h) in enumerate(sizes):
+        assert (w, h) == (max(1, width >> level), max(1, height >> level))
+
+
+def test_mip_layout_of_odd_non_square_image():
+    assert mip_layout(5, 12) == [(0, 0, 5, 12), (5, 0, 2, 6), (5, 6, 1, 3), (5, 9, 1, 1)]
+    assert atlas_size(5, 12) == (7, 12)
+    assert mip_layout(7, 3) == [(0, 0, 7, 3), (7, 0, 3, 1), (7, 1, 1, 1)]
+    assert atlas_size(7, 3) == (10, 3)
+
+
+@pytest.mark.parametrize('width, height', SIZES)
+def test_mip_layout_levels_fit_without_overlap(width, height):
+    layout = mip_layout(width, height)
+    atlas_width, atlas_height = atlas_size(width, height)
+    assert [(w, h) for _, _, w, h in layout] == level_sizes(width, height)
+    covered = np.zeros((atlas_height, atlas_width), dtype=int)
+    for x, y, w, h in layout:
+        covered[y:y + h, x:x + w] += 1
+    assert covered.max() == 1
+    assert covered.sum() == sum(w * h for _, _, w, h in layout)
+
+
+@pytest.mark.parametrize('kernel', list(KERNELS))
+@pytest.mark.parametrize('source, target', [(2, 1), (3, 1), (7, 3), (5, 2), (12, 6), (511, 255), (64, 32)])
+def test_weights_sum_to_one(kernel, source, target):
+    indices, weights = _resample_weights(source, target, kernel)
+    assert indices.shape == weights.shape and indices.shape[0] == target
+    assert indices.min() >= 0 and indices.max() < source
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0, rtol=1e-6)
+
+
+@pytest.mark.parametrize('source, target', [(2, 1), (3, 1), (7, 3), (5, 2), (511, 255)])
+def test_box_footprints_cover_every_source_pixel_equally(source, target):
+    indices, weights = _resample_weights(source, target, 'box')
+    assert weights.min() >= 0
+    coverage = np.zeros(source)
+    np.add.at(coverage, indices, weights)
+    # Each source pixel contributes its area once, spread over the outputs
+    np.testing.assert_allclose(coverage, target / source, rtol=1e-6)
+
+
+def periodic_image(width, height, seed=0):
+    """Smooth periodic test pattern: a few random Fourier modes per channel."""
+    rng = np.random.RandomState(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    image = np.zeros((height, width, 3))
+    for channel, (fx, fy) in itertools.product(range(3), [(1, 0), (0, 1), (2, 1), (1, 3)]):
+        phase = rng.rand() * 2 * np.pi
+        image[..., channel] += np.cos(2 * np.pi * (fx * x / width + fy * y / height) + phase)
+    return np.rint((image / 8 + 0.5) * 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize('kernel', list(KERNELS))
+@pytest.mark.parametrize('width, height', [(64, 64), (48, 32)])
+def test_periodic_image_keeps_tiling(kernel, width, height):
+    rgb = periodic_image(width, height)
+    # Mirrored around the wrap seam, so equal first and last rows and columns
+    rgb = np.concatenate([rgb, rgb[::-1]], axis=0)
+    rgb = np.concatenate([rgb, rgb[:, ::-1]], axis=1)
+    for level in build_pyramid(rgb, kernel):
+        assert np.array_equal(level[:, 0], level[:, -1])
+        assert np.array_equal(level[0], level[-1])
+
+
+@pytest.mark.parametrize('kernel', list(KERNELS))
+def test_levels_of_shifted_image_are_shifted(kernel):
+    # With wrap-around indexing a shift by 2^k pixels shifts level k by one pixel
+    rgb = periodic_image(64, 32)
+    shifted = np.roll(rgb, (8, 8), axis=(0, 1))
+    levels, shifted_levels = build_pyramid(rgb, kernel), build_pyramid(shifted, kernel)
+    for level in (1, 2, 3):
+        offset = 8 >> level
+        expected = np.roll(levels[level - 1], (offset, offset), axis=(0, 1))
+        np.testing.assert_allclose(shifted_levels[level - 1].astype(int), expected.astype(int), atol=1)
+
+
+@pytest.mark.parametrize('width, height', [(7, 3), (5, 12), (64, 64)])
+def test_pyramid_matches_layout(width, height):
+    rgb = periodic_image(width, height)
+    levels = build_pyramid(rgb)
+    atlas = pack_atlas(rgb, levels)
+    assert atlas.shape[:2] == atlas_size(width, height)[::-1]
+    for (x, y, w, h), level in zip(mip_layout(width, height), [rgb] + levels):
+        assert level.shape == (h, w, 3)
+        assert np.array_equal(atlas[y:y + h, x:x + w], level)
@@ -0,0 +1,65 @@
+"""
+Multigrid Tests - coarse-to-fine runs and their step accounting
+
+A multigrid run simulates most steps on a coarser grid, so its fields do
+not match a full-resolution run cell for cell; the mean and the variance
+of A must still agree once the pattern has formed, as
+benchmarks/bench_multigrid.py reports them. Requests too small to coarsen
+run as plain simulations and are costed like them.
+"""
+import pytest
+from config import PATTERN_PARAMS
+from utils.helpers import validate_texture_params
+
+# Largest allowed difference of the mean, and relative difference of the variance
+MEAN_TOLERANCE = 0.05
+VARIANCE_TOLERANCE = 0.4
+
+
+def request(**overrides):
+    data = {'delta_t': 1.0, 'precision': 'float64', **overrides}
+    result = validate_texture_params(data)
+    assert result['valid'], result.get('error')
+    return result['params']
+
+
+def test_multigrid_matches_explicit_statistics(service):
+    params = {**request(size=128, t_max=4000.0), **PATTERN_PARAMS}
+    assert service._pyramid_factor({**params, 'multigrid': True}) == 4
+    expected, _, _ = service._simulate([params], resume=False)
+    A, _, run = service._simulate([{**params, 'multigrid': True}], resume=False)
+
+    assert run['steps'] == 4000
+    # A pattern formed (the uniform state has no variance)
+    assert expected.var() > 0.01
+    assert abs(A.mean() - expected.mean()) < MEAN_TOLERANCE
+    assert abs(A.var() - expected.var()) < VARIANCE_TOLERANCE * expected.var()
+
+
+@pytest.mark.parametrize('size, multigrid, factor', [
+    (32, True, 1), (48, True, 1), (64, True, 2), (96, True, 2), (128, True, 4), (128, False, 1),
+])
+def test_pyramid_factor(service, size, multigrid, factor):
+    assert service._pyramid_factor(request(size=size, multigrid=multigrid, t_max=10.0)) == factor
+
+
+def test_uncoarsened_multigrid_resumes(service):
+    # 48 cells cannot be coarsened above min_coarse_size, so the run is plain
+    params = request(size=48, multigrid=True, t_max=50.0)
+    assert service.steps_to_run(params) == 50
+    service._simulate([{**params, 't_max': 20.0}])
+
+    assert service.steps_to_run(params) == 30
+    assert service.estimate_cost(params)['steps'] == 30
+    assert service.estimate_cost(params, from_start=True)['steps'] == 50
+    assert service._simulate([params])[2]['steps'] == 30
+
+
+def test_coarsened_multigrid_runs_in_full(service):
+    params = request(size=64, t_max=50.0)
+    service._simulate([{**params, 't_max': 20.0}])
+    assert service.steps_to_run(params) == 30
+    # Coarse-to-fine trajectories depend on the run length and never resume
+    multigrid = {**params, 'multigrid': True}
+    assert service.steps_to_run(multigrid) == 50
+    assert service.estimate_cost(multigrid)['steps'] == 50
@@ -0,0 +1,86 @@
+"""
+Preview Atlas Tests - building, rebuilding and reading the atlas
+
+Builds sweep a small grid. A reader must always pair an index with the
+array it describes: before, during and after a rebuild.
+"""
+import json
+
+import numpy as np
+import pytest
+from config import PREVIEW_ATLAS_SETTINGS
+from services import preview_atlas
+from services.preview_atlas import ATLAS_VERSION, PreviewAtlas, atlas_paths, build_atlas, get_atlas, index_path
+
+
+@pytest.fixture(autouse=True)
+def small_grid(monkeypatch):
+    monkeypatch.setitem(PREVIEW_ATLAS_SETTINGS, 'size', 32)
+    monkeypatch.setitem(PREVIEW_ATLAS_SETTINGS, 'texture_size', 64)
+    monkeypatch.setitem(PREVIEW_ATLAS_SETTINGS, 't_max', (10, 20))
+    monkeypatch.setitem(PREVIEW_ATLAS_SETTINGS, 'feed_rate', (0.03, 0.04))
+    monkeypatch.setitem(PREVIEW_ATLAS_SETTINGS, 'kill_rate', (0.06,))
+
+
+def arrays(directory):
+    return sorted(path.name for path in directory.glob('*.npy'))
+
+
+def test_build_writes_index_naming_its_array(service, tmp_path):
+    index = build_atlas(service, tmp_path)
+    atlas_path, path = atlas_paths(tmp_path)
+    assert json.loads(path.read_text()) == index
+    assert atlas_path.name == index['atlas'] and arrays(tmp_path) == [index['atlas']]
+    assert not list(tmp_path.glob('*.tmp'))
+
+    atlas = PreviewAtlas(tmp_path)
+    assert atlas.previews.shape == (2, 2, 1, 2, 32, 32)
+    rgb, point = atlas.render(19, 0.041, 0.05, '#0000ff', '#ff0000')
+    assert rgb.shape == (32, 32, 3)
+    assert (point['t_max'], point['feed_rate'], point['kill_rate']) == (20, 0.04, 0.06)
+
+
+def test_rebuild_keeps_readers_consistent(service, tmp_path):
+    first = build_atlas(service, tmp_path)
+    reader = get_atlas(tmp_path)
+    expected = np.array(reader.previews)
+
+    second = build_atlas(service, tmp_path)
+    assert second['atlas'] != first['atlas']
+    # The previous array stays for readers that have just read the old index
+    assert arrays(tmp_path) == sorted([first['atlas'], second['atlas']])
+    assert np.array_equal(reader.previews, expected)
+    assert get_atlas(tmp_path) is not reader
+    assert get_atlas(tmp_path).index['atlas'] == second['atlas']
+
+    third = build_atlas(service, tmp_path)
+    assert arrays(tmp_path) == sorted([second['atlas'], third['atlas']])
+
+
+def test_failed_index_write_leaves_previous_build(service, tmp_path, monkeypatch):
+    first = build_atlas(service, tmp_path)
+
+    def fail(path, data):
+        raise OSError('disk full')
+    monkeypatch.setattr(preview_atlas, '_write_atomic', fail)
+    with pytest.raises(OSError):
+        build_atlas(service, tmp_path)
+    # The new array was written, but nothing refers to it yet
+    assert len(arrays(tmp_path)) == 2
+    atlas = PreviewAtlas(tmp_path)
+    assert atlas.index == first
+    assert atlas.previews.shape[0] == 2
+
+
+def test_atlas_of_older_version_is_replaced(service, tmp_path):
+    # Version 1 stored its array as atlas.npy
+    np.save(tmp_path / 'atlas.npy', np.zeros((1, 1, 1, 2, 32, 32), dtype=np.uint8))
+    index_path(tmp_path).write_text(json.dumps({'version': 1}))
+    with pytest.raises(FileNotFoundError):
+        PreviewAtlas(tmp_path)
+
+    index = build_atlas(service, tmp_path)
+    assert PreviewAtlas(tmp_path).index['version'] == ATLAS_VERSION
+    assert arrays(tmp_path) == sorted(['atlas.npy', index['atlas']])
+    build_atlas(service, tmp_path)
+    assert 'atlas.npy' not in arrays(tmp_path)
@@ -0,0 +1,135 @@
+"""
+Single Flight Tests - coalescing of identical generate_texture calls
+
+The simulation is replaced by a counting wrapper that holds the leader
+until every other caller is waiting, so the calls are known to overlap.
+"""
+import threading
+import time
+
+import pytest
+from services.checkpoint_store import CheckpointStore
+from services.cost_model import CostModel
+from services.single_flight import SingleFlight
+from services.texture_cache import TextureCache
+from services.texture_generator import TextureGeneratorService
+from utils.helpers import validate_texture_params
+
+CALLERS = 6
+
+
+@pytest.fixture
+def params():
+    return validate_texture_params({'size': 32, 't_max': 4.0, 'delta_t': 1.0})['params']
+
+
+class GatedSimulation:
+    """Wraps a service's _simulate: counts runs and blocks them until released."""
+
+    def __init__(self, service, error=None):
+        self.simulate = service._simulate
+        self.error = error
+        self.release = threading.Event()
+        self.runs = 0
+        service._simulate = self
+
+    def __call__(self, *args, **kwargs):
+        self.runs += 1
+        assert self.release.wait(10)
+        if self.error is not None:
+            raise self.error
+        return self.simulate(*args, **kwargs)
+
+
+def call_concurrently(function, count):
+    """Start count threads calling function; return (threads, outcomes)."""
+    outcomes = [None] * count
+
+    def call(index):
+        try:
+            outcomes[index] = function()
+        except Exception as e:
+            outcomes[index] = e
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def markers(service):
+    return list(service.flights.directory.iterdir())
+
+
+def test_identical_calls_run_one_simulation(service, params):
+    simulation = GatedSimulation(service)
+    threads, results = call_concurrently(lambda: service.generate_texture(params), CALLERS)
+    wait_for(lambda: service.flights.stats()['thread'] == CALLERS - 1)
+    simulation.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert simulation.runs == 1
+    assert all(result is results[0] for result in results)
+    assert results[0]['cached'] is False and results[0]['steps'] == 4
+    assert service.flights.stats() == {'leaders': 1, 'thread': CALLERS - 1, 'process': 0}
+    assert markers(service) == []
+    # Later calls are served by the cache
+    assert service.generate_texture(params)['cached'] is True
+
+
+def test_leader_error_reaches_every_caller(service, params):
+    error = RuntimeError('simulation failed')
+    simulation = GatedSimulation(service, error)
+    threads, outcomes = call_concurrently(lambda: service.generate_texture(params), CALLERS)
+    wait_for(lambda: service.flights.stats()['thread'] == CALLERS - 1)
+    simulation.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert simulation.runs == 1
+    assert all(outcome is error for outcome in outcomes)
+    # The marker is removed and its lock released: the next call leads a new run
+    assert markers(service) == []
+    simulation.error = None
+    assert service.generate_texture(params)['cached'] is False
+    assert simulation.runs == 2
+    assert service.flights.stats()['leaders'] == 2
+
+
+def test_other_process_waits_for_marker(service, params, tmp_path):
+    # A second service on the same directories stands in for another worker process
+    other = TextureGeneratorService(
+        cache=TextureCache(tmp_path / 'cache', disk_budget=1 << 30, memory_budget=0),
+        checkpoints=CheckpointStore(tmp_path / 'checkpoints', disk_budget=1 << 30),
+        flights=SingleFlight(tmp_path / 'flights', poll_interval=0.01),
+        cost_model=CostModel(None),
+    )
+    simulation = GatedSimulation(service)
+    other_simulation = GatedSimulation(other)
+    other_simulation.release.set()
+
+    threads, results = call_concurrently(lambda: service.generate_texture(params), 1)
+    wait_for(lambda: simulation.runs == 1 and markers(service))
+    # Waiters report 0 steps done while they wait for the marker's lock
+    waiting = threading.Event()
+    other_threads, other_results = call_concurrently(
+        lambda: other.generate_texture(params, progress=lambda done, total: waiting.set()), 1)
+    assert waiting.wait(10)
+    simulation.release.set()
+    for thread in threads + other_threads:
+        thread.join()
+
+    assert results[0]['cached'] is False
+    # The waiter found the leader's texture in the shared cache
+    assert other_results[0]['cached'] is True
+    assert other_simulation.runs == 0
+    assert other.flights.stats()['process'] == 1
+    assert markers(service) == []
@@ -0,0 +1,36 @@
+"""
+Solver Tests - pattern statistics of the spectral solver against explicit
+
+The spectral solver uses the exact Laplacian and much larger time steps,
+so its fields do not match the explicit scheme's cell for cell. The
+patterns must still agree statistically once formed: the mean and the
+variance of A are compared, as benchmarks/bench_solvers.py reports them.
+"""
+import numpy as np
+import pytest
+from config import PATTERN_PARAMS
+from services.simulation import GrayScottStepper, SpectralGrayScottStepper
+
+SIZE = 64
+T_MAX = 4000.0
+
+# Largest allowed difference of the mean, and relative difference of the variance
+MEAN_TOLERANCE = 0.05
+VARIANCE_TOLERANCE = 0.3
+
+
+def final_A(stepper_class, delta_t, fields):
+    A, B = fields
+    stepper = stepper_class(A, B, delta_t, PATTERN_PARAMS)
+    stepper.step(int(T_MAX / delta_t))
+    return stepper.A
+
+
+@pytest.mark.parametrize('delta_t', [1.0, 5.0, 10.0])
+def test_spectral_matches_explicit_statistics(delta_t, seeded_fields):
+    expected = final_A(GrayScottStepper, 1.0, seeded_fields(SIZE))
+    A = final_A(SpectralGrayScottStepper, delta_t, seeded_fields(SIZE))
+    # A pattern formed (the uniform state has no variance)
+    assert expected.var() > 0.01
+    assert abs(A.mean() - expected.mean()) < MEAN_TOLERANCE
+    assert abs(A.var() - expected.var()) < VARIANCE_TOLERANCE * expected.var()
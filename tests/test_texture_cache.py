@@ -0,0 +1,132 @@
+"""
+Texture Cache Tests - content addresses and the two-tier LRU store
+
+Equivalent requests must share one key, the disk tier must evict least
+recently used files first once over its byte budget, disk entries must be
+promoted to memory on read, and a write must never leave a partial file
+under an entry's name.
+"""
+import os
+
+import pytest
+from config import SIMULATION_PARAMS
+from services import texture_cache
+from services.texture_cache import TextureCache, texture_key
+from utils.helpers import validate_texture_params
+
+
+def key(number):
+    """A valid 32-character key."""
+    return f'{number:032x}'
+
+
+def normalized(**data):
+    result = validate_texture_params(data)
+    assert result['valid'], result.get('error')
+    return result['params']
+
+
+def test_key_ignores_ordering():
+    params = normalized(K=2.0, color1='#00ff00')
+    reordered = dict(reversed(list(params.items())))
+    simulation = dict(reversed(list(SIMULATION_PARAMS.items())))
+    assert texture_key(params, 64, SIMULATION_PARAMS) == texture_key(reordered, 64, simulation)
+
+
+def test_equivalent_requests_share_a_key(service):
+    params = normalized(size=64, K=2.0, color1='#00ff00')
+    equivalent = [
+        # Defaults spelled out, colors written differently
+        {**normalized(size=64, K='2', color1='00FF00', t_max=10.0, color2='#FF0000'), **SIMULATION_PARAMS},
+        # The backend and the mip settings do not change the base image
+        {**params, 'backend': 'scipy', 'mipmaps': True, 'mip_filter': 'kaiser'},
+    ]
+    for other in equivalent:
+        assert service.texture_key(other) == service.texture_key(params)
+
+
+@pytest.mark.parametrize('change', [
+    {'size': 128}, {'K': 2.5}, {'color2': '#ff0001'}, {'D_a': 0.03}, {'random_seed': 7},
+])
+def test_different_requests_get_different_keys(service, change):
+    params = normalized(size=64, K=2.0)
+    assert service.texture_key({**params, **change}) != service.texture_key(params)
+
+
+def test_disk_evicts_least_recently_used_at_budget(tmp_path):
+    cache = TextureCache(tmp_path, disk_budget=300, memory_budget=0)
+    for number in range(3):
+        cache.put(key(number), bytes(100))
+    # Reading the oldest entry makes the second one least recently used
+    assert cache.get(key(0)) == bytes(100)
+    cache.put(key(3), bytes(100))
+
+    assert not cache.path_for(key(1)).exists()
+    assert not cache.contains(key(1))
+    for number in (0, 2, 3):
+        assert cache.path_for(key(number)).exists()
+    assert cache.stats()['disk_bytes'] == 300
+
+    # One entry larger than the whole budget still stays, alone
+    cache.put(key(4), bytes(400))
+    assert sorted(os.listdir(tmp_path)) == [f'{key(4)}.png']
+    assert cache.stats()['disk_entries'] == 1
+
+
+def test_memory_evicts_least_recently_used_at_budget(tmp_path):
+    cache = TextureCache(tmp_path, disk_budget=1 << 20, memory_budget=250)
+    for number in range(3):
+        cache.put(key(number), bytes(100))
+    stats = cache.stats()
+    assert (stats['memory_entries'], stats['memory_bytes']) == (2, 200)
+    # Oversized entries are not held in memory at all
+    cache.put(key(3), bytes(300))
+    assert cache.stats()['memory_bytes'] == 200
+
+
+def test_disk_entries_are_promoted_to_memory(tmp_path):
+    # Written by another process sharing the directory
+    TextureCache(tmp_path, disk_budget=1 << 20, memory_budget=0).put(key(1), b'image')
+    cache = TextureCache(tmp_path, disk_budget=1 << 20, memory_budget=1 << 20)
+    assert cache.stats()['memory_entries'] == 0
+
+    assert cache.get(key(1)) == b'image'
+    assert cache.stats()['memory_entries'] == 1
+    # Served from memory from now on, even once the file is gone
+    os.remove(cache.path_for(key(1)))
+    assert cache.get(key(1)) == b'image'
+
+
+def test_formats_are_separate_entries(tmp_path):
+    cache = TextureCache(tmp_path, disk_budget=1 << 20, memory_budget=0, extensions=('.png', '.webp'))
+    cache.put(key(1), b'webp', '.webp')
+    assert cache.get(key(1)) is None
+    assert cache.get(key(1), '.webp') == b'webp'
+    assert cache.path_for(key(1), '.webp').name == f'{key(1)}.webp'
+
+
+def test_put_replaces_atomically(tmp_path, monkeypatch):
+    cache = TextureCache(tmp_path, disk_budget=1 << 20, memory_budget=0)
+    cache.put(key(1), b'old')
+    assert os.listdir(tmp_path) == [f'{key(1)}.png']
+
+    # A write that fails before the rename leaves the previous file intact
+    def fail(source, destination):
+        raise OSError('disk full')
+    monkeypatch.setattr(texture_cache.os, 'replace', fail)
+    with pytest.raises(OSError):
+        cache.put(key(1), b'new')
+    assert os.listdir(tmp_path) == [f'{key(1)}.png']
+    assert cache.path_for(key(1)).read_bytes() == b'old'
+
+    monkeypatch.undo()
+    cache.put(key(1), b'new')
+    assert os.listdir(tmp_path) == [f'{key(1)}.png']
+    assert cache.get(key(1)) == b'new'
+
+
+def test_temporary_files_are_not_indexed(tmp_path):
+    (tmp_path / 'leftover.tmp').write_bytes(bytes(100))
+    (tmp_path / 'not-a-key.png').write_bytes(bytes(100))
+    cache = TextureCache(tmp_path, disk_budget=1 << 20, memory_budget=0)
+    assert cache.stats()['disk_entries'] == 0
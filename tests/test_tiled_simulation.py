@@ -0,0 +1,33 @@
+"""
+Tiled Simulation Tests - strip decomposition and worker lifecycle
+
+Agreement with the single-process stepper is checked in test_steppers.py.
+"""
+import numpy as np
+import pytest
+from config import PATTERN_PARAMS
+from services.tiled_simulation import TiledGrayScottStepper, strip_bounds
+
+
+def test_strip_bounds_cover_rows():
+    assert strip_bounds(10, 3) == [(0, 3), (3, 6), (6, 10)]
+    assert strip_bounds(2, 8) == [(0, 1), (1, 2)]
+    assert strip_bounds(5, 0) == [(0, 5)]
+
+
+def test_close_keeps_fields_readable(seeded_fields):
+    A, B = seeded_fields(16)
+    with TiledGrayScottStepper(A, B, 1.0, PATTERN_PARAMS, workers=2, halo=2) as tiled:
+        assert tiled.workers == 2
+        tiled.step(3)
+        expected = np.array(tiled.A)
+    # Closing stops the workers and detaches the fields from shared memory
+    assert tiled.workers == 0
+    assert np.array_equal(tiled.A, expected)
+    tiled.close()
+
+
+def test_halo_must_be_positive(seeded_fields):
+    A, B = seeded_fields(8)
+    with pytest.raises(ValueError):
+        TiledGrayScottStepper(A, B, 1.0, PATTERN_PARAMS, workers=2, halo=0)
@@ -6,7 +6,10 @@ and mathematical operations used throughout the application.
 """
 import re
 from typing import Dict, Any, Tuple
-from config import TEXTURE_DEFAULTS
+from config import (TEXTURE_DEFAULTS, SIMULATION_PARAMS, SIMULATION_PARAM_RANGES, BATCH_SETTINGS,
+                    SOLVER_SETTINGS, BACKEND_SETTINGS, DEFAULT_TEXTURE_SIZE, MIN_TEXTURE_SIZE,
+                    MAX_TEXTURE_SIZE, CONVERGENCE_SETTINGS, IMAGE_FORMATS, ENCODING_SETTINGS,
+                    MIPMAP_SETTINGS, ANIMATION_FORMATS, ANIMATION_SETTINGS, PRECISION_SETTINGS)
 
 def hex_to_rgb(hex_color: str) -> Tuple[float, float, float]:
     """
@@ -30,6 +33,30 @@ def hex_to_rgb(hex_color: str) -> Tuple[float, float, float]:
     
     return tuple(int(hex_color[i:i+2], 16) / 255.0 for i in (0, 2, 4))
 
+def parse_bool(value: Any) -> bool:
+    """
+    Interpret a JSON or query-string value as a boolean flag.
+    
+    Args:
+        value: bool, number or string such as "true", "1", "yes", "off"
+        
+    Returns:
+        bool: Parsed flag
+        
+    Raises:
+        ValueError: If the value is not a recognizable boolean
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 'yes', 'on'):
+        return True
+    if text in ('0', 'false', 'no', 'off', ''):
+        return False
+    raise ValueError(f'Invalid boolean value: {value}')
+
 def validate_hex_color(color: str) -> bool:
     """
     Validate if string represents a valid HEX color code.
@@ -49,6 +76,102 @@ def validate_hex_color(color: str) -> bool:
     # Check if it's exactly 6 characters and all are valid hex digits
     return len(color) == 6 and re.match(r'^[0-9a-fA-F]+$', color) is not None
 
+def normalize_hex_color(color: str) -> str:
+    """
+    Bring a valid HEX color into canonical "#rrggbb" form.
+    
+    Equal colors written differently ("FF0000", "#ff0000") must produce the
+    same normalized parameters, since those key the texture cache.
+    
+    Args:
+        color: Color string already accepted by validate_hex_color
+        
+    Returns:
+        str: Lowercase color with a leading #
+    """
+    return '#' + color.lstrip('#').lower()
+
+def image_format_available(image_format: str) -> bool:
+    """
+    Check whether the installed Pillow can encode an image format.
+    
+    WebP support is an optional part of Pillow builds.
+    
+    Args:
+        image_format: Key of IMAGE_FORMATS
+        
+    Returns:
+        bool: True if images can be written in this format
+    """
+    from PIL import features
+    if image_format == 'webp':
+        return bool(features.check('webp'))
+    return image_format in IMAGE_FORMATS
+
+def validate_encoding_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate the output encoding of a texture.
+    
+    Only the setting that applies to the chosen format is kept (quality
+    for webp/jpeg, compress_level for png, mip_filter with mipmaps), so
+    requests that differ in an ignored setting share their cache entry.
+    
+    Args:
+        data: Dictionary that may contain format, quality, compress_level,
+              tileable, mipmaps and mip_filter
+        
+    Returns:
+        dict: Dictionary with validation results:
+            - 'valid': boolean indicating if all parameters are valid
+            - 'params': format, quality, compress_level, tileable, mipmaps
+              and mip_filter (if valid)
+            - 'error': error message string (if invalid)
+    """
+    try:
+        image_format = str(data.get('format', ENCODING_SETTINGS['format'])).lower()
+        if image_format == 'jpg':
+            image_format = 'jpeg'
+        if image_format not in IMAGE_FORMATS:
+            return {'valid': False, 'error': f"format must be one of: {', '.join(IMAGE_FORMATS)}"}
+        if not image_format_available(image_format):
+            return {'valid': False, 'error': f'format {image_format} is not supported by this server'}
+        
+        quality = None
+        compress_level = None
+        if image_format == 'png':
+            compress_level = int(data.get('compress_level', ENCODING_SETTINGS['compress_level']))
+            if not (0 <= compress_level <= 9):
+                return {'valid': False, 'error': 'compress_level must be between 0 and 9'}
+        else:
+            quality = int(data.get('quality', ENCODING_SETTINGS['quality']))
+            if not (1 <= quality <= 100):
+                return {'valid': False, 'error': 'quality must be between 1 and 100'}
+        
+        # Tileable textures must survive encoding with seamless edges: JPEG's
+        # 8x8 blocks and chroma subsampling do not, WebP switches to lossless
+        # and PNG is always lossless
+        tileable = parse_bool(data.get('tileable', False))
+        if tileable and image_format == 'jpeg':
+            return {'valid': False, 'error': 'tileable textures need format png or webp'}
+        if image_format == 'png':
+            tileable = True
+        
+        mipmaps = parse_bool(data.get('mipmaps', MIPMAP_SETTINGS['enabled']))
+        mip_filter = None
+        if mipmaps:
+            mip_filter = str(data.get('mip_filter', MIPMAP_SETTINGS['filter'])).lower()
+            if mip_filter not in MIPMAP_SETTINGS['filters']:
+                return {'valid': False, 'error': f"mip_filter must be one of: {', '.join(MIPMAP_SETTINGS['filters'])}"}
+        
+        return {
+            'valid': True,
+            'params': {'format': image_format, 'quality': quality, 'compress_level': compress_level,
+                       'tileable': tileable, 'mipmaps': mipmaps, 'mip_filter': mip_filter}
+        }
+    
+    except (ValueError, TypeError) as e:
+        return {'valid': False, 'error': f'Invalid parameter type: {str(e)}'}
+
 def validate_texture_params(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Validate parameters for texture generation algorithms.
@@ -72,6 +195,22 @@ def validate_texture_params(data: Dict[str, Any]) -> Dict[str, Any]:
         delta_t = float(data.get('delta_t', TEXTURE_DEFAULTS['delta_t']))
         color1 = data.get('color1', TEXTURE_DEFAULTS['color1'])
         color2 = data.get('color2', TEXTURE_DEFAULTS['color2'])
+        solver = data.get('solver', SOLVER_SETTINGS['default'])
+        backend = data.get('backend', BACKEND_SETTINGS['default'])
+        size = int(data.get('size', DEFAULT_TEXTURE_SIZE))
+        multigrid = parse_bool(data.get('multigrid', False))
+        tolerance = float(data.get('tolerance', CONVERGENCE_SETTINGS['tolerance']))
+        
+        if solver not in SOLVER_SETTINGS['available']:
+            return {'valid': False, 'error': f"solver must be one of: {', '.join(SOLVER_SETTINGS['available'])}"}
+        
+        # Backends without their optional package fall back when the run starts
+        if backend not in BACKEND_SETTINGS['available']:
+            return {'valid': False, 'error': f"backend must be one of: {', '.join(BACKEND_SETTINGS['available'])}"}
+        
+        precision = data.get('precision', PRECISION_SETTINGS['interactive'][solver])
+        if precision not in PRECISION_SETTINGS['available']:
+            return {'valid': False, 'error': f"precision must be one of: {', '.join(PRECISION_SETTINGS['available'])}"}
         
         # Validate mathematical parameter ranges
         if not (0.1 <= K <= 5.0):
@@ -80,8 +219,16 @@ def validate_texture_params(data: Dict[str, Any]) -> Dict[str, Any]:
         if not (1.0 <= t_max <= 10000.0):
             return {'valid': False, 'error': 't_max must be between 1.0 and 10000.0'}
         
-        if not (0.001 <= delta_t <= 1.0):
-            return {'valid': False, 'error': 'delta_t must be between 0.001 and 1.0'}
+        # Implicit diffusion allows much larger steps than the explicit scheme
+        max_delta_t = SOLVER_SETTINGS[f'{solver}_max_delta_t']
+        if not (0.001 <= delta_t <= max_delta_t):
+            return {'valid': False, 'error': f'delta_t must be between 0.001 and {max_delta_t}'}
+        
+        if not (MIN_TEXTURE_SIZE <= size <= MAX_TEXTURE_SIZE):
+            return {'valid': False, 'error': f'size must be between {MIN_TEXTURE_SIZE} and {MAX_TEXTURE_SIZE}'}
+        
+        if not (0.0 <= tolerance <= CONVERGENCE_SETTINGS['max_tolerance']):
+            return {'valid': False, 'error': f"tolerance must be between 0 and {CONVERGENCE_SETTINGS['max_tolerance']}"}
         
         # Check numerical stability constraint
         if delta_t > t_max:
@@ -94,20 +241,174 @@ def validate_texture_params(data: Dict[str, Any]) -> Dict[str, Any]:
         if not validate_hex_color(color2):
             return {'valid': False, 'error': f'Invalid color2 format: {color2}'}
         
+        encoding_result = validate_encoding_params(data)
+        if not encoding_result['valid']:
+            return encoding_result
+        
         return {
             'valid': True,
             'params': {
                 'K': K,
                 't_max': t_max,
                 'delta_t': delta_t,
-                'color1': color1,
-                'color2': color2
+                'color1': normalize_hex_color(color1),
+                'color2': normalize_hex_color(color2),
+                'solver': solver,
+                'backend': backend,
+                'precision': precision,
+                'size': size,
+                'multigrid': multigrid,
+                'tolerance': tolerance,
+                **encoding_result['params']
             }
         }
         
     except (ValueError, TypeError) as e:
         return {'valid': False, 'error': f'Invalid parameter type: {str(e)}'}
 
+def validate_simulation_params(data: Dict[str, Any], delta_t: float,
+                               solver: str = 'explicit') -> Dict[str, Any]:
+    """
+    Validate optional overrides of the physical simulation parameters.
+    
+    Missing values fall back to SIMULATION_PARAMS from the configuration.
+    
+    Args:
+        data: Dictionary that may contain D_a, D_b, feed_rate, kill_rate
+              and random_seed
+        delta_t: Already validated time step, used for the stability check
+        solver: Solver mode; only the explicit scheme has a diffusion limit
+        
+    Returns:
+        dict: Dictionary with validation results:
+            - 'valid': boolean indicating if all parameters are valid
+            - 'params': normalized parameter dictionary (if valid)
+            - 'error': error message string (if invalid)
+    """
+    try:
+        params = {}
+        for name, (low, high) in SIMULATION_PARAM_RANGES.items():
+            value = float(data.get(name, SIMULATION_PARAMS[name]))
+            if not (low <= value <= high):
+                return {'valid': False, 'error': f'{name} must be between {low} and {high}'}
+            params[name] = value
+        
+        random_seed = int(data.get('random_seed', SIMULATION_PARAMS['random_seed']))
+        if not (0 <= random_seed < 2**32):
+            return {'valid': False, 'error': 'random_seed must be between 0 and 2^32 - 1'}
+        params['random_seed'] = random_seed
+        
+        # Explicit diffusion is only stable while 4 * delta_t * D <= 1
+        if solver == 'explicit' and 4 * delta_t * max(params['D_a'], params['D_b']) > 1.0:
+            return {'valid': False, 'error': 'delta_t is too large for the diffusion rates (unstable)'}
+        
+        return {'valid': True, 'params': params}
+    
+    except (ValueError, TypeError) as e:
+        return {'valid': False, 'error': f'Invalid parameter type: {str(e)}'}
+
+def validate_batch_params(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a batch of texture variants.
+    
+    Expects {"variants": [...]} where every variant accepts the same fields
+    as a single request plus optional simulation overrides. Fields given at
+    the top level are shared defaults for all variants.
+    
+    Args:
+        data: Dictionary containing the batch request
+        
+    Returns:
+        dict: Dictionary with validation results:
+            - 'valid': boolean indicating if all variants are valid
+            - 'variants': list of normalized parameter dictionaries (if valid)
+            - 'error': error message string (if invalid)
+    """
+    variants = data.get('variants')
+    if not isinstance(variants, list) or not variants:
+        return {'valid': False, 'error': 'variants must be a non-empty list'}
+    
+    if len(variants) > BATCH_SETTINGS['max_variants']:
+        return {'valid': False, 'error': f"At most {BATCH_SETTINGS['max_variants']} variants per batch"}
+    
+    shared = {key: value for key, value in data.items() if key != 'variants'}
+    normalized = []
+    for index, variant in enumerate(variants):
+        if not isinstance(variant, dict):
+            return {'valid': False, 'error': f'Variant {index} must be an object'}
+        merged = {**shared, **variant}
+        
+        texture_result = validate_texture_params(merged)
+        if not texture_result['valid']:
+            return {'valid': False, 'error': f"Variant {index}: {texture_result['error']}"}
+        
+        simulation_result = validate_simulation_params(
+            merged, texture_result['params']['delta_t'], texture_result['params']['solver'])
+        if not simulation_result['valid']:
+            return {'valid': False, 'error': f"Variant {index}: {simulation_result['error']}"}
+        
+        normalized.append({**texture_result['params'], **simulation_result['params']})
+    
+    return {'valid': True, 'variants': normalized}
+
+def validate_animation_params(data: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate the time-lapse settings of an animation request.
+    
+    Without frame_interval, the run is divided into about
+    ANIMATION_SETTINGS['frames'] frames.
+    
+    Args:
+        data: Dictionary that may contain animation_format, frame_interval,
+              frame_size and frame_duration
+        params: Already validated texture parameters of the request
+        
+    Returns:
+        dict: Dictionary with validation results:
+            - 'valid': boolean indicating if all parameters are valid
+            - 'params': animation_format, frame_interval, frame_size,
+              frame_duration and frames (frame count) (if valid)
+            - 'error': error message string (if invalid)
+    """
+    try:
+        animation_format = str(data.get('animation_format', ANIMATION_SETTINGS['format'])).lower()
+        if animation_format not in ANIMATION_FORMATS:
+            return {'valid': False, 'error': f"animation_format must be one of: {', '.join(ANIMATION_FORMATS)}"}
+        if animation_format == 'webp' and not image_format_available('webp'):
+            return {'valid': False, 'error': 'animation_format webp is not supported by this server'}
+        
+        steps = int(params['t_max'] / params['delta_t'])
+        default_interval = max(1, -(-steps // max(1, ANIMATION_SETTINGS['frames'] - 1)))
+        frame_interval = int(data.get('frame_interval', default_interval))
+        if frame_interval < 1:
+            return {'valid': False, 'error': 'frame_interval must be at least 1'}
+        frames = steps // frame_interval + 1 + (1 if steps % frame_interval else 0)
+        if frames > ANIMATION_SETTINGS['max_frames']:
+            return {'valid': False, 'error': f"frame_interval gives {frames} frames, at most {ANIMATION_SETTINGS['max_frames']} are allowed"}
+        
+        max_frame_size = params['size']
+        frame_size = int(data.get('frame_size', min(max_frame_size, ANIMATION_SETTINGS['frame_size'])))
+        if not (ANIMATION_SETTINGS['min_frame_size'] <= frame_size <= max_frame_size):
+            return {'valid': False, 'error': f"frame_size must be between {ANIMATION_SETTINGS['min_frame_size']} and {max_frame_size}"}
+        
+        frame_duration = int(data.get('frame_duration', ANIMATION_SETTINGS['frame_duration']))
+        if not (10 <= frame_duration <= 10000):
+            return {'valid': False, 'error': 'frame_duration must be between 10 and 10000 ms'}
+        
+        return {
+            'valid': True,
+            'params': {
+                'animation_format': animation_format,
+                'frame_interval': frame_interval,
+                'frame_size': frame_size,
+                'frame_duration': frame_duration,
+                'frames': frames
+            }
+        }
+    
+    except (ValueError, TypeError) as e:
+        return {'valid': False, 'error': f'Invalid parameter type: {str(e)}'}
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size in human-readable format.